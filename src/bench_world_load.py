@@ -0,0 +1,114 @@
+"""Compare peak memory of loading a large world with and without streaming.
+
+Usage::
+
+    python src/bench_world_load.py [--nodes 500000]
+
+A synthetic world is written to a temporary file and then loaded in a fresh
+subprocess per mode so each peak RSS figure is measured in isolation:
+
+``json``
+    ``json.load`` followed by ``validate_world_data`` (the old path).
+``stream``
+    ``world_stream.load_world_file`` validating nodes as they are read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from world_manager import WorldManager
+from world_stream import load_world_file
+
+RESOURCES_PER_JARLDOM = 20
+
+
+def build_world(
+    node_count: int, resources_per_jarldom: int = RESOURCES_PER_JARLDOM
+) -> dict:
+    """Return a kingdom with jarldoms of ``resources_per_jarldom`` resources."""
+    nodes: dict[str, dict] = {
+        "1": {"node_id": 1, "parent_id": None, "name": "Kungarike", "children": [2]},
+        "2": {"node_id": 2, "parent_id": 1, "name": "Furstendöme", "children": [3]},
+        "3": {"node_id": 3, "parent_id": 2, "name": "Hertigdöme", "children": []},
+    }
+    next_id = 4
+    while next_id <= node_count:
+        jarldom_id = next_id
+        next_id += 1
+        nodes["3"]["children"].append(jarldom_id)
+        children = list(range(next_id, min(next_id + resources_per_jarldom, node_count + 1)))
+        nodes[str(jarldom_id)] = {
+            "node_id": jarldom_id,
+            "parent_id": 3,
+            "name": "Jarldöme",
+            "custom_name": f"By {jarldom_id}",
+            "children": children,
+        }
+        for child_id in children:
+            nodes[str(child_id)] = {
+                "node_id": child_id,
+                "parent_id": jarldom_id,
+                "name": "Resurs",
+                "res_type": "Mark",
+                "population": 10,
+            }
+        next_id += len(children)
+    return {"nodes": nodes, "characters": {}, "next_node_id": next_id}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _load(mode: str, path: str) -> None:
+    manager = WorldManager()
+    if mode == "json":
+        with open(path, "r", encoding="utf-8") as fh:
+            manager.set_world_data(json.load(fh))
+        manager.validate_world_data()
+    else:
+        load_world_file(path, manager)
+    print(f"{_peak_rss_mb():.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=500_000)
+    parser.add_argument("--mode", choices=("json", "stream"), help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        _load(args.mode, args.path)
+        return 0
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(build_world(args.nodes), fh, ensure_ascii=False, indent=2)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"World: {args.nodes} nodes, {size_mb:.1f} MB on disk")
+        for mode in ("json", "stream"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--path", path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()[-1]
+            print(f"{mode:>6}: peak RSS {out} MB")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ from pathlib import Path
 # Default file used for saving/loading world data
 SAVE_DIRECTORY = Path(__file__).resolve().parent / "save" / "saves"
 DEFAULT_WORLDS_FILE = str(SAVE_DIRECTORY / "worlds.json")
+# Directory holding one file per world plus a manifest index
+WORLDS_STORE_DIRECTORY = str(SAVE_DIRECTORY / "worlds")
 
 # UI defaults
 STATUS_DEFAULT_LINE_COUNT = 4
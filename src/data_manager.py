@@ -2,8 +2,9 @@
 import os
 from tkinter import messagebox
 
-from constants import DEFAULT_WORLDS_FILE
+from constants import DEFAULT_WORLDS_FILE, WORLDS_STORE_DIRECTORY
 from world_interface import WorldInterface
+from world_store import ShardedWorldStore, WorldCollection
 
 
 def load_worlds_from_file():
@@ -32,3 +33,58 @@ def save_worlds_to_file(all_worlds):
             f"Kunde inte spara data till {DEFAULT_WORLDS_FILE}.\n\n{e}",
         )
 
+
+def open_world_collection():
+    """Return a lazily loaded :class:`WorldCollection` for the save directory.
+
+    Only the manifest is read here. A legacy ``worlds.json`` is split into
+    per-world files the first time the sharded store is opened.
+    """
+    store = ShardedWorldStore(WORLDS_STORE_DIRECTORY, sparse=True)
+    try:
+        if not store.exists() and os.path.exists(DEFAULT_WORLDS_FILE):
+            legacy = WorldInterface.load_worlds_file(DEFAULT_WORLDS_FILE)
+            if legacy:
+                store.import_worlds(legacy)
+        return WorldCollection(store)
+    except Exception as e:
+        print(f"Error loading world store {WORLDS_STORE_DIRECTORY}: {e}")
+        messagebox.showerror(
+            "Laddningsfel",
+            f"Ett oväntat fel uppstod vid läsning av {WORLDS_STORE_DIRECTORY}.\n\n{e}",
+        )
+        return {}
+
+
+def persist_worlds(all_worlds):
+    """Write changed worlds, falling back to the monolithic file for dicts."""
+    if not isinstance(all_worlds, WorldCollection):
+        save_worlds_to_file(all_worlds)
+        return
+    try:
+        all_worlds.flush()
+    except Exception as e:
+        print(f"Error saving world store {all_worlds.store.base_dir}: {e}")
+        messagebox.showerror(
+            "Sparfel",
+            f"Kunde inte spara data till {all_worlds.store.base_dir}.\n\n{e}",
+        )
+
+
+def record_world_edit(all_worlds, world_name, world_data, node_id, key, value):
+    """Journal a single node field change.
+
+    Returns ``False`` when ``all_worlds`` has no journal, in which case the
+    caller should save the whole world instead.
+    """
+    if not isinstance(all_worlds, WorldCollection):
+        return False
+    try:
+        all_worlds.record_edit(world_name, world_data, node_id, key, value)
+    except Exception as e:
+        print(f"Error saving world store {all_worlds.store.base_dir}: {e}")
+        messagebox.showerror(
+            "Sparfel",
+            f"Kunde inte spara data till {all_worlds.store.base_dir}.\n\n{e}",
+        )
+    return True
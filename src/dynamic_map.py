@@ -6,7 +6,7 @@ from tkinter import ttk
 from typing import List
 
 from constants import BORDER_COLORS, NEIGHBOR_NONE_STR
-from node import Node
+from node import NodeView
 
 
 class DynamicMapCanvas:
@@ -72,15 +72,9 @@ class DynamicMapCanvas:
         self.canvas.delete("all")
         self.hide_tooltip()
 
-        jarldomes: List[Node] = []
+        jarldomes: List[NodeView] = []
         if self.world_data and "nodes" in self.world_data:
-            for node_id_str, nd in self.world_data["nodes"].items():
-                try:
-                    node_id = int(node_id_str)
-                    if self.simulator.get_depth_of_node(node_id) == 3:
-                        jarldomes.append(Node.from_dict(nd))
-                except ValueError:
-                    continue
+            jarldomes = [NodeView(nd) for nd in self.simulator.get_nodes_at_depth(3)]
 
         if not jarldomes:
             self.simulator.add_status_message("Inga Jarldömen att visa i dynamisk karta.")
@@ -151,14 +145,13 @@ class DynamicMapCanvas:
         if not self.world_data or "nodes" not in self.world_data:
             return
 
-        for node_id_str, nd in self.world_data["nodes"].items():
-            try:
-                node_id = int(node_id_str)
-            except ValueError:
-                continue
+        # Only the drawn Jarldoms can have lines, no need to scan every node
+        nodes = self.world_data["nodes"]
+        for node_id in node_polygons:
+            nd = nodes.get(str(node_id))
 
-            if self.simulator.get_depth_of_node(node_id) == 3 and "neighbors" in nd:
-                node_obj = Node.from_dict(nd)
+            if nd is not None and "neighbors" in nd:
+                node_obj = NodeView(nd)
                 A_id = node_id
                 if A_id not in node_polygons:
                     continue
@@ -184,7 +177,7 @@ class DynamicMapCanvas:
                             self.canvas.create_line(A_cx, A_cy, B_cx, B_cy, fill=color, width=width)
                             drawn_pairs.add(tuple(sorted((A_id, B_id))))
 
-    def show_node_tooltip(self, event, node: Node) -> None:
+    def show_node_tooltip(self, event, node: NodeView) -> None:
         """Display a small popup with information about ``node``."""
         display_name = self.simulator.get_display_name_for_node(node, 3)
         self._show_tooltip(event, display_name)
@@ -0,0 +1,265 @@
+"""Run many seeded timelines of one world in parallel and aggregate them.
+
+Usage::
+
+    python src/ensemble.py --world world.json --seeds 200 --seasons 40
+
+Every season of a :class:`time_engine.TimeEngine` timeline draws its
+randomness from :func:`time_engine.rng_for`, so a timeline is fully
+determined by its world, ``timeline_id`` and ``rng_seed``. An ensemble forks
+the world into one timeline per seed, advances them in a
+``ProcessPoolExecutor`` and collects the chosen metrics after every season.
+The per-season distributions show how sensitive an outcome is to chance.
+
+Nothing here imports Tk. Each timeline persists its snapshots to a temporary
+directory that is removed when the run ends.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from node_table import base_population
+from time_engine import TimeEngine
+
+
+def _weather_event(engine: TimeEngine) -> Dict[str, Any]:
+    for event in reversed(engine._events):
+        if event.get("type") == "weather_roll":
+            return event
+    return {}
+
+
+def _sum_field(engine: TimeEngine, key: str) -> int:
+    total = 0
+    for node in engine.world_state.get("nodes", {}).values():
+        try:
+            total += int(node.get(key, 0) or 0)
+        except (TypeError, ValueError):
+            continue
+    return total
+
+
+def _population(engine: TimeEngine) -> int:
+    return sum(
+        base_population(node) for node in engine.world_state.get("nodes", {}).values()
+    )
+
+
+# Metric name -> function of the engine after a season. Numeric results are
+# summarised with quantiles, anything else is counted per value.
+METRICS: Dict[str, Callable[[TimeEngine], Any]] = {
+    "weather": lambda engine: _weather_event(engine).get("name"),
+    "weather_total": lambda engine: _weather_event(engine).get("total"),
+    "umbarande": lambda engine: _sum_field(engine, "umbarande"),
+    "population": _population,
+}
+DEFAULT_METRICS = ("weather", "weather_total", "umbarande", "population")
+
+
+@dataclass
+class EnsembleResult:
+    """Per-seed metric rows and their per-season summaries."""
+
+    seeds: List[int]
+    metrics: List[str]
+    # seed -> one {"year", "season", <metric>: value} row per season
+    runs: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    # one {"year", "season", <metric>: summary} row per season
+    seasons: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seeds": self.seeds,
+            "metrics": self.metrics,
+            "seasons": self.seasons,
+            "runs": {str(seed): rows for seed, rows in self.runs.items()},
+        }
+
+
+# Set in each worker process by _init_worker so the world is sent only once
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    world_state: Dict[str, Any],
+    timeline_id: str,
+    seasons: int,
+    metrics: Sequence[str],
+    season_processors: Sequence[Callable] | None,
+) -> None:
+    _WORKER.update(
+        world_state=world_state,
+        timeline_id=timeline_id,
+        seasons=seasons,
+        metrics=list(metrics),
+        season_processors=list(season_processors) if season_processors else None,
+    )
+
+
+def _run_seed(seed: int) -> List[Dict[str, Any]]:
+    """Advance one timeline and return a metric row per season."""
+    metrics = _WORKER["metrics"]
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="ensemble_") as tmp:
+        engine = TimeEngine(
+            timeline_id=_WORKER["timeline_id"],
+            rng_seed=seed,
+            world_state=_WORKER["world_state"],
+            base_path=tmp,
+            season_processors=_WORKER["season_processors"],
+        )
+        for _ in range(_WORKER["seasons"]):
+            engine.step_seasons(1)
+            pos = engine.current_position
+            row: Dict[str, Any] = {"year": pos.year, "season": pos.season}
+            for name in metrics:
+                row[name] = METRICS[name](engine)
+            rows.append(row)
+    return rows
+
+
+def summarize(values: Sequence[Any]) -> Dict[str, Any]:
+    """Summarise one metric's values across seeds."""
+    numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if values and len(numbers) == len(values):
+        if len(numbers) > 1:
+            deciles = statistics.quantiles(numbers, n=10, method="inclusive")
+            p10, p50, p90 = deciles[0], statistics.median(numbers), deciles[-1]
+            stdev = statistics.stdev(numbers)
+        else:
+            p10 = p50 = p90 = numbers[0]
+            stdev = 0.0
+        return {
+            "mean": statistics.fmean(numbers),
+            "stdev": stdev,
+            "min": min(numbers),
+            "p10": p10,
+            "p50": p50,
+            "p90": p90,
+            "max": max(numbers),
+        }
+    counts: Dict[str, int] = {}
+    for value in values:
+        counts[str(value)] = counts.get(str(value), 0) + 1
+    return {"counts": dict(sorted(counts.items()))}
+
+
+def _aggregate(
+    runs: Dict[int, List[Dict[str, Any]]], metrics: Sequence[str]
+) -> List[Dict[str, Any]]:
+    rows_by_seed = list(runs.values())
+    if not rows_by_seed:
+        return []
+    seasons: List[Dict[str, Any]] = []
+    for index, first in enumerate(rows_by_seed[0]):
+        summary: Dict[str, Any] = {"year": first["year"], "season": first["season"]}
+        for name in metrics:
+            summary[name] = summarize([rows[index][name] for rows in rows_by_seed])
+        seasons.append(summary)
+    return seasons
+
+
+def run_ensemble(
+    world_state: Dict[str, Any],
+    seeds: Iterable[int],
+    seasons: int,
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    workers: int | None = None,
+    timeline_id: str = "main",
+    season_processors: Sequence[Callable] | None = None,
+) -> EnsembleResult:
+    """Advance ``seasons`` seasons of ``world_state`` once per seed.
+
+    ``workers`` is the process count (default: one per CPU); ``1`` runs
+    every seed in this process. ``season_processors`` replace the engine's
+    default weather processor and must be picklable, i.e. module-level
+    functions.
+    """
+    unknown = [name for name in metrics if name not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    seeds = list(seeds)
+    initargs = (world_state, timeline_id, seasons, metrics, season_processors)
+    if workers == 1:
+        _init_worker(*initargs)
+        results = [_run_seed(seed) for seed in seeds]
+    else:
+        # A few batches per worker keep them busy without one IPC per seed
+        chunksize = max(1, len(seeds) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=initargs
+        ) as pool:
+            results = list(pool.map(_run_seed, seeds, chunksize=chunksize))
+    runs = dict(zip(seeds, results))
+    return EnsembleResult(
+        seeds=seeds,
+        metrics=list(metrics),
+        runs=runs,
+        seasons=_aggregate(runs, metrics),
+    )
+
+
+def _load_world(path: str, name: str | None) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if name is not None:
+        return data[name]
+    if "nodes" not in data and len(data) == 1:
+        # A save file holding a single named world
+        return next(iter(data.values()))
+    return data
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--world", required=True, help="world JSON file")
+    parser.add_argument("--name", help="world to use from a file of several worlds")
+    parser.add_argument("--seeds", type=int, default=100, help="number of seeds")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--seasons", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--metrics",
+        default=",".join(DEFAULT_METRICS),
+        help=f"comma-separated, from: {', '.join(METRICS)}",
+    )
+    parser.add_argument("--timeline-id", default="main")
+    parser.add_argument("--output", help="write the full result as JSON here")
+    args = parser.parse_args(argv)
+
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    try:
+        result = run_ensemble(
+            _load_world(args.world, args.name),
+            range(args.first_seed, args.first_seed + args.seeds),
+            args.seasons,
+            metrics=metrics,
+            workers=args.workers,
+            timeline_id=args.timeline_id,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result.to_dict(), fh, ensure_ascii=False, indent=2)
+    last = result.seasons[-1] if result.seasons else None
+    print(f"{len(result.seeds)} seeds, {args.seasons} seasons")
+    if last:
+        print(f"Year {last['year']} {last['season']}:")
+        for name in metrics:
+            print(f"  {name}: {json.dumps(last[name], ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
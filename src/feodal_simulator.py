@@ -7,7 +7,6 @@ import tkinter.font as tkfont
 from tkinter import ttk, simpledialog, messagebox
 import random
 import math
-from collections import deque
 from typing import Any, Callable, Dict
 
 from constants import (
@@ -33,7 +32,7 @@ from constants import (
     STATUS_DEFAULT_LINE_COUNT,
 )
 from events import PROVINCE_OWNER_CHANGED
-from data_manager import load_worlds_from_file
+from data_manager import open_world_collection
 from node import Node
 from utils import (
     roll_dice,
@@ -44,11 +43,13 @@ from utils import (
 )
 from dynamic_map import DynamicMapCanvas
 from map_logic import StaticMapLogic
-from world_manager import WorldManager
+from world_manager import POPULATION_FIELDS, WorldManager
 from population_utils import calculate_population_from_fields
 from weather import roll_weather, get_weather_options, NORMAL_WEATHER
+from save_scheduler import SaveScheduler
 from status_service import StatusService
 from world_manager_ui import WorldManagerUI
+from world_store import WorldCollection
 from time.time_engine import TimeEngine, YearEntry, YearPosition
 from time.weather_lock import WeatherLock
 from noble_staff import (
@@ -112,15 +113,18 @@ class FeodalSimulator:
         self.root = root
         self.root.title("Förläningssimulator - Ingen värld")
         self.root.geometry("1150x800")  # Increased size slightly
-        self.root.protocol("WM_DELETE_WINDOW", self.root.quit)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_application)
 
-        self.all_worlds = load_worlds_from_file()
+        self.all_worlds = open_world_collection()
         self.active_world_name = None
         self.world_data = None  # Holds the data for the active world
         self.world_manager = WorldManager(self.world_data)
         self.pending_save_callback: Callable[[], None] | None = None
         self.status_service = StatusService()
-        self.world_ui = WorldManagerUI()
+        self.save_scheduler = SaveScheduler(
+            self.root, status_service=self.status_service
+        )
+        self.world_ui = WorldManagerUI(scheduler=self.save_scheduler)
         self.tooltip_manager = TooltipManager(self.root)
         self.time_engine = TimeEngine()
         self.weather_lock = WeatherLock()
@@ -180,7 +184,7 @@ class FeodalSimulator:
         # --- Menu Bar ---
         menubar = tk.Menu(self.root)
         file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Avsluta", command=self.root.quit)
+        file_menu.add_command(label="Avsluta", command=self.quit_application)
         menubar.add_cascade(label="Arkiv", menu=file_menu)
 
         edit_menu = tk.Menu(menubar, tearoff=0)
@@ -650,6 +654,10 @@ class FeodalSimulator:
     # --- World Data Handling ---
     def save_current_world(self):
         """Persist the active world using :class:`WorldManagerUI`."""
+        # Callers edit nodes in place before saving the whole world, so any
+        # cached totals may be stale
+        if getattr(self, "world_manager", None) is not None:
+            self.world_manager.invalidate_rollups()
         self.world_ui.save_current_world(
             self.active_world_name,
             self.world_data,
@@ -659,6 +667,36 @@ class FeodalSimulator:
         if getattr(self, "time_engine", None) and self.world_data is not None:
             self.time_engine.record_change(self.world_data)
 
+    def save_node_field(self, node_id, key, value):
+        """Persist a single node field change via the world journal.
+
+        Falls back to :meth:`save_current_world` when no journal is available.
+        """
+        self.world_manager.reindex_node(node_id)
+        world_ui = getattr(self, "world_ui", None)
+        if world_ui is None or not isinstance(
+            getattr(self, "all_worlds", None), WorldCollection
+        ):
+            self.save_current_world()
+            return
+        world_ui.save_node_edit(
+            self.active_world_name,
+            self.world_data,
+            self.all_worlds,
+            node_id,
+            key,
+            value,
+            self.refresh_dynamic_map,
+        )
+        if getattr(self, "time_engine", None) and self.world_data is not None:
+            self.time_engine.record_change(self.world_data)
+
+    def quit_application(self):
+        """Write any scheduled saves before leaving the main loop."""
+        self.commit_pending_changes()
+        self.world_ui.flush()
+        self.root.quit()
+
     def commit_pending_changes(self):
         """If an editor save callback is pending, call it before switching views."""
         if self.pending_save_callback:
@@ -971,23 +1009,20 @@ class FeodalSimulator:
         return self.world_manager.get_depth_of_node(node_id)
 
     def get_all_owners_by_level(self, level: int) -> list[dict]:
-        """Return all nodes at the specified depth."""
+        """Return all nodes at the specified depth, sorted by display name."""
 
         if not self.world_data:
             return []
 
-        results: list[dict] = []
-        for node_id_str, node_data in self.world_data.get("nodes", {}).items():
-            try:
-                node_id = int(node_id_str)
-            except (TypeError, ValueError):
-                continue
+        return self.world_manager.nodes_at_depth_by_name(level)
 
-            if self.get_depth_of_node(node_id) == level:
-                results.append(node_data)
+    def get_nodes_at_depth(self, level: int) -> list[dict]:
+        """Return all nodes at the specified depth, ordered by id."""
 
-        results.sort(key=lambda n: self.get_display_name_for_node(n, level))
-        return results
+        if not self.world_data:
+            return []
+
+        return self.world_manager.nodes_at_depth(level)
 
     def clear_depth_cache(self):
         """Clears the node depth cache, needed when hierarchy changes."""
@@ -1052,109 +1087,14 @@ class FeodalSimulator:
         )
         self.on_tree_selection_change()
 
-    def _build_parent_map(self) -> dict[int, int | None]:
-        """Return a mapping of node IDs to their parent IDs."""
-
-        if not self.world_data:
-            return {}
-
-        nodes_dict = self.world_data.get("nodes", {})
-        parent_of: dict[int, int | None] = {}
-
-        root_ids: list[int] = []
-        for node_id_str, node_data in nodes_dict.items():
-            try:
-                node_id = int(node_id_str)
-            except (TypeError, ValueError):
-                continue
-
-            parent_id = node_data.get("parent_id")
-            depth = self.get_depth_of_node(node_id)
-            if parent_id is None or depth == 0:
-                root_ids.append(node_id)
-
-        if not root_ids:
-            for node_id_str, node_data in nodes_dict.items():
-                try:
-                    node_id = int(node_id_str)
-                except (TypeError, ValueError):
-                    continue
-
-                parent_id = node_data.get("parent_id")
-                if parent_id is None or str(parent_id) not in nodes_dict:
-                    root_ids.append(node_id)
-
-        for root_id in root_ids:
-            parent_of[root_id] = None
-
-        queue = deque(root_ids)
-        while queue:
-            current_id = queue.popleft()
-            for child in self.world_manager.get_children(current_id):
-                parent_of[child.node_id] = current_id
-                queue.append(child.node_id)
-
-        for node_id_str, node_data in nodes_dict.items():
-            try:
-                node_id = int(node_id_str)
-            except (TypeError, ValueError):
-                continue
-
-            if node_id in parent_of:
-                continue
-
-            parent_id = node_data.get("parent_id")
-            try:
-                parent_of[node_id] = int(parent_id) if parent_id is not None else None
-            except (TypeError, ValueError):
-                parent_of[node_id] = None
-
-        return parent_of
-
-    def _inherited_owner(self, node_id: int, parent_of: dict[int, int | None]) -> int | None:
-        """Return inherited owner for ``node_id`` using ``parent_of``."""
-
-        if not self.world_data:
-            return None
-
-        nodes = self.world_data.get("nodes", {})
-        visited: set[int] = set()
-        current_id: int | None = node_id
-
-        while current_id is not None and current_id not in visited:
-            visited.add(current_id)
-            node_data = nodes.get(str(current_id))
-            if not node_data:
-                break
-
-            owner_level = str(node_data.get("owner_assigned_level", "none"))
-            if owner_level != "none":
-                return node_data.get("owner_assigned_id")
-
-            current_id = parent_of.get(current_id)
-
-        return None
-
     def get_province_subtree(self, owner_id: int) -> list[dict]:
         """Returnerar provinsträd för ``owner_id`` enligt arvsregeln."""
 
         if not self.world_data:
             return []
 
-        parent_of = self._build_parent_map()
-        nodes = self.world_data.get("nodes", {})
-
-        belonging: set[int] = set()
-        for node_id_str in nodes:
-            try:
-                node_id = int(node_id_str)
-            except (TypeError, ValueError):
-                continue
-
-            inherited_owner = self._inherited_owner(node_id, parent_of)
-            if inherited_owner == owner_id:
-                belonging.add(node_id)
-
+        owner_index = self.world_manager.owner_index
+        belonging = owner_index.members(owner_id)
         if not belonging:
             return []
 
@@ -1168,7 +1108,7 @@ class FeodalSimulator:
             children.sort(key=lambda entry: self.get_display_name(entry["id"]))
             return {"id": node_id, "children": children}
 
-        root_ids = [nid for nid in belonging if parent_of.get(nid) not in belonging]
+        root_ids = owner_index.roots(owner_id)
         root_ids.sort(key=self.get_display_name)
 
         return [build_tree(root_id) for root_id in root_ids]
@@ -1189,6 +1129,9 @@ class FeodalSimulator:
         except (ValueError, TypeError):
             return
 
+        # Owner fields may have been edited without going through
+        # assign_personal_owner
+        self.world_manager.owner_index.sync()
         self.structure_view.set_mode("province", selected_owner_id)
 
     def exit_province_view(self):
@@ -1441,15 +1384,10 @@ class FeodalSimulator:
         ruler_var = tk.StringVar()
         jarldom_options = []
         if self.world_data and "nodes" in self.world_data:
-            jarldoms = []
-            for nid_str, n in self.world_data["nodes"].items():
-                try:
-                    nid = int(nid_str)
-                except ValueError:
-                    continue
-                if self.get_depth_of_node(nid) == 3:
-                    name = n.get("custom_name", f"Jarld\u00f6me {nid}")
-                    jarldoms.append((nid, name))
+            jarldoms = [
+                (n["node_id"], n.get("custom_name", f"Jarld\u00f6me {n['node_id']}"))
+                for n in self.get_nodes_at_depth(3)
+            ]
             jarldoms.sort(key=lambda j: j[1].lower())
             jarldom_options = [f"{jid}: {name}" for jid, name in jarldoms]
         if char_defaults.get("ruler_of") is not None:
@@ -1906,16 +1844,21 @@ class FeodalSimulator:
         return candidate != existing
 
     def _auto_save_field(self, node_data, key, value, refresh_tree=False):
-        node_data[key] = value
-        if key in {
-            "population",
-            "free_peasants",
-            "unfree_peasants",
-            "thralls",
-            "burghers",
-        }:
-            self.world_manager.update_population_totals()
-        self.save_current_world()
+        if key in POPULATION_FIELDS:
+            # The change is pushed into the stored totals of every ancestor,
+            # so save the world whole
+            # set_node_field writes the field itself; it needs the old value
+            # to work out the change to pass up
+            stored = self.world_manager.set_node_field(
+                node_data.get("node_id"), key, value
+            )
+            if not stored:
+                node_data[key] = value
+                self.world_manager.update_population_totals()
+            self.save_current_world()
+        else:
+            node_data[key] = value
+            self.save_node_field(node_data.get("node_id"), key, value)
         if refresh_tree:
             self.structure_view.refresh_tree_item(node_data.get("node_id"))
 
@@ -1923,7 +1866,7 @@ class FeodalSimulator:
             jarldom_id = self._find_jarldom_id(node_data.get("node_id"))
             if jarldom_id is not None:
                 total = self.world_manager.update_work_needed(jarldom_id)
-                self.save_current_world()
+                self.save_node_field(jarldom_id, "work_needed", total)
                 if getattr(self, "current_jarldome_id", None) == jarldom_id:
                     self.work_need_var.set(str(total))
                     self._update_jarldom_work_display()
@@ -2230,6 +2173,7 @@ class FeodalSimulator:
         if "custom_name" not in node_data or not node_data["custom_name"]:
             node_data["custom_name"] = generate_swedish_village_name()
         node_data["res_type"] = "Resurs"  # Internal type is always Resurs
+        self.world_manager.reindex_node(node_id)
         if "neighbors" not in node_data or not isinstance(node_data["neighbors"], list):
             node_data["neighbors"] = []
         for key in (
@@ -3434,6 +3378,7 @@ class FeodalSimulator:
         if not initial_res_type or initial_res_type not in res_options:
             initial_res_type = res_options[0]
             node_data["res_type"] = initial_res_type
+            self.world_manager.reindex_node(node_id)
 
         editor_frame = ttk.Frame(parent_frame)
         editor_frame.pack(fill="both", expand=True)
@@ -4409,15 +4354,10 @@ class FeodalSimulator:
 
         jarldom_options: list[str] = []
         if self.world_data and "nodes" in self.world_data:
-            jarldoms = []
-            for nid_str, n in self.world_data["nodes"].items():
-                try:
-                    nid = int(nid_str)
-                except ValueError:
-                    continue
-                if self.get_depth_of_node(nid) == 3:
-                    name = n.get("custom_name", f"Jarldöme {nid}")
-                    jarldoms.append((nid, name))
+            jarldoms = [
+                (n["node_id"], n.get("custom_name", f"Jarldöme {n['node_id']}"))
+                for n in self.get_nodes_at_depth(3)
+            ]
             jarldoms.sort(key=lambda j: j[1].lower())
             jarldom_options = [f"{jid}: {name}" for jid, name in jarldoms]
 
@@ -4833,6 +4773,7 @@ class FeodalSimulator:
                 node_data["custom_name"] = ""
             node_data["res_type"] = res_var.get().strip()
             node_data["settlement_type"] = settlement_type_var.get().strip()
+            self.world_manager.reindex_node(node_id)
             node_data["dagsverken"] = dagsverken_var.get().strip()
             try:
                 node_data["free_peasants"] = int(free_var.get() or "0", 10)
@@ -6751,7 +6692,10 @@ class FeodalSimulator:
                 hex_size=30,
                 spacing=self.hex_spacing,
             )
-        self.map_logic.place_jarldomes_bfs(self.get_depth_of_node)
+        self.map_logic.place_jarldomes_bfs(
+            self.get_depth_of_node,
+            jarldom_ids=self.world_manager.node_ids_at_depth(3),
+        )
         self.map_static_positions = self.map_logic.map_static_positions
         self.static_grid_occupied = self.map_logic.static_grid_occupied
         self.static_rows = self.map_logic.rows
@@ -6991,11 +6935,8 @@ class FeodalSimulator:
 
         sibling_ids = set()
         if parent_id is not None:
-            for nid_str, nd in self.world_data.get("nodes", {}).items():
-                try:
-                    nid = int(nid_str)
-                except ValueError:
-                    continue
+            for nid in self.world_manager.hierarchy.children_of(parent_id):
+                nd = self.world_data["nodes"][str(nid)]
                 if (
                     nid != start_node_id
                     and nd.get("parent_id") == parent_id
@@ -7199,12 +7140,7 @@ class FeodalSimulator:
 
         # Remove references from any other node pointing at ``node_id``
         if self.world_data:
-            nodes_dict = self.world_data.get("nodes", {})
-            for nid_str, node in list(nodes_dict.items()):
-                try:
-                    nid = int(nid_str)
-                except ValueError:
-                    continue
+            for nid, node in list(self.world_manager.node_store.items()):
                 if nid == node_id:
                     continue
                 neighbors = node.get("neighbors", [])
@@ -7240,11 +7176,7 @@ class FeodalSimulator:
         empty = [
             {"id": None, "border": NEIGHBOR_NONE_STR} for _ in range(MAX_NEIGHBORS)
         ]
-        for nid_str, node in self.world_data.get("nodes", {}).items():
-            try:
-                nid = int(nid_str)
-            except ValueError:
-                continue
+        for nid in self.world_manager.node_store:
             if self.get_depth_of_node(nid) == 3:
                 self.world_manager.update_neighbors_for_node(nid, list(empty))
 
@@ -7272,11 +7204,7 @@ class FeodalSimulator:
         if not self.world_data:
             return
         max_r = max_c = 0
-        for nid_str, node in self.world_data.get("nodes", {}).items():
-            try:
-                nid = int(nid_str)
-            except ValueError:
-                continue
+        for nid, node in self.world_manager.node_store.items():
             r = node.get("hex_row")
             c = node.get("hex_col")
             if isinstance(r, int) and isinstance(c, int):
@@ -0,0 +1,110 @@
+"""Secondary index of node ids by the value of a single node field.
+
+Used by ``WorldManager`` for realm-wide listings such as all nodes of one
+``res_type`` or ``settlement_type``. Ids are kept in ascending order per
+value. Editors change fields by writing to the node dicts directly, so the
+index does not trust itself blindly: a lookup re-checks the value of every
+id it returns (cheap, proportional to the result) and drops ids whose value
+has moved on. ``update`` registers a node under its new value and should be
+called after such edits; ``WorldManager.reindex_node`` does that.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, List
+
+_HASHABLE = (str, int, float, bool, type(None))
+# Stored for nodes whose value cannot be indexed (lists, dicts, ...)
+_UNINDEXED = object()
+
+
+def _as_id(value: Any) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+class FieldIndex:
+    """Node ids grouped by the value of ``field`` in ``nodes``."""
+
+    def __init__(self, nodes: Dict[str, Any], field: str) -> None:
+        self.nodes = nodes
+        self.field = field
+        self._ids: Dict[Any, List[int]] | None = None
+        self._value: Dict[int, Any] = {}
+        self._size = 0
+
+    def _ensure(self) -> Dict[Any, List[int]]:
+        # Nodes added or removed behind the index's back change the count
+        if self._ids is None or len(self.nodes) != self._size:
+            self._build()
+        return self._ids
+
+    def _build(self) -> None:
+        ids: Dict[Any, List[int]] = {}
+        values: Dict[int, Any] = {}
+        entries = []
+        for key, node in self.nodes.items():
+            nid = _as_id(key)
+            if nid is not None and isinstance(node, dict):
+                entries.append((nid, node.get(self.field)))
+        for nid, value in sorted(entries, key=lambda entry: entry[0]):
+            if isinstance(value, _HASHABLE):
+                ids.setdefault(value, []).append(nid)
+            else:
+                value = _UNINDEXED
+            values[nid] = value
+        self._ids = ids
+        self._value = values
+        self._size = len(self.nodes)
+
+    def ids_with(self, value: Any) -> List[int]:
+        """Return the ids of nodes whose field equals ``value``, ascending."""
+        if not isinstance(value, _HASHABLE):
+            return []
+        bucket = self._ensure().get(value, [])
+        stale = [
+            nid
+            for nid in bucket
+            if (self.nodes.get(str(nid)) or {}).get(self.field) != value
+        ]
+        for nid in stale:
+            self.update(nid)
+        return list(bucket)
+
+    def update(self, node_id: int) -> None:
+        """Re-read the field of ``node_id`` after it changed."""
+        if self._ids is None:
+            return
+        node = self.nodes.get(str(node_id))
+        if not isinstance(node, dict):
+            self.remove(node_id)
+            return
+        value = node.get(self.field)
+        if node_id in self._value:
+            if self._value[node_id] == value:
+                return
+            self._discard(node_id)
+        else:
+            self._size += 1
+        if isinstance(value, _HASHABLE):
+            insort(self._ids.setdefault(value, []), node_id)
+        else:
+            value = _UNINDEXED
+        self._value[node_id] = value
+
+    def remove(self, node_id: int) -> None:
+        """Forget a node that was deleted from ``nodes``."""
+        if self._ids is None or node_id not in self._value:
+            return
+        self._discard(node_id)
+        self._size -= 1
+
+    def _discard(self, node_id: int) -> None:
+        bucket = self._ids.get(self._value.pop(node_id), [])
+        pos = bisect_left(bucket, node_id)
+        if pos < len(bucket) and bucket[pos] == node_id:
+            del bucket[pos]
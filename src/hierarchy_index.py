@@ -0,0 +1,379 @@
+"""Hierarchy index kept alongside the node dict of a world.
+
+Rollups used to rebuild a parent -> children lookup by scanning every node on
+each call, depth lookups walked the parent chain and ancestor tests ran a
+DFS. ``HierarchyIndex`` keeps that structure between calls:
+
+* depth per node, resolved along the parent chain on first use and memoised
+  for every node on the way,
+* children per node: the node's ``children`` list followed by any other node
+  naming it as ``parent_id``,
+* Euler-tour entry/exit positions, so an ancestor test is two comparisons
+  and a subtree is a slice of the tour,
+* node ids per depth, in id order, for level listings.
+
+``WorldManager`` updates the index when it adds or removes nodes. Any other
+change to the hierarchy has to be followed by
+``WorldManager.clear_depth_cache`` (as it already had to for depths), which
+drops the index so it is rebuilt on next use.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from itertools import chain
+from typing import Any, Dict, List, Tuple
+
+# Depths past this are reported as -100, matching the old parent walk
+MAX_DEPTH = 50
+DEPTH_MISSING = -1
+DEPTH_CYCLE = -99
+DEPTH_TOO_DEEP = -100
+
+
+def _as_id(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+class HierarchyIndex:
+    """Children, depths and Euler-tour intervals for ``nodes``.
+
+    Depths are filled lazily and never need the full structure, so resolving
+    a few depths (e.g. while a world is still being streamed in) stays cheap.
+    Children and the tour are built on the first query that needs them.
+    """
+
+    def __init__(self, nodes: Dict[str, Any]) -> None:
+        self.nodes = nodes
+        self._depth: Dict[int, int] = {}
+        self._parent: Dict[int, int | None] | None = None
+        self._children: Dict[int, List[int]] = {}
+        self._size = 0
+        self._tour: List[int] | None = None
+        self._enter: Dict[int, int] = {}
+        self._exit: Dict[int, int] = {}
+        self._tour_parent: Dict[int, int | None] = {}
+        self._by_depth: Dict[int, List[int]] | None = None
+        self._tree_shaped: Tuple[List[int], bool] | None = None
+
+    # ------------------------------------------------------------------
+    # Depths
+    # ------------------------------------------------------------------
+    def depth_of(self, node_id: Any) -> int:
+        """Return the depth of ``node_id``; the root has depth 0.
+
+        Negative values flag problems: -1 for unknown nodes, -99 for nodes
+        in or below a parent cycle and -100 for depths past ``MAX_DEPTH``.
+        A ``parent_id`` pointing at a missing node ends the chain there.
+        """
+        nid = _as_id(node_id)
+        if nid is None:
+            return DEPTH_MISSING
+        memo = self._depth
+        cached = memo.get(nid)
+        if cached is not None:
+            return cached
+
+        nodes = self.nodes
+        walked: List[int] = []
+        on_path: set[int] = set()
+        current = nid
+        while True:
+            known = memo.get(current)
+            if known is not None:
+                base = known
+                break
+            node = nodes.get(str(current))
+            if not isinstance(node, dict):
+                # Only the start can be missing; parents are checked below
+                memo[nid] = DEPTH_MISSING
+                return DEPTH_MISSING
+            walked.append(current)
+            on_path.add(current)
+            parent_id = _as_id(node.get("parent_id"))
+            if parent_id is None or str(parent_id) not in nodes:
+                base = -1
+                break
+            if parent_id in on_path:
+                for walked_id in walked:
+                    memo[walked_id] = DEPTH_CYCLE
+                return DEPTH_CYCLE
+            current = parent_id
+
+        for offset, walked_id in enumerate(reversed(walked), start=1):
+            if base < -1:
+                memo[walked_id] = base
+                continue
+            depth = base + offset
+            memo[walked_id] = depth if depth <= MAX_DEPTH else DEPTH_TOO_DEEP
+        return memo[nid]
+
+    def set_depth(self, node_id: int, depth: int) -> None:
+        """Record a depth known from elsewhere, e.g. a partial working set."""
+        self._depth[node_id] = depth
+
+    def ancestors(self, node_id: Any) -> List[int]:
+        """Return the ids along the parent chain of ``node_id``, nearest first.
+
+        The walk stops at a missing parent and before revisiting a node, so
+        a parent cycle yields each of its nodes once.
+        """
+        nodes = self.nodes
+        result: List[int] = []
+        seen = {_as_id(node_id)}
+        node = nodes.get(str(node_id))
+        while isinstance(node, dict):
+            parent_id = _as_id(node.get("parent_id"))
+            if parent_id is None or parent_id in seen:
+                break
+            node = nodes.get(str(parent_id))
+            if not isinstance(node, dict):
+                break
+            seen.add(parent_id)
+            result.append(parent_id)
+        return result
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+    def _ensure_structure(self) -> Dict[int, int | None]:
+        # Nodes added or removed behind the index's back show up as a size
+        # mismatch; rebuild rather than answer from a stale structure.
+        if self._parent is None or len(self.nodes) != self._size:
+            self._build()
+        return self._parent
+
+    def _build(self) -> None:
+        parent: Dict[int, int | None] = {}
+        children: Dict[int, List[int]] = {}
+        entries = []
+        for key, node in self.nodes.items():
+            nid = _as_id(key)
+            if nid is None or not isinstance(node, dict):
+                continue
+            parent_id = node.get("parent_id")
+            parent[nid] = parent_id if type(parent_id) is int else _as_id(parent_id)
+            children[nid] = []
+            if node.get("children"):
+                entries.append((nid, node["children"]))
+
+        listed: Dict[int, set[int]] = {}
+        for nid, raw_children in entries:
+            kids = children[nid]
+            for raw in raw_children:
+                cid = raw if type(raw) is int else _as_id(raw)
+                if cid in children and cid != nid:
+                    kids.append(cid)
+            if len(set(kids)) != len(kids):
+                kids[:] = dict.fromkeys(kids)
+            listed[nid] = set(kids)
+        no_listed: set[int] = set()
+        for nid, parent_id in parent.items():
+            if parent_id in children and parent_id != nid:
+                if nid not in listed.get(parent_id, no_listed):
+                    children[parent_id].append(nid)
+
+        self._parent = parent
+        self._children = children
+        self._size = len(self.nodes)
+        self._tour = None
+        self._by_depth = None
+
+    def _ensure_tour(self) -> None:
+        parent = self._ensure_structure()
+        if self._tour is not None:
+            return
+        children = self._children
+        tour: List[int] = []
+        enter: Dict[int, int] = {}
+        exit_: Dict[int, int] = {}
+        tour_parent: Dict[int, int | None] = {}
+        roots = [nid for nid, pid in parent.items() if pid not in children]
+        # Nodes only reachable through a cycle get a tour of their own
+        for start in chain(roots, parent):
+            if start in enter:
+                continue
+            enter[start] = len(tour)
+            tour.append(start)
+            tour_parent[start] = None
+            stack = [(start, iter(children[start]))]
+            while stack:
+                nid, pending = stack[-1]
+                for cid in pending:
+                    if cid not in enter:
+                        enter[cid] = len(tour)
+                        tour.append(cid)
+                        tour_parent[cid] = nid
+                        stack.append((cid, iter(children[cid])))
+                        break
+                else:
+                    stack.pop()
+                    exit_[nid] = len(tour)
+        self._tour = tour
+        self._enter = enter
+        self._exit = exit_
+        self._tour_parent = tour_parent
+
+    def children_of(self, node_id: int) -> List[int]:
+        """Return the ids of the existing children of ``node_id``."""
+        self._ensure_structure()
+        return self._children.get(node_id, [])
+
+    def tour_order(self) -> List[int]:
+        """Return every node id in Euler-tour (pre-)order.
+
+        Each subtree is a contiguous slice; see :meth:`tour_span`. The list
+        is replaced, not modified, when the hierarchy changes.
+        """
+        self._ensure_tour()
+        return self._tour
+
+    def tour_span(self, node_id: int) -> Tuple[int, int]:
+        """Return the ``[start, end)`` slice of ``node_id``'s subtree in the tour."""
+        self._ensure_tour()
+        start = self._enter.get(node_id)
+        if start is None:
+            return (0, 0)
+        return (start, self._exit[node_id])
+
+    def tour_parent(self, node_id: int) -> int | None:
+        """Return the node ``node_id`` was reached from in the tour, if any."""
+        self._ensure_tour()
+        return self._tour_parent.get(node_id)
+
+    def is_tree_shaped(self) -> bool:
+        """Return ``True`` if the tour covers the hierarchy exactly.
+
+        That is: every node is listed by at most one parent, that parent is
+        its ``parent_id``, there are no cycles and no node is deeper than
+        ``MAX_DEPTH``. Subtree sums over the tour then equal the old
+        child-by-child walks, which count shared nodes once per parent.
+        """
+        tour = self.tour_order()
+        if self._tree_shaped is not None and self._tree_shaped[0] is tour:
+            return self._tree_shaped[1]
+        parent = self._parent
+        tour_parent = self._tour_parent
+        depth: Dict[int, int] = {}
+        shaped = True
+        for nid in tour:
+            via = tour_parent[nid]
+            if via is None:
+                if parent[nid] in parent:
+                    # Only reachable through a cycle
+                    shaped = False
+                    break
+                depth[nid] = 0
+                continue
+            if via != parent[nid]:
+                shaped = False
+                break
+            depth[nid] = depth[via] + 1
+            if depth[nid] > MAX_DEPTH:
+                shaped = False
+                break
+        if shaped:
+            listed = sum(len(kids) for kids in self._children.values())
+            shaped = listed == sum(1 for via in tour_parent.values() if via is not None)
+        self._tree_shaped = (tour, shaped)
+        return shaped
+
+    def subtree(self, node_id: int) -> List[int]:
+        """Return ``node_id`` followed by all its descendants, depth first."""
+        self._ensure_tour()
+        start = self._enter.get(node_id)
+        if start is None:
+            return []
+        return self._tour[start : self._exit[node_id]]
+
+    def post_order(self, node_id: int) -> List[Tuple[int, int | None]]:
+        """Return ``(node, parent)`` pairs of the subtree, children first.
+
+        ``parent`` is the node each one was reached from in the tour, so a
+        node listed by several parents appears once. It is ``None`` for
+        ``node_id`` itself.
+        """
+        subtree = self.subtree(node_id)
+        tour_parent = self._tour_parent
+        pairs = [(nid, tour_parent[nid]) for nid in reversed(subtree)]
+        if pairs:
+            pairs[-1] = (node_id, None)
+        return pairs
+
+    def subtree_size(self, node_id: int) -> int:
+        """Return the number of nodes in the subtree rooted at ``node_id``."""
+        self._ensure_tour()
+        start = self._enter.get(node_id)
+        if start is None:
+            return 0
+        return self._exit[node_id] - start
+
+    def is_ancestor(self, ancestor_id: int, node_id: int) -> bool:
+        """Return ``True`` if ``node_id`` is a proper descendant of ``ancestor_id``."""
+        self._ensure_tour()
+        outer = self._enter.get(ancestor_id)
+        inner = self._enter.get(node_id)
+        if outer is None or inner is None:
+            return False
+        return outer < inner < self._exit[ancestor_id]
+
+    def ids_at_depth(self, depth: int) -> List[int]:
+        """Return the ids of all nodes at ``depth`` in ascending order."""
+        parent = self._ensure_structure()
+        if self._by_depth is None:
+            by_depth: Dict[int, List[int]] = {}
+            for nid in sorted(parent):
+                by_depth.setdefault(self.depth_of(nid), []).append(nid)
+            self._by_depth = by_depth
+        return self._by_depth.get(depth, [])
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def add_node(self, node_id: int, parent_id: int | None) -> None:
+        """Register a node that was just added to ``nodes``."""
+        parent_depth = self._depth.get(parent_id) if parent_id is not None else -1
+        if parent_depth is not None and parent_depth >= -1:
+            depth = parent_depth + 1
+            self._depth[node_id] = depth if depth <= MAX_DEPTH else DEPTH_TOO_DEEP
+        if self._parent is None or node_id in self._parent:
+            return
+        self._parent[node_id] = parent_id
+        self._children[node_id] = []
+        if parent_id in self._children:
+            self._children[parent_id].append(node_id)
+        self._size += 1
+        self._tour = None
+        if self._by_depth is not None:
+            insort(self._by_depth.setdefault(self.depth_of(node_id), []), node_id)
+
+    def remove_node(self, node_id: int) -> None:
+        """Forget a node that was just deleted from ``nodes``."""
+        depth = self._depth.pop(node_id, None)
+        if self._parent is None or node_id not in self._parent:
+            return
+        if self._by_depth is not None:
+            bucket = self._by_depth.get(depth, [])
+            pos = bisect_left(bucket, node_id)
+            if pos < len(bucket) and bucket[pos] == node_id:
+                del bucket[pos]
+            else:
+                self._by_depth = None
+        parent_id = self._parent.pop(node_id)
+        siblings = self._children.get(parent_id)
+        if siblings is not None and node_id in siblings:
+            siblings.remove(node_id)
+        for child_id in self._children.pop(node_id):
+            # Orphaned children now end their parent chain here
+            if self._parent.get(child_id) == node_id:
+                self._depth.clear()
+                self._by_depth = None
+                break
+        self._size -= 1
+        self._tour = None
@@ -1,13 +1,13 @@
 from wsgiref.simple_server import make_server
 import urllib.parse
 
-from data_manager import load_worlds_from_file
+from data_manager import open_world_collection
 
 
 def load_worlds():
-    """Load worlds from disk."""
+    """Open the world catalogue; world data is read when a page needs it."""
     try:
-        return load_worlds_from_file()
+        return open_world_collection()
     except Exception:
         return {}
 
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from collections import deque
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from constants import BORDER_COLORS, NEIGHBOR_NONE_STR, MAX_NEIGHBORS
 
@@ -28,16 +28,27 @@ class StaticMapLogic:
     # --------------------------------------------------
     # Placement
     # --------------------------------------------------
-    def place_jarldomes_bfs(self, get_depth_of_node) -> None:
-        """Place Jarldoms using BFS based on neighbor connections."""
+    def place_jarldomes_bfs(
+        self, get_depth_of_node, jarldom_ids: Iterable[int] | None = None
+    ) -> None:
+        """Place Jarldoms using BFS based on neighbor connections.
+
+        ``jarldom_ids`` may list the depth 3 nodes up front (e.g. from the
+        world manager's depth index) to avoid scanning every node.
+        """
+        nodes = self.world_data.get("nodes", {})
         jarldomes: Dict[int, dict] = {}
-        for node_id_str, nd in self.world_data.get("nodes", {}).items():
-            try:
-                nid = int(node_id_str)
-            except ValueError:
-                continue
-            if get_depth_of_node(nid) == 3:
-                jarldomes[nid] = nd
+        if jarldom_ids is not None:
+            for nid in jarldom_ids:
+                jarldomes[nid] = nodes[str(nid)]
+        else:
+            for node_id_str, nd in nodes.items():
+                try:
+                    nid = int(node_id_str)
+                except ValueError:
+                    continue
+                if get_depth_of_node(nid) == 3:
+                    jarldomes[nid] = nd
 
         adjacency: Dict[int, List[Tuple[int, int]]] = {}
         for jid, nd in jarldomes.items():
@@ -608,21 +608,152 @@ class Node:
         assigned owner is found. If none exists, ("none", None) is returned.
         """
 
-        if self.owner_assigned_level != "none":
-            return self.owner_assigned_level, self.owner_assigned_id
+        return _inherited_owner(self, world)
 
-        nodes = getattr(world, "world_data", {}).get("nodes", {}) if world else {}
 
-        parent_id = self.parent_id
-        while parent_id is not None:
-            parent_data = nodes.get(str(parent_id))
-            if not parent_data:
-                break
+def _inherited_owner(node, world) -> tuple[str, int | None]:
+    if node.owner_assigned_level != "none":
+        return node.owner_assigned_level, node.owner_assigned_id
 
-            parent_node = Node.from_dict(parent_data)
-            if parent_node.owner_assigned_level != "none":
-                return parent_node.owner_assigned_level, parent_node.owner_assigned_id
+    nodes = getattr(world, "world_data", {}).get("nodes", {}) if world else {}
 
-            parent_id = parent_node.parent_id
+    parent_id = node.parent_id
+    while parent_id is not None:
+        parent_data = nodes.get(str(parent_id))
+        if not parent_data:
+            break
 
-        return "none", None
+        parent_node = NodeView(parent_data)
+        if parent_node.owner_assigned_level != "none":
+            return parent_node.owner_assigned_level, parent_node.owner_assigned_id
+
+        parent_id = parent_node.parent_id
+
+    return "none", None
+
+
+def _optional_id(value) -> Optional[int]:
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    if isinstance(value, int):
+        return value
+    return None
+
+
+def _int_field(key: str, default: int = 0):
+    def read(data: dict) -> int:
+        try:
+            return int(data.get(key, default) or default)
+        except (ValueError, TypeError):
+            return default
+
+    return read
+
+
+def _neighbors(data: dict) -> List[Neighbor]:
+    neighbors_raw = data.get("neighbors", [])
+    neighbors: List[Neighbor] = []
+    for i in range(MAX_NEIGHBORS):
+        if i < len(neighbors_raw) and isinstance(neighbors_raw[i], dict):
+            ndata = neighbors_raw[i]
+            nid = ndata.get("id")
+            if isinstance(nid, str) and nid.isdigit():
+                nid = int(nid)
+            neighbors.append(Neighbor(nid, ndata.get("border", NEIGHBOR_NONE_STR)))
+        else:
+            neighbors.append(Neighbor())
+    return neighbors
+
+
+def _res_type(data: dict) -> str:
+    raw = data.get("res_type", "Resurs")
+    return raw if isinstance(raw, str) and raw else "Resurs"
+
+
+def _population(data: dict) -> int:
+    if _res_type(data) in {"Vildmark", "Jaktmark"}:
+        return 0
+    raw = data.get("population")
+    if raw is not None:
+        try:
+            return int(raw)
+        except (ValueError, TypeError):
+            pass
+    return sum(
+        int(data.get(key, 0) or 0)
+        for key in ("free_peasants", "unfree_peasants", "thralls", "burghers")
+    )
+
+
+def _owner_level(data: dict) -> str:
+    raw = str(data.get("owner_assigned_level", "none") or "none")
+    return raw if raw in {"0", "1", "2", "none"} else "none"
+
+
+def _dagsverken(data: dict) -> str:
+    raw = data.get("dagsverken", "normalt")
+    return raw if raw in DAGSVERKEN_LEVELS else "normalt"
+
+
+# Fields NodeView coerces itself, the same way ``Node.from_dict`` does. Any
+# other ``Node`` field is read from a full ``Node.from_dict``.
+_VIEW_FIELDS = {
+    "node_id": lambda data: int(data.get("node_id")),
+    "parent_id": lambda data: _optional_id(data.get("parent_id")),
+    "ruler_id": lambda data: _optional_id(data.get("ruler_id")),
+    "owner_assigned_id": lambda data: _optional_id(data.get("owner_assigned_id")),
+    "owner_assigned_level": _owner_level,
+    "name": lambda data: data.get("name", ""),
+    "custom_name": lambda data: (
+        data.get("custom_name", "") if _res_type(data) != "Väder" else ""
+    ),
+    "res_type": _res_type,
+    "settlement_type": lambda data: data.get("settlement_type", "By"),
+    "dagsverken": _dagsverken,
+    "population": _population,
+    "num_subfiefs": lambda data: int(data.get("num_subfiefs", 0)),
+    "children": lambda data: [
+        int(c) for c in data.get("children", []) if str(c).isdigit()
+    ],
+    "neighbors": _neighbors,
+    "free_peasants": _int_field("free_peasants"),
+    "unfree_peasants": _int_field("unfree_peasants"),
+    "thralls": _int_field("thralls"),
+    "burghers": _int_field("burghers"),
+    "work_available": _int_field("work_available"),
+    "work_needed": _int_field("work_needed"),
+    "weather_effect": lambda data: data.get("weather_effect", ""),
+}
+
+
+class NodeView:
+    """Read-only ``Node``-like access straight over a raw node dict.
+
+    Nothing is copied: each attribute is coerced from ``data`` when it is
+    read, so the view always reflects the current dict and reading a few
+    fields costs only those fields. Use :meth:`to_node` where a full
+    ``Node`` is needed.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    def __getattr__(self, name: str):
+        read = _VIEW_FIELDS.get(name)
+        if read is not None:
+            return read(self.data)
+        if name in Node.__dataclass_fields__:
+            return getattr(self.to_node(), name)
+        raise AttributeError(name)
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.data.get('node_id')!r})"
+
+    def to_node(self) -> Node:
+        return Node.from_dict(self.data)
+
+    def inherited_owner(self, world) -> tuple[str, int | None]:
+        """See :meth:`Node.inherited_owner`."""
+        return _inherited_owner(self, world)
@@ -0,0 +1,113 @@
+"""Int-keyed access to the nodes of a world.
+
+Worlds keep their nodes under JSON object keys, i.e. strings, while node
+ids everywhere else (``parent_id``, ``children``, neighbour ids) are ints.
+Looking nodes up therefore meant ``nodes.get(str(node_id))`` on every step of
+every traversal, and iterating them meant ``int(key)`` inside a
+``try``/``except``.
+
+``NodeStore`` converts the keys once and then maps int ids straight to the
+node dicts. The node dicts are shared with the underlying ``nodes`` dict, so
+edits to a node are visible through both. The serialised form is unchanged;
+the store is rebuilt from it whenever a world is loaded.
+
+Nodes added or removed through :meth:`add` and :meth:`remove` keep both in
+step. Other changes to the key set are picked up on next use, since the
+store rebuilds when the sizes differ; a node dict *replaced* under an
+existing key has to be followed by :meth:`rebuild` (``WorldManager`` does
+this in ``clear_depth_cache``).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+def as_node_id(value: Any) -> int | None:
+    """Return ``value`` as a node id, or ``None`` if it is not one."""
+    if type(value) is int:
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return int(value)
+    return None
+
+
+class NodeStore:
+    """Node dicts of a world keyed by int id."""
+
+    def __init__(self, nodes: Dict[str, Any]) -> None:
+        self.nodes = nodes
+        self._by_id: Dict[int, Dict[str, Any]] | None = None
+        self._size = 0
+
+    def _index(self) -> Dict[int, Dict[str, Any]]:
+        if self._by_id is None or len(self.nodes) != self._size:
+            self.rebuild()
+        return self._by_id
+
+    def rebuild(self) -> None:
+        """Re-read every key of the underlying ``nodes`` dict."""
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for key, node in self.nodes.items():
+            nid = as_node_id(key)
+            if nid is not None and isinstance(node, dict):
+                by_id[nid] = node
+        self._by_id = by_id
+        self._size = len(self.nodes)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def get(self, node_id: Any, default: Any = None) -> Dict[str, Any] | None:
+        """Return the node for ``node_id`` (an int or digit string)."""
+        by_id = self._index()
+        if type(node_id) is not int:
+            node_id = as_node_id(node_id)
+        return by_id.get(node_id, default)
+
+    def __getitem__(self, node_id: int) -> Dict[str, Any]:
+        node = self.get(node_id)
+        if node is None:
+            raise KeyError(node_id)
+        return node
+
+    def __contains__(self, node_id: Any) -> bool:
+        return self.get(node_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index())
+
+    def ids(self) -> List[int]:
+        return list(self._index())
+
+    def items(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        return iter(self._index().items())
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._index().values())
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, node_id: int, node: Dict[str, Any]) -> None:
+        """Store ``node`` under ``node_id``, replacing any previous node."""
+        by_id = self._index()
+        key = str(node_id)
+        if key not in self.nodes:
+            self._size += 1
+        self.nodes[key] = node
+        by_id[node_id] = node
+
+    def remove(self, node_id: int) -> Dict[str, Any] | None:
+        """Delete ``node_id`` and return its node, if it existed."""
+        by_id = self._index()
+        node = self.nodes.pop(str(node_id), None)
+        if node is not None:
+            self._size -= 1
+        by_id.pop(node_id, None)
+        return node
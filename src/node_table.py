@@ -0,0 +1,157 @@
+"""Columnar copy of the numeric node fields.
+
+Population categories, storage, land and work figures live in the per-node
+dicts the UI edits. Totals over many nodes therefore meant a Python loop
+over those dicts, converting each value on the way.
+
+``NodeTable`` holds such fields as typed columns, one ``array('q')`` per
+field with one row per node. Rows are in the Euler-tour order of
+:class:`HierarchyIndex`, so every subtree is a contiguous run of rows and
+all subtree sums of a column come from a single prefix sum. With NumPy
+installed the sums are computed with it; otherwise plain ``array``
+arithmetic is used.
+
+The node dicts stay the source of truth. Columns are read from them on
+first use, :meth:`NodeTable.update` re-reads the row of an edited node and
+:meth:`NodeTable.refresh` re-reads a whole column. A changed hierarchy needs
+a new table, since the row order follows the tour.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, List, Mapping
+
+from hierarchy_index import HierarchyIndex
+from node_store import NodeStore
+from population_utils import calculate_population_from_fields
+from rollup_policy import STORAGE_RESOURCE_KEYS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+POPULATION_COLUMNS = ("free_peasants", "unfree_peasants", "thralls", "burghers")
+WORK_COLUMNS = (
+    "work_available",
+    "work_needed",
+    "day_laborers_available",
+    "day_laborers_hired",
+    "fishing_boats",
+)
+LAND_COLUMNS = (
+    "jarldom_area",
+    "tunnland",
+    "total_land",
+    "forest_land",
+    "cleared_land",
+    "manor_land",
+    "cultivated_land",
+    "fallow_land",
+)
+NUMERIC_COLUMNS = POPULATION_COLUMNS + STORAGE_RESOURCE_KEYS + WORK_COLUMNS + LAND_COLUMNS
+# Derived column: a node's own population as ``update_population_totals``
+# determines it, i.e. ignoring totals already stored on the node
+BASE_POPULATION = "base_population"
+
+
+def _int_or_zero(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def base_population(node: Mapping[str, Any]) -> int:
+    """Return the population originating on ``node`` alone.
+
+    A stored ``_base_population`` stands in for ``population``, which holds
+    the subtree total once totals have been computed.
+    """
+    if "_base_population" not in node:
+        return calculate_population_from_fields(node)
+    get = node.get
+    return calculate_population_from_fields(
+        {
+            "free_peasants": get("free_peasants", 0),
+            "unfree_peasants": get("unfree_peasants", 0),
+            "thralls": get("thralls", 0),
+            "burghers": get("burghers", 0),
+            "population": node["_base_population"],
+        }
+    )
+
+
+def _read(name: str, node: Mapping[str, Any]) -> int:
+    if name == BASE_POPULATION:
+        return base_population(node)
+    return _int_or_zero(node.get(name, 0))
+
+
+class NodeTable:
+    """Numeric node fields in parallel columns, rows in Euler-tour order."""
+
+    def __init__(self, store: NodeStore, hierarchy: HierarchyIndex) -> None:
+        self.store = store
+        self.hierarchy = hierarchy
+        # Row -> node id; kept so callers can tell when the tour was rebuilt
+        self.order: List[int] = hierarchy.tour_order()
+        self.row_of: Dict[int, int] = {nid: row for row, nid in enumerate(self.order)}
+        self._ends = array(
+            "q", [hierarchy.tour_span(nid)[1] for nid in self.order]
+        )
+        self._columns: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def column(self, name: str) -> array:
+        """Return the column ``name``, reading it from the nodes if needed."""
+        values = self._columns.get(name)
+        if values is None:
+            values = self.refresh(name)
+        return values
+
+    def refresh(self, name: str) -> array:
+        """Re-read column ``name`` from every node."""
+        store = self.store
+        values = array("q", [_read(name, store[nid]) for nid in self.order])
+        self._columns[name] = values
+        return values
+
+    def update(self, node_id: int) -> None:
+        """Re-read every loaded column for the row of ``node_id``."""
+        row = self.row_of.get(node_id)
+        node = self.store.get(node_id)
+        if row is None or node is None:
+            return
+        for name, values in self._columns.items():
+            values[row] = _read(name, node)
+
+    def value(self, name: str, node_id: int) -> int:
+        return self.column(name)[self.row_of[node_id]]
+
+    def subtree_sum(self, name: str, node_id: int) -> int:
+        """Return the sum of column ``name`` over the subtree of ``node_id``."""
+        row = self.row_of.get(node_id)
+        if row is None:
+            return 0
+        values = self.column(name)
+        end = self._ends[row]
+        if np is not None:
+            return int(np.frombuffer(values, dtype=np.int64)[row:end].sum())
+        return sum(values[row:end])
+
+    def subtree_sums(self, name: str) -> array:
+        """Return, for every row, the column sum over that row's subtree."""
+        values = self.column(name)
+        ends = self._ends
+        if np is not None:
+            column = np.frombuffer(values, dtype=np.int64)
+            prefix = np.concatenate(([0], np.cumsum(column)))
+            sums = prefix[np.frombuffer(ends, dtype=np.int64)] - prefix[:-1]
+            return array("q", sums.astype(np.int64).tobytes())
+        prefix = array("q", accumulate(values, initial=0))
+        return array("q", map(int.__sub__, map(prefix.__getitem__, ends), prefix))
@@ -0,0 +1,111 @@
+"""Index of personal provinces by effective owner.
+
+A node belongs to the personal province of the owner it inherits: its own
+``owner_assigned_id`` if it has an assigned owner level, otherwise that of
+its parent. An explicit owner therefore breaks the inheritance for the
+whole subtree below it. Rendering a province used to resolve this by
+walking up from every node of the world.
+
+``OwnerIndex`` resolves every node once, top-down along the Euler tour of
+:class:`HierarchyIndex`, and keeps the members of each province. After the
+owner of a node changes only that node's subtree is resolved again; see
+:meth:`OwnerIndex.update`. ``WorldManager.assign_personal_owner`` and
+``WorldManager.reindex_node`` call it. Owner fields written directly into
+the node dicts are picked up by :meth:`OwnerIndex.sync`. A changed
+hierarchy needs a new index, since the resolution follows the tour.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Set, Tuple
+
+from hierarchy_index import HierarchyIndex
+from node_store import NodeStore, as_node_id
+
+# (owner level, owner id) as assigned on a node; level "none" means inherit
+Assignment = Tuple[str, Any]
+_INHERIT: Assignment = ("none", None)
+
+
+def _assignment(node: Mapping[str, Any]) -> Assignment:
+    level = str(node.get("owner_assigned_level", "none") or "none")
+    if level == "none":
+        return _INHERIT
+    return level, node.get("owner_assigned_id")
+
+
+class OwnerIndex:
+    """Effective owner of every node and the members of every province."""
+
+    def __init__(self, store: NodeStore, hierarchy: HierarchyIndex) -> None:
+        self.store = store
+        self.hierarchy = hierarchy
+        # Tour the index was resolved along; compared to detect rebuilds
+        self.order: List[int] = hierarchy.tour_order()
+        self._assigned: Dict[int, Assignment] = {}
+        self._owner_of: Dict[int, int | None] = {}
+        self._members: Dict[int, Set[int]] = {}
+        self._resolve(self.order)
+
+    def owner_of(self, node_id: int) -> int | None:
+        """Return the owner ``node_id`` belongs to, or ``None``."""
+        return self._owner_of.get(node_id)
+
+    def members(self, owner_id: int) -> Set[int]:
+        """Return the ids of all nodes in the provinces of ``owner_id``."""
+        return self._members.get(owner_id, set())
+
+    def roots(self, owner_id: int) -> List[int]:
+        """Return the topmost node of each province of ``owner_id``."""
+        owner_of = self._owner_of
+        tour_parent = self.hierarchy.tour_parent
+        return [
+            nid
+            for nid in self.members(owner_id)
+            if owner_of.get(tour_parent(nid)) != owner_id
+        ]
+
+    def update(self, node_id: int) -> None:
+        """Re-resolve the subtree of ``node_id`` if its owner changed."""
+        node = self.store.get(node_id)
+        if node is None or _assignment(node) == self._assigned.get(node_id):
+            return
+        self._resolve(self.hierarchy.subtree(node_id))
+
+    def sync(self) -> None:
+        """Pick up owner fields edited directly in the node dicts."""
+        assigned = self._assigned
+        changed = [
+            nid
+            for nid, node in self.store.items()
+            if _assignment(node) != assigned.get(nid)
+        ]
+        # Resolving an ancestor already covers the changed nodes below it
+        for nid in sorted(changed, key=self.hierarchy.tour_span):
+            if _assignment(self.store[nid]) != assigned.get(nid):
+                self._resolve(self.hierarchy.subtree(nid))
+
+    def _resolve(self, node_ids: List[int]) -> None:
+        """Resolve ``node_ids``, given in tour order, from their tour parents."""
+        store = self.store
+        tour_parent = self.hierarchy.tour_parent
+        assigned = self._assigned
+        owner_of = self._owner_of
+        members = self._members
+        for nid in node_ids:
+            assignment = _assignment(store[nid])
+            assigned[nid] = assignment
+            if assignment is _INHERIT:
+                owner = owner_of.get(tour_parent(nid))
+            else:
+                owner = as_node_id(assignment[1])
+            previous = owner_of.get(nid)
+            if nid in owner_of and previous == owner:
+                continue
+            if previous is not None:
+                members[previous].discard(nid)
+                if not members[previous]:
+                    del members[previous]
+            owner_of[nid] = owner
+            if owner is not None:
+                members.setdefault(owner, set()).add(nid)
@@ -0,0 +1,410 @@
+"""Season and year processing as a graph of stages.
+
+``TimeEngine.season_processors`` runs a flat list of callables one after the
+other over the whole world, and the year engine takes a single executor.
+Once the economy runs per node that makes every year as slow as the sum of
+all its steps on one core.
+
+A :class:`Pipeline` holds :class:`Stage` objects that declare which fields
+they read and write. Node fields are named ``"nodes.<field>"``, world-level
+keys by their key; ``"nodes"`` covers every node field. Two stages conflict
+when one writes a field the other reads or writes; conflicting stages run in
+the order they were added, and ``after`` adds explicit dependencies. The
+stages are grouped into waves whose members do not conflict.
+
+A world stage is called as ``run(world, ctx)``. A node stage
+(``per_node=True``) is called as ``run(node, ctx)`` for every node, or every
+node ``select`` accepts; both see only the declared node fields, or the
+whole node if ``"nodes"`` is declared. Node stages
+are split into one partition per duchy subtree (``partition_depth``). With
+``workers`` other than 1 the partitions of a wave go to a process pool, and
+the world stages of the wave run concurrently on a thread pool meanwhile;
+they share the world, so they must stick to the fields they declare. Each
+world stage draws from its own stream and every node from its own
+``rng_for(..., node_id=..., subsystem_tag=<stage name>)`` stream, and results
+are merged in partition order, so the outcome does not depend on the number
+of workers. Stage functions and ``select`` must be module-level functions
+so they can be pickled.
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+from hierarchy_index import HierarchyIndex
+from time_engine import TimeEngine, TimePosition, rng_for
+
+NODE_PREFIX = "nodes."
+# Depth whose subtrees become one partition each: 1 = principality, 2 = duchy
+PARTITION_DEPTH = 2
+# Fields that change the partitions when written
+_HIERARCHY_FIELDS = ("nodes.parent_id", "nodes.children")
+
+# node key -> written field -> value; a declared field missing was removed
+_NodeResults = Dict[str, Dict[str, Any]]
+
+
+@dataclass
+class StageContext:
+    """What a stage knows about the step it runs in.
+
+    ``rng`` is the stage's stream, or for node stages the stream of
+    ``node_id``. ``shared`` holds the world-level fields a node stage reads.
+    """
+
+    stage: str
+    timeline_id: str
+    year: int
+    season: str
+    base_seed: int | None = None
+    shared: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    node_id: int | None = None
+    rng: random.Random | None = None
+
+    def rng_for(self, node_id: int | None = None) -> random.Random:
+        return rng_for(
+            timeline_id=self.timeline_id,
+            year=self.year,
+            season=self.season,
+            node_id=node_id,
+            subsystem_tag=self.stage,
+            base_seed=self.base_seed,
+        )
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+
+
+@dataclass
+class Stage:
+    """One step of a :class:`Pipeline`."""
+
+    name: str
+    run: Callable[[Dict[str, Any], StageContext], None]
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+    after: Tuple[str, ...] = ()
+    per_node: bool = False
+    select: Callable[[Dict[str, Any]], bool] | None = None
+
+    def __post_init__(self) -> None:
+        self.reads = frozenset(self.reads)
+        self.writes = frozenset(self.writes)
+        self.after = tuple(self.after)
+        if self.per_node:
+            outside = sorted(
+                f for f in self.writes if f != "nodes" and not f.startswith(NODE_PREFIX)
+            )
+            if outside:
+                raise ValueError(
+                    f"Node stage '{self.name}' may only write node fields, "
+                    f"not {', '.join(outside)}"
+                )
+
+    @property
+    def node_fields(self) -> List[str] | None:
+        """Return the node fields a node stage sees, or ``None`` for all."""
+        return _node_fields(self.reads | self.writes)
+
+    @property
+    def written_node_fields(self) -> List[str] | None:
+        """Return the node fields a node stage writes, or ``None`` for all."""
+        return _node_fields(self.writes)
+
+    @property
+    def shared_fields(self) -> List[str]:
+        return sorted(f for f in self.reads if f != "nodes" and not f.startswith(NODE_PREFIX))
+
+
+def _node_fields(fields: FrozenSet[str]) -> List[str] | None:
+    if "nodes" in fields:
+        return None
+    return sorted({f[len(NODE_PREFIX):] for f in fields if f.startswith(NODE_PREFIX)})
+
+
+def _project(node: Dict[str, Any], fields: List[str] | None) -> Dict[str, Any]:
+    if fields is None:
+        return dict(node)
+    return {f: node[f] for f in fields if f in node}
+
+
+def _overlaps(a: str, b: str) -> bool:
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+def conflicts(first: Stage, second: Stage) -> bool:
+    """Return ``True`` if the two stages may not run at the same time."""
+    touched = second.reads | second.writes
+    return any(_overlaps(w, f) for w in first.writes for f in touched) or any(
+        _overlaps(r, w) for r in first.reads for w in second.writes
+    )
+
+
+def _run_partition(
+    stage: Stage, ctx: StageContext, nodes: Dict[str, Dict[str, Any]]
+) -> Tuple[_NodeResults, List[Dict[str, Any]]]:
+    """Run a node stage over one partition of projected nodes."""
+    writes = stage.written_node_fields
+    results: _NodeResults = {}
+    for key, node in nodes.items():
+        if stage.select is not None and not stage.select(node):
+            continue
+        ctx.node_id = int(key) if key.isdigit() else None
+        ctx.rng = ctx.rng_for(ctx.node_id)
+        stage.run(node, ctx)
+        results[key] = _project(node, writes)
+    return results, ctx.events
+
+
+def _run_world_stage(
+    stage: Stage, world: Dict[str, Any], step: Tuple[str, int, str, int | None]
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Run a world stage and return its events and the seconds it took."""
+    mark = perf_counter()
+    ctx = StageContext(stage.name, *step)
+    ctx.rng = ctx.rng_for()
+    stage.run(world, ctx)
+    return ctx.events, perf_counter() - mark
+
+
+def partition_nodes(
+    nodes: Dict[str, Any], depth: int = PARTITION_DEPTH
+) -> List[List[str]]:
+    """Split the keys of ``nodes`` into one list per subtree rooted at ``depth``.
+
+    Nodes above ``depth`` or outside the hierarchy form the first partition;
+    the rest follow in order of their root id, each in tour order.
+    """
+    index = HierarchyIndex(nodes)
+    assigned: set[str] = set()
+    subtrees: List[List[str]] = []
+    for root in index.ids_at_depth(depth):
+        keys = [str(nid) for nid in index.subtree(root) if str(nid) not in assigned]
+        if keys:
+            assigned.update(keys)
+            subtrees.append(keys)
+    upper = [
+        key for key, node in nodes.items() if key not in assigned and isinstance(node, dict)
+    ]
+    return ([upper] if upper else []) + subtrees
+
+
+class Pipeline:
+    """Stages scheduled by their declared fields; see the module docstring.
+
+    ``workers`` is the process count for node stages and the thread count
+    for world stages (``None``: one per CPU); ``1`` runs everything in this
+    thread. ``timings`` accumulates the seconds spent per stage. A pipeline
+    is itself a season processor, so it can be passed in
+    ``TimeEngine(season_processors=[...])`` or as ``TimeEngine(pipeline=...)``
+    after the weather roll.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage] = (),
+        workers: int | None = 1,
+        partition_depth: int = PARTITION_DEPTH,
+    ) -> None:
+        self.workers = workers
+        self.partition_depth = partition_depth
+        self.stages: List[Stage] = []
+        self.timings: Dict[str, float] = defaultdict(float)
+        self._waves: List[List[Stage]] | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._threads: ThreadPoolExecutor | None = None
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage) -> Stage:
+        if any(existing.name == stage.name for existing in self.stages):
+            raise ValueError(f"Duplicate stage '{stage.name}'")
+        self.stages.append(stage)
+        self._waves = None
+        return stage
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def waves(self) -> List[List[Stage]]:
+        """Return the stages grouped into waves that may run concurrently.
+
+        Raises ``ValueError`` for unknown or cyclic ``after`` dependencies.
+        """
+        if self._waves is not None:
+            return self._waves
+        position = {stage.name: i for i, stage in enumerate(self.stages)}
+        needs: Dict[int, set[int]] = {i: set() for i in range(len(self.stages))}
+        for i, stage in enumerate(self.stages):
+            for name in stage.after:
+                if name not in position:
+                    raise ValueError(f"Stage '{stage.name}' runs after unknown '{name}'")
+                needs[i].add(position[name])
+            for j in range(i):
+                if conflicts(self.stages[j], stage):
+                    needs[i].add(j)
+        waves: List[List[Stage]] = []
+        done: set[int] = set()
+        while len(done) < len(self.stages):
+            ready = [i for i in needs if i not in done and needs[i] <= done]
+            if not ready:
+                cycle = sorted(self.stages[i].name for i in needs if i not in done)
+                raise ValueError(f"Cyclic stage dependencies: {', '.join(cycle)}")
+            waves.append([self.stages[i] for i in ready])
+            done.update(ready)
+        self._waves = waves
+        return waves
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def run(
+        self,
+        world: Dict[str, Any],
+        timeline_id: str,
+        year: int,
+        season: str,
+        base_seed: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Run every stage on ``world`` in place and return their events."""
+        events: List[Dict[str, Any]] = []
+        partitions: List[List[str]] | None = None
+        for wave in self.waves():
+            if partitions is None and any(stage.per_node for stage in wave):
+                partitions = partition_nodes(world.get("nodes", {}), self.partition_depth)
+            events.extend(
+                self._run_wave(wave, world, partitions, (timeline_id, year, season, base_seed))
+            )
+            if any(_overlaps(w, f) for s in wave for w in s.writes for f in _HIERARCHY_FIELDS):
+                partitions = None
+        return events
+
+    def _run_wave(
+        self,
+        wave: List[Stage],
+        world: Dict[str, Any],
+        partitions: List[List[str]] | None,
+        step: Tuple[str, int, str, int | None],
+    ) -> List[Dict[str, Any]]:
+        nodes = world.get("nodes", {})
+        started: Dict[str, float] = {}
+        pending: Dict[str, List[Any]] = {}
+        # Node stages first, so their partitions run while the world stages
+        # of the wave run; the inputs are copied before those start.
+        for stage in (s for s in wave if s.per_node):
+            started[stage.name] = perf_counter()
+            fields = stage.node_fields
+            ctx = StageContext(stage.name, *step)
+            ctx.shared = {key: copy.deepcopy(world.get(key)) for key in stage.shared_fields}
+            jobs = [
+                {key: _project(nodes[key], fields) for key in keys}
+                for keys in partitions or []
+            ]
+            pool = self._pool() if len(jobs) > 1 else None
+            if pool is not None:
+                pending[stage.name] = [pool.submit(_run_partition, stage, ctx, job) for job in jobs]
+            else:
+                pending[stage.name] = [
+                    _run_partition(stage, copy.deepcopy(ctx), copy.deepcopy(job)) for job in jobs
+                ]
+
+        events: Dict[str, List[Dict[str, Any]]] = {}
+        world_stages = [s for s in wave if not s.per_node]
+        threads = self._thread_pool() if len(world_stages) > 1 else None
+        if threads is not None:
+            runs = [threads.submit(_run_world_stage, s, world, step) for s in world_stages]
+            # Let every stage finish before a failure is raised
+            wait(runs)
+        else:
+            runs = [_run_world_stage(s, world, step) for s in world_stages]
+        for stage, run in zip(world_stages, runs):
+            events[stage.name], seconds = run.result() if isinstance(run, Future) else run
+            self.timings[stage.name] += seconds
+
+        for stage in (s for s in wave if s.per_node):
+            writes = stage.written_node_fields
+            stage_events: List[Dict[str, Any]] = []
+            for part in pending[stage.name]:
+                results, part_events = part.result() if isinstance(part, Future) else part
+                for key, values in results.items():
+                    node = nodes[key]
+                    if writes is None:
+                        node.clear()
+                        node.update(values)
+                        continue
+                    for f in writes:
+                        if f in values:
+                            node[f] = values[f]
+                        else:
+                            node.pop(f, None)
+                stage_events.extend(part_events)
+            events[stage.name] = stage_events
+            self.timings[stage.name] += perf_counter() - started[stage.name]
+        return [event for stage in wave for event in events[stage.name]]
+
+    def __call__(self, engine: TimeEngine, pos: TimePosition, rng: random.Random) -> None:
+        """Run as a season processor of ``engine``."""
+        engine._events.extend(
+            self.run(engine.world_state, engine.timeline_id, pos.year, pos.season, engine.rng_seed)
+        )
+
+    def year_executor(
+        self, year: int, timeline_id: str = "main", base_seed: int | None = None
+    ) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Return an executor for ``time.time_engine.TimeEngine.execute_current_year``.
+
+        The year engine keeps no event log, so stage events are dropped.
+        """
+
+        def executor(state: Dict[str, Any]) -> Dict[str, Any]:
+            self.run(state, timeline_id, year, "year", base_seed)
+            return state
+
+        return executor
+
+    # ------------------------------------------------------------------
+    # Worker pools
+    # ------------------------------------------------------------------
+    def _pool(self) -> ProcessPoolExecutor | None:
+        if self.workers == 1:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _thread_pool(self) -> ThreadPoolExecutor | None:
+        if self.workers == 1:
+            return None
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="pipeline"
+            )
+        return self._threads
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._threads is not None:
+            self._threads.shutdown()
+            self._threads = None
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # A pipeline handed to ensemble workers starts without pools
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_threads"] = None
+        return state
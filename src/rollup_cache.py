@@ -0,0 +1,79 @@
+"""Memoised subtree rollups with per-node version counters.
+
+Showing a node's details runs a :class:`RollupEngine` pass over its whole
+subtree. Browsing back and forth over the same nodes repeats that work,
+although nothing below them changed.
+
+``RollupCache`` keeps the last :class:`NodeRollup` of every node together
+with the node's *subtree version* at the time it was computed. A change to a
+node bumps the version of that node and of every ancestor, since those are
+the only subtrees whose totals include it; cached entries with an older
+version are then recomputed on next use. A pass computed for one node also
+fills the cache for all its descendants, so opening the children of a node
+already shown is a lookup.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from rollup_engine import NodeRollup
+
+
+class RollupCache:
+    """Cache of :class:`NodeRollup` results keyed by node id.
+
+    ``nodes`` is the node dict the entries were computed from; callers
+    replace the cache when the world's node dict is replaced.
+    """
+
+    def __init__(self, nodes: Dict[str, Any]) -> None:
+        self.nodes = nodes
+        self._versions: Dict[int, int] = {}
+        self._entries: Dict[int, Tuple[int, NodeRollup]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version_of(self, node_id: int) -> int:
+        """Return the current subtree version of ``node_id``."""
+        return self._versions.get(node_id, 0)
+
+    def get(
+        self, node_id: int, compute: Callable[[int], Dict[int, NodeRollup]]
+    ) -> NodeRollup:
+        """Return the rollup for ``node_id``, computing it if stale.
+
+        ``compute`` takes a node id and returns rollups for that node and its
+        descendants, as :meth:`RollupEngine.run` does. Every result it
+        returns is cached.
+        """
+        entry = self._entries.get(node_id)
+        versions = self._versions
+        if entry is not None and entry[0] == versions.get(node_id, 0):
+            self.hits += 1
+            # A copy, so callers cannot change the cached totals
+            return entry[1].copy()
+        self.misses += 1
+        results = compute(node_id)
+        entries = self._entries
+        for nid, result in results.items():
+            entries[nid] = (versions.get(nid, 0), result)
+        result = results.get(node_id)
+        return result.copy() if result is not None else NodeRollup()
+
+    def invalidate(self, node_ids: Iterable[int]) -> None:
+        """Mark the subtrees rooted at ``node_ids`` as changed.
+
+        Pass a changed node together with all its ancestors.
+        """
+        versions = self._versions
+        for nid in node_ids:
+            versions[nid] = versions.get(nid, 0) + 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the hierarchy itself changed."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of cached entries."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
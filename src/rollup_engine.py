@@ -0,0 +1,168 @@
+"""Single-pass rollup of every subtree aggregate.
+
+``WorldManager`` has one recursive walk per aggregate (work available, work
+needed, umbäranden, license income, resources, storage), so a view showing
+several of them walks the same subtree several times. ``RollupEngine`` visits
+each node of a subtree once, children before parents, adds the node's local
+contributions from :mod:`rollup_policy` and folds the result into its parent.
+
+The result is a table with one :class:`NodeRollup` per node in the subtree,
+so the aggregates of every descendant come out of the same pass.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Mapping
+
+from constants import CRAFTSMAN_LICENSE_FEES, DAGSVERKEN_UMBARANDE
+from hierarchy_index import HierarchyIndex
+from node_store import NodeStore
+from rollup_policy import (
+    STORAGE_RESOURCE_KEYS,
+    get_local_population_contribution,
+    get_local_storage_contribution,
+    get_local_work_available_contribution,
+    get_local_work_needed_contribution,
+    has_local_storage,
+)
+
+
+def _int_or_zero(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _add_counts(target: Dict[str, int], source: Mapping[str, int]) -> None:
+    for key, amount in source.items():
+        target[key] = target.get(key, 0) + amount
+
+
+@dataclass
+class NodeRollup:
+    """Aggregates for one node and everything below it.
+
+    ``storage`` only holds the resource keys with a non-zero total; use
+    :meth:`storage_report` for the full ``get_storage_report`` layout.
+    """
+
+    population: int = 0
+    work_available: int = 0
+    work_needed: int = 0
+    umbarande: int = 0
+    license_income: int = 0
+    craftsman_license: int = 0
+    soldiers: Dict[str, int] = field(default_factory=dict)
+    characters: Dict[str, int] = field(default_factory=dict)
+    animals: Dict[str, int] = field(default_factory=dict)
+    buildings: Dict[str, int] = field(default_factory=dict)
+    storage: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, other: "NodeRollup") -> None:
+        """Fold the aggregates of a child into this one."""
+        # Spelled out rather than looped: this runs once per node
+        self.population += other.population
+        self.work_available += other.work_available
+        self.work_needed += other.work_needed
+        self.umbarande += other.umbarande
+        self.license_income += other.license_income
+        self.craftsman_license += other.craftsman_license
+        if other.soldiers:
+            _add_counts(self.soldiers, other.soldiers)
+        if other.characters:
+            _add_counts(self.characters, other.characters)
+        if other.animals:
+            _add_counts(self.animals, other.animals)
+        if other.buildings:
+            _add_counts(self.buildings, other.buildings)
+        if other.storage:
+            _add_counts(self.storage, other.storage)
+
+    def copy(self) -> "NodeRollup":
+        """Return a copy that shares no mutable state with this one."""
+        return replace(
+            self,
+            soldiers=dict(self.soldiers),
+            characters=dict(self.characters),
+            animals=dict(self.animals),
+            buildings=dict(self.buildings),
+            storage=dict(self.storage),
+        )
+
+    def storage_report(self) -> Dict[str, int]:
+        """Return storage totals with every resource key present."""
+        return {key: self.storage.get(key, 0) for key in STORAGE_RESOURCE_KEYS}
+
+    def resources(self) -> Dict[str, Any]:
+        """Return the totals in the ``calculate_total_resources`` layout."""
+        return {
+            "population": self.population,
+            "soldiers": dict(self.soldiers),
+            "characters": dict(self.characters),
+            "animals": dict(self.animals),
+            "buildings": dict(self.buildings),
+        }
+
+
+def local_rollup(node: Mapping[str, Any], depth: int) -> NodeRollup:
+    """Return the contributions originating on ``node`` alone."""
+    get = node.get
+    result = NodeRollup(
+        get_local_population_contribution(node),
+        get_local_work_available_contribution(node, depth=depth),
+        get_local_work_needed_contribution(node, depth=depth),
+        DAGSVERKEN_UMBARANDE.get(get("dagsverken", "normalt"), 0)
+        + _int_or_zero(get("weather_effect", 0)),
+        _int_or_zero(get("expected_license_income", 0)),
+    )
+    # Most nodes have none of the entry lists; skip the loops for them
+    for name, counts in (
+        ("soldiers", result.soldiers),
+        ("animals", result.animals),
+        ("buildings", result.buildings),
+    ):
+        for entry in get(name) or ():
+            kind = entry.get("type")
+            if kind:
+                counts[kind] = counts.get(kind, 0) + _int_or_zero(entry.get("count"))
+    for entry in get("characters") or ():
+        kind = entry.get("type")
+        if kind:
+            result.characters[kind] = result.characters.get(kind, 0) + 1
+    for entry in get("craftsmen") or ():
+        fee = CRAFTSMAN_LICENSE_FEES.get(entry.get("type"), 0)
+        result.craftsman_license += fee * _int_or_zero(entry.get("count", 0))
+    if has_local_storage(node):
+        for key in STORAGE_RESOURCE_KEYS:
+            amount = get_local_storage_contribution(node, key, depth=depth)
+            if amount:
+                result.storage[key] = amount
+    return result
+
+
+class RollupEngine:
+    """Compute all subtree aggregates with one post-order traversal."""
+
+    def __init__(self, nodes: NodeStore, hierarchy: HierarchyIndex) -> None:
+        self.nodes = nodes
+        self.hierarchy = hierarchy
+
+    def run(self, root_id: int) -> Dict[int, NodeRollup]:
+        """Return a :class:`NodeRollup` for ``root_id`` and each descendant.
+
+        Nodes reachable through more than one parent (or a cycle) are
+        counted once, under the parent they were first reached from.
+        """
+        hierarchy = self.hierarchy
+        nodes = self.nodes
+        results: Dict[int, NodeRollup] = {}
+        finished_children: Dict[int, List[int]] = {}
+        for node_id, parent_id in hierarchy.post_order(root_id):
+            result = local_rollup(nodes[node_id], hierarchy.depth_of(node_id))
+            for child_id in finished_children.pop(node_id, ()):
+                result.add(results[child_id])
+            results[node_id] = result
+            finished_children.setdefault(parent_id, []).append(node_id)
+        return results
@@ -57,6 +57,11 @@ def get_local_population_contribution(node: Mapping[str, Any]) -> int:
     return _non_negative_int(node.get("population"))
 
 
+def has_local_storage(node: Mapping[str, Any]) -> bool:
+    """Return whether ``node`` can contribute physical storage at all."""
+    return node.get("res_type") in PHYSICAL_STORAGE_NODE_TYPES
+
+
 def get_local_storage_contribution(
     node: Mapping[str, Any],
     resource_key: str,
@@ -67,7 +72,7 @@ def get_local_storage_contribution(
     del depth
     if resource_key not in STORAGE_RESOURCE_KEYS:
         return 0
-    if node.get("res_type") not in PHYSICAL_STORAGE_NODE_TYPES:
+    if not has_local_storage(node):
         return 0
     return _non_negative_int(node.get(resource_key))
 
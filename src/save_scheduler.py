@@ -0,0 +1,146 @@
+"""Debounced saving on a background thread.
+
+Autosaving every edited field from the Tk thread stalls the UI on disk I/O.
+``SaveScheduler`` collects save requests for a short window and, once the
+window has passed without new requests, prepares them on the Tk thread
+(taking a snapshot of the data) and hands the resulting write jobs to a
+single worker thread. Jobs run in the order they were queued, so an older
+snapshot can never overwrite a newer one.
+
+Failures are collected on the worker and reported through
+:class:`StatusService` from the Tk thread.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict
+
+# Coalescing window for bursts of edits, in milliseconds
+DEFAULT_SAVE_DELAY_MS = 400
+# How often the Tk thread checks for finished jobs while the worker is busy
+_POLL_INTERVAL_MS = 100
+
+Job = Callable[[], Any]
+
+
+class SaveScheduler:
+    """Coalesce save requests and write them off the Tk main loop.
+
+    ``root`` is any Tk widget and is only used for ``after`` timers. Without
+    a ``root`` requests are written immediately on the calling thread, which
+    keeps tests and headless use synchronous.
+    """
+
+    def __init__(
+        self,
+        root=None,
+        delay_ms: int = DEFAULT_SAVE_DELAY_MS,
+        status_service=None,
+    ) -> None:
+        self.root = root
+        self.delay_ms = delay_ms
+        self.status_service = status_service
+        self._pending: Dict[Any, Callable[[], Job]] = {}
+        self._timer = None
+        self._poll_timer = None
+        self._jobs: "queue.Queue[Job]" = queue.Queue()
+        self._errors: "queue.Queue[Exception]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+    def schedule(self, key: Any, prepare: Callable[[], Job]) -> None:
+        """Request a save identified by ``key``.
+
+        ``prepare`` runs on the Tk thread when the window closes and returns
+        the job that performs the write. Requests with the same key inside
+        one window are merged; the last ``prepare`` wins.
+        """
+        self._pending[key] = prepare
+        if self.root is None:
+            self.run_pending()
+            return
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = self.root.after(self.delay_ms, self._on_timer)
+
+    def has_pending(self) -> bool:
+        return bool(self._pending) or self._jobs.unfinished_tasks > 0
+
+    def run_pending(self) -> None:
+        """Prepare all pending requests now and queue their jobs."""
+        if self._timer is not None and self.root is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for prepare in pending.values():
+            try:
+                job = prepare()
+            except Exception as e:
+                self._report(e)
+                continue
+            if self.root is None:
+                try:
+                    job()
+                except Exception as e:
+                    self._report(e)
+            else:
+                self._jobs.put(job)
+                self._ensure_worker()
+                self._ensure_polling()
+
+    def flush(self) -> None:
+        """Write everything pending and block until the worker is idle.
+
+        Intended for shutdown and other points where data must be on disk.
+        """
+        self.run_pending()
+        self._jobs.join()
+        self._drain_errors()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.run_pending()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run_worker, name="save-worker", daemon=True
+            )
+            self._worker.start()
+
+    def _run_worker(self) -> None:
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception as e:
+                self._errors.put(e)
+            finally:
+                self._jobs.task_done()
+
+    def _ensure_polling(self) -> None:
+        if self._poll_timer is None:
+            self._poll_timer = self.root.after(_POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self) -> None:
+        self._poll_timer = None
+        self._drain_errors()
+        if self._jobs.unfinished_tasks > 0:
+            self._ensure_polling()
+
+    def _drain_errors(self) -> None:
+        while True:
+            try:
+                error = self._errors.get_nowait()
+            except queue.Empty:
+                return
+            self._report(error)
+
+    def _report(self, error: Exception) -> None:
+        print(f"Error saving worlds: {error}")
+        if self.status_service is not None:
+            self.status_service.add_message(f"Sparfel: kunde inte spara ({error})")
@@ -0,0 +1,646 @@
+"""SQLite backed ``WorldInterface`` for very large worlds.
+
+``SqliteWorld`` keeps one world in a database file instead of an in-memory
+``world_data`` dict. Every node is stored as a JSON blob alongside the columns
+that hierarchy queries need (``parent_id``, ``depth``, ``res_type`` and
+``owner_assigned_id``), each of which is indexed. Characters, neighbour links,
+``title_seats`` and ``jarldom_owners`` get their own tables so that subtree
+walks, level listings and relation lookups run as indexed queries rather
+than scans over every node.
+
+Each mutating method runs in its own transaction and is committed before it
+returns.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from node import Node, NodeView
+from world_interface import WorldInterface
+from world_manager import WorldManager
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    depth INTEGER NOT NULL,
+    res_type TEXT,
+    owner_assigned_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_parent_idx ON nodes (parent_id);
+CREATE INDEX IF NOT EXISTS nodes_depth_idx ON nodes (depth);
+CREATE INDEX IF NOT EXISTS nodes_res_type_idx ON nodes (res_type);
+CREATE INDEX IF NOT EXISTS nodes_owner_idx ON nodes (owner_assigned_id);
+CREATE TABLE IF NOT EXISTS characters (
+    char_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS neighbors (
+    node_id INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    neighbor_id INTEGER NOT NULL,
+    border TEXT,
+    PRIMARY KEY (node_id, slot)
+);
+CREATE INDEX IF NOT EXISTS neighbors_target_idx ON neighbors (neighbor_id);
+CREATE TABLE IF NOT EXISTS title_seats (
+    title_id INTEGER PRIMARY KEY,
+    jarldom_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS title_seats_jarldom_idx ON title_seats (jarldom_id);
+CREATE TABLE IF NOT EXISTS jarldom_owners (
+    jarldom_id INTEGER PRIMARY KEY,
+    character_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jarldom_owners_character_idx
+    ON jarldom_owners (character_id);
+"""
+
+# Top level keys stored in their own tables rather than in ``meta``
+_TABLE_KEYS = {"nodes", "characters", "title_seats", "jarldom_owners"}
+
+
+def _as_id(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def _compute_depths(nodes: Dict[int, Dict[str, Any]]) -> Dict[int, int]:
+    """Return depths using the same rules as ``WorldManager.get_depth_of_node``."""
+    depths: Dict[int, int] = {}
+    for node_id in nodes:
+        depth = 0
+        current = node_id
+        visited = {current}
+        while True:
+            parent_id = _as_id(nodes[current].get("parent_id"))
+            if parent_id is None or parent_id not in nodes:
+                break
+            depth += 1
+            current = parent_id
+            if current in visited:
+                depth = -99
+                break
+            visited.add(current)
+            if depth > 50:
+                depth = -100
+                break
+        depths[node_id] = depth
+    return depths
+
+
+class SqliteWorld(WorldInterface):
+    """``WorldInterface`` implementation storing one world in SQLite."""
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        super().__init__()
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (json.dumps(SCHEMA_VERSION),),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a cursor and commit on success, roll back on error."""
+        with self.conn:
+            yield self.conn.cursor()
+
+    # -------------------------------------------
+    # Import / export
+    # -------------------------------------------
+    @classmethod
+    def from_world_data(
+        cls, world_data: Dict[str, Any], path: str | Path = ":memory:"
+    ) -> "SqliteWorld":
+        world = cls(path)
+        world.import_world(world_data)
+        return world
+
+    def import_world(self, world_data: Dict[str, Any]) -> None:
+        """Replace the stored world with ``world_data`` in one transaction."""
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for raw_id, node in world_data.get("nodes", {}).items():
+            node_id = _as_id(raw_id)
+            if node_id is not None and isinstance(node, dict):
+                nodes[node_id] = node
+        depths = _compute_depths(nodes)
+
+        with self.transaction() as cur:
+            for table in (
+                "nodes",
+                "characters",
+                "neighbors",
+                "title_seats",
+                "jarldom_owners",
+            ):
+                cur.execute(f"DELETE FROM {table}")
+            cur.execute("DELETE FROM meta WHERE key != 'schema_version'")
+            cur.executemany(
+                "INSERT INTO nodes (node_id, parent_id, depth, res_type,"
+                " owner_assigned_id, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._node_row(node_id, node, depths[node_id])
+                    for node_id, node in nodes.items()
+                ),
+            )
+            for node_id, node in nodes.items():
+                self._write_neighbors(cur, node_id, node)
+            cur.executemany(
+                "INSERT INTO characters (char_id, data) VALUES (?, ?)",
+                (
+                    (char_id, json.dumps(char, ensure_ascii=False))
+                    for raw_id, char in world_data.get("characters", {}).items()
+                    if (char_id := _as_id(raw_id)) is not None
+                ),
+            )
+            cur.executemany(
+                "INSERT INTO title_seats (title_id, jarldom_id) VALUES (?, ?)",
+                self._relation_rows(world_data.get("title_seats", {})),
+            )
+            cur.executemany(
+                "INSERT INTO jarldom_owners (jarldom_id, character_id) VALUES (?, ?)",
+                self._relation_rows(world_data.get("jarldom_owners", {})),
+            )
+            cur.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                (
+                    (key, json.dumps(value, ensure_ascii=False))
+                    for key, value in world_data.items()
+                    if key not in _TABLE_KEYS
+                ),
+            )
+
+    def export_world(self) -> Dict[str, Any]:
+        """Return the stored world as a regular ``world_data`` dict."""
+        cur = self.conn.cursor()
+        world_data: Dict[str, Any] = {
+            key: json.loads(value)
+            for key, value in cur.execute("SELECT key, value FROM meta")
+            if key != "schema_version"
+        }
+        world_data["nodes"] = {
+            str(node_id): json.loads(data)
+            for node_id, data in cur.execute(
+                "SELECT node_id, data FROM nodes ORDER BY node_id"
+            )
+        }
+        world_data["characters"] = {
+            str(char_id): json.loads(data)
+            for char_id, data in cur.execute(
+                "SELECT char_id, data FROM characters ORDER BY char_id"
+            )
+        }
+        seats = {
+            str(title_id): str(jarldom_id)
+            for title_id, jarldom_id in cur.execute(
+                "SELECT title_id, jarldom_id FROM title_seats ORDER BY title_id"
+            )
+        }
+        if seats:
+            world_data["title_seats"] = seats
+        owners = {
+            str(jarldom_id): str(character_id)
+            for jarldom_id, character_id in cur.execute(
+                "SELECT jarldom_id, character_id FROM jarldom_owners"
+                " ORDER BY jarldom_id"
+            )
+        }
+        if owners:
+            world_data["jarldom_owners"] = owners
+        return world_data
+
+    @staticmethod
+    def _node_row(node_id: int, node: Dict[str, Any], depth: int) -> tuple:
+        return (
+            node_id,
+            _as_id(node.get("parent_id")),
+            depth,
+            node.get("res_type"),
+            _as_id(node.get("owner_assigned_id")),
+            json.dumps(node, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _relation_rows(mapping: Any) -> List[tuple[int, int]]:
+        if not isinstance(mapping, dict):
+            return []
+        return [
+            (source_id, target_id)
+            for raw_source, raw_target in mapping.items()
+            if (source_id := _as_id(raw_source)) is not None
+            if (target_id := _as_id(raw_target)) is not None
+        ]
+
+    @staticmethod
+    def _write_neighbors(
+        cur: sqlite3.Cursor, node_id: int, node: Dict[str, Any]
+    ) -> None:
+        cur.execute("DELETE FROM neighbors WHERE node_id = ?", (node_id,))
+        neighbors = node.get("neighbors")
+        if not isinstance(neighbors, list):
+            return
+        cur.executemany(
+            "INSERT INTO neighbors (node_id, slot, neighbor_id, border)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                (node_id, slot, neighbor_id, entry.get("border"))
+                for slot, entry in enumerate(neighbors)
+                if isinstance(entry, dict)
+                if (neighbor_id := _as_id(entry.get("id"))) is not None
+            ),
+        )
+
+    # -------------------------------------------
+    # Node access
+    # -------------------------------------------
+    def get_node(self, node_id: int) -> Dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT data FROM nodes WHERE node_id = ?", (int(node_id),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def node_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def put_node(self, node: Dict[str, Any]) -> None:
+        """Insert or replace ``node``, keeping depths of its subtree current."""
+        with self.transaction() as cur:
+            self._put_node(cur, node)
+
+    def _put_node(self, cur: sqlite3.Cursor, node: Dict[str, Any]) -> None:
+        node_id = int(node["node_id"])
+        parent_id = _as_id(node.get("parent_id"))
+        row = cur.execute(
+            "SELECT parent_id FROM nodes WHERE node_id = ?", (node_id,)
+        ).fetchone()
+        depth = self._depth_below(cur, parent_id)
+        cur.execute(
+            "INSERT OR REPLACE INTO nodes (node_id, parent_id, depth, res_type,"
+            " owner_assigned_id, data) VALUES (?, ?, ?, ?, ?, ?)",
+            self._node_row(node_id, node, depth),
+        )
+        self._write_neighbors(cur, node_id, node)
+        if row is not None and row[0] != parent_id:
+            self._refresh_subtree_depths(cur, node_id, depth)
+
+    def set_node_field(self, node_id: int, key: str, value: Any) -> None:
+        """Update one field of a stored node in its own transaction."""
+        node = self.get_node(node_id)
+        if node is None:
+            raise KeyError(node_id)
+        node[key] = value
+        self.put_node(node)
+
+    def _next_node_id(self) -> int:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'next_node_id'"
+        ).fetchone()
+        stored = json.loads(row[0]) if row else 1
+        max_id = self.conn.execute("SELECT MAX(node_id) FROM nodes").fetchone()[0]
+        return max(int(stored or 1), (max_id or 0) + 1)
+
+    def _working_set(self, node_ids: List[int]) -> WorldManager:
+        """Return a ``WorldManager`` over just ``node_ids``.
+
+        The editing rules stay in ``WorldManager``; depths come from the
+        database so the loaded nodes do not need their ancestors.
+        """
+        nodes = {
+            str(nid): node
+            for nid in node_ids
+            if (node := self.get_node(nid)) is not None
+        }
+        manager = WorldManager(
+            {"nodes": nodes, "characters": {}, "next_node_id": self._next_node_id()}
+        )
+        for nid in nodes:
+            manager.hierarchy.set_depth(int(nid), self.get_depth_of_node(int(nid)))
+        return manager
+
+    def _store_working_set(
+        self, manager: WorldManager, removed_ids: List[int] | None = None
+    ) -> None:
+        nodes = manager.world_data["nodes"]
+        with self.transaction() as cur:
+            if removed_ids:
+                cur.executemany(
+                    "DELETE FROM nodes WHERE node_id = ?",
+                    ((nid,) for nid in removed_ids),
+                )
+                cur.executemany(
+                    "DELETE FROM neighbors WHERE node_id = ?",
+                    ((nid,) for nid in removed_ids),
+                )
+            # New nodes always get higher ids than their parents
+            for nid in sorted(nodes, key=int):
+                self._put_node(cur, nodes[nid])
+            cur.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_node_id', ?)",
+                (json.dumps(manager.world_data["next_node_id"]),),
+            )
+
+    def get_display_name_for_node(
+        self, node_data: Dict[str, Any] | Any, depth: int
+    ) -> str:
+        """Return the same display name ``WorldManager`` would produce."""
+        if isinstance(node_data, NodeView):
+            node_data = node_data.data
+        if isinstance(node_data, Node):
+            parent_id, ruler_id = node_data.parent_id, node_data.ruler_id
+        else:
+            parent_id, ruler_id = node_data.get("parent_id"), node_data.get("ruler_id")
+        world_data: Dict[str, Any] = {"nodes": {}, "characters": {}}
+        parent = self.get_node(parent_id) if _as_id(parent_id) is not None else None
+        if parent:
+            world_data["nodes"][str(parent_id)] = parent
+        ruler = self.get_character(ruler_id) if _as_id(ruler_id) is not None else None
+        if ruler:
+            world_data["characters"][str(ruler_id)] = ruler
+        return WorldManager(world_data).get_display_name_for_node(node_data, depth)
+
+    def update_subfiefs_for_node(self, node_data: Dict[str, Any]) -> None:
+        """Create or remove children of ``node_data`` to match ``num_subfiefs``."""
+        node_id = int(node_data["node_id"])
+        before = self.subtree_ids(node_id)
+        manager = self._working_set(before)
+        manager.node_store.add(node_id, node_data)
+        manager.update_subfiefs_for_node(node_data)
+        remaining = {int(nid) for nid in manager.world_data["nodes"]}
+        self._store_working_set(
+            manager, [nid for nid in before if nid not in remaining]
+        )
+
+    def attempt_link_neighbors(
+        self,
+        node_id1: int,
+        node_id2: int,
+        slot1: int | None = None,
+        slot2: int | None = None,
+    ) -> tuple[bool, str]:
+        manager = self._working_set([node_id1, node_id2])
+        ok, msg = manager.attempt_link_neighbors(node_id1, node_id2, slot1, slot2)
+        if ok:
+            self._store_working_set(manager)
+        return ok, msg
+
+    def delete_node_and_descendants(self, node_id: int) -> int:
+        """Delete ``node_id`` and its subtree. Returns the number removed."""
+        ids = self.subtree_ids(node_id)
+        if not ids:
+            return 0
+        node = self.get_node(node_id)
+        with self.transaction() as cur:
+            cur.executemany(
+                "DELETE FROM nodes WHERE node_id = ?", ((nid,) for nid in ids)
+            )
+            cur.executemany(
+                "DELETE FROM neighbors WHERE node_id = ?", ((nid,) for nid in ids)
+            )
+            parent_id = _as_id(node.get("parent_id")) if node else None
+            parent_row = (
+                cur.execute(
+                    "SELECT data FROM nodes WHERE node_id = ?", (parent_id,)
+                ).fetchone()
+                if parent_id is not None
+                else None
+            )
+            if parent_row:
+                parent = json.loads(parent_row[0])
+                parent["children"] = [
+                    child
+                    for child in parent.get("children", [])
+                    if _as_id(child) != node_id
+                ]
+                cur.execute(
+                    "UPDATE nodes SET data = ? WHERE node_id = ?",
+                    (json.dumps(parent, ensure_ascii=False), parent_id),
+                )
+        return len(ids)
+
+    def _depth_below(self, cur: sqlite3.Cursor, parent_id: int | None) -> int:
+        if parent_id is None:
+            return 0
+        row = cur.execute(
+            "SELECT depth FROM nodes WHERE node_id = ?", (parent_id,)
+        ).fetchone()
+        return row[0] + 1 if row else 0
+
+    def _refresh_subtree_depths(
+        self, cur: sqlite3.Cursor, node_id: int, depth: int
+    ) -> None:
+        cur.execute(
+            """
+            WITH RECURSIVE sub(node_id, depth) AS (
+                SELECT node_id, ? FROM nodes WHERE node_id = ?
+                UNION
+                SELECT n.node_id, sub.depth + 1
+                FROM nodes n JOIN sub ON n.parent_id = sub.node_id
+                WHERE sub.depth < 50
+            )
+            UPDATE nodes SET depth = (
+                SELECT depth FROM sub WHERE sub.node_id = nodes.node_id
+            )
+            WHERE node_id IN (SELECT node_id FROM sub)
+            """,
+            (depth, node_id),
+        )
+
+    # -------------------------------------------
+    # WorldInterface implementation and hierarchy queries
+    # -------------------------------------------
+    def get_depth_of_node(self, node_id: int) -> int:
+        row = self.conn.execute(
+            "SELECT depth FROM nodes WHERE node_id = ?", (int(node_id),)
+        ).fetchone()
+        return row[0] if row else -1
+
+    def get_children(self, node_id: int) -> List[NodeView]:
+        """Return :class:`NodeView` proxies for the direct children of ``node_id``."""
+        return [
+            NodeView(json.loads(data))
+            for (data,) in self.conn.execute(
+                "SELECT data FROM nodes WHERE parent_id = ? ORDER BY node_id",
+                (int(node_id),),
+            )
+        ]
+
+    def subtree_ids(self, node_id: int) -> List[int]:
+        """Return ``node_id`` and all descendant ids in one recursive query."""
+        return [
+            nid
+            for (nid,) in self.conn.execute(
+                """
+                WITH RECURSIVE sub(node_id) AS (
+                    SELECT node_id FROM nodes WHERE node_id = ?
+                    UNION
+                    SELECT n.node_id FROM nodes n
+                    JOIN sub ON n.parent_id = sub.node_id
+                )
+                SELECT node_id FROM sub
+                """,
+                (int(node_id),),
+            )
+        ]
+
+    def count_descendants(self, node_id: int) -> int:
+        return max(len(self.subtree_ids(node_id)) - 1, 0)
+
+    def nodes_at_depth(self, depth: int) -> List[Dict[str, Any]]:
+        """Return node dicts at ``depth`` ordered by id."""
+        return [
+            json.loads(data)
+            for (data,) in self.conn.execute(
+                "SELECT data FROM nodes WHERE depth = ? ORDER BY node_id",
+                (int(depth),),
+            )
+        ]
+
+    def nodes_by_res_type(self, res_type: str) -> List[Dict[str, Any]]:
+        return [
+            json.loads(data)
+            for (data,) in self.conn.execute(
+                "SELECT data FROM nodes WHERE res_type = ? ORDER BY node_id",
+                (res_type,),
+            )
+        ]
+
+    def nodes_owned_by(self, owner_id: int) -> List[Dict[str, Any]]:
+        """Return nodes whose ``owner_assigned_id`` is ``owner_id``."""
+        return [
+            json.loads(data)
+            for (data,) in self.conn.execute(
+                "SELECT data FROM nodes WHERE owner_assigned_id = ?"
+                " ORDER BY node_id",
+                (int(owner_id),),
+            )
+        ]
+
+    def neighbor_ids(self, node_id: int) -> List[int]:
+        return [
+            nid
+            for (nid,) in self.conn.execute(
+                "SELECT neighbor_id FROM neighbors WHERE node_id = ? ORDER BY slot",
+                (int(node_id),),
+            )
+        ]
+
+    def nodes_bordering(self, node_id: int) -> List[int]:
+        """Return ids of nodes that list ``node_id`` as a neighbour."""
+        return [
+            nid
+            for (nid,) in self.conn.execute(
+                "SELECT DISTINCT node_id FROM neighbors WHERE neighbor_id = ?"
+                " ORDER BY node_id",
+                (int(node_id),),
+            )
+        ]
+
+    # -------------------------------------------
+    # Characters
+    # -------------------------------------------
+    def get_character(self, char_id: int) -> Dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT data FROM characters WHERE char_id = ?", (int(char_id),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_character(self, char_id: int, data: Dict[str, Any]) -> None:
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO characters (char_id, data) VALUES (?, ?)",
+                (int(char_id), json.dumps(data, ensure_ascii=False)),
+            )
+
+    # -------------------------------------------
+    # Relations (see ``world_relations``)
+    # -------------------------------------------
+    def get_title_seat(self, title_id: Any) -> Optional[int]:
+        wanted = _as_id(title_id)
+        if wanted is None:
+            return None
+        row = self.conn.execute(
+            "SELECT jarldom_id FROM title_seats WHERE title_id = ?", (wanted,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_seated_title(self, jarldom_id: Any) -> Optional[int]:
+        wanted = _as_id(jarldom_id)
+        if wanted is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT title_id FROM title_seats WHERE jarldom_id = ? LIMIT 2",
+            (wanted,),
+        ).fetchall()
+        return rows[0][0] if len(rows) == 1 else None
+
+    def get_jarldom_owner(self, jarldom_id: Any) -> Optional[int]:
+        wanted = _as_id(jarldom_id)
+        if wanted is None:
+            return None
+        row = self.conn.execute(
+            "SELECT character_id FROM jarldom_owners WHERE jarldom_id = ?",
+            (wanted,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_owned_jarldoms(self, character_id: Any) -> List[int]:
+        wanted = _as_id(character_id)
+        if wanted is None:
+            return []
+        return [
+            jid
+            for (jid,) in self.conn.execute(
+                "SELECT jarldom_id FROM jarldom_owners WHERE character_id = ?"
+                " ORDER BY jarldom_id",
+                (wanted,),
+            )
+        ]
+
+    def set_title_seat(self, title_id: int, jarldom_id: int | None) -> None:
+        """Set or clear (``None``) the seat of ``title_id``."""
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM title_seats WHERE title_id = ?", (title_id,))
+            if jarldom_id is not None:
+                cur.execute(
+                    "INSERT INTO title_seats (title_id, jarldom_id) VALUES (?, ?)",
+                    (title_id, jarldom_id),
+                )
+
+    def set_jarldom_owner(self, jarldom_id: int, character_id: int | None) -> None:
+        """Set or clear (``None``) the owner of ``jarldom_id``."""
+        with self.transaction() as cur:
+            cur.execute(
+                "DELETE FROM jarldom_owners WHERE jarldom_id = ?", (jarldom_id,)
+            )
+            if character_id is not None:
+                cur.execute(
+                    "INSERT INTO jarldom_owners (jarldom_id, character_id)"
+                    " VALUES (?, ?)",
+                    (jarldom_id, character_id),
+                )
@@ -4,6 +4,8 @@ import copy
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, Iterable, List
 
+from time.year_store import KEYFRAME_INTERVAL, YearStore
+
 
 @dataclass(frozen=True)
 class YearPosition:
@@ -18,15 +20,21 @@ class YearEntry:
 
 
 class TimeEngine:
-    """Year-based timeline manager with per-year snapshots."""
+    """Year-based timeline manager with per-year snapshots.
+
+    ``history`` and ``planning_state`` map years to world states. They are
+    :class:`YearStore` instances, which keep keyframes plus diffs instead of
+    a full copy per year; reading a year returns a fresh copy.
+    """
 
     STATUS_LOCKED = "locked"
     STATUS_PLANNING = "planning"
     STATUS_UNCREATED = "uncreated"
 
-    def __init__(self, start_year: int = 1):
-        self.history: Dict[int, Dict[str, Any]] = {}
-        self.planning_state: Dict[int, Dict[str, Any]] = {}
+    def __init__(self, start_year: int = 1, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.history = YearStore(keyframe_interval)
+        self.planning_state = YearStore(keyframe_interval)
         self.current_year: int = start_year
         self.world_state: Dict[str, Any] | None = None
         self._last_recorded_year: int | None = None
@@ -63,10 +71,9 @@ class TimeEngine:
         self._ensure_planning_state(year)
         self.current_year = year
         if year in self.history:
-            self.world_state = copy.deepcopy(self.history[year])
+            self.world_state = self.history[year]
         else:
-            state = self.planning_state.get(year)
-            self.world_state = copy.deepcopy(state) if state is not None else None
+            self.world_state = self.planning_state.get(year)
         return self.world_state
 
     def prev_year(self) -> YearPosition:
@@ -84,12 +91,12 @@ class TimeEngine:
         if world_data is None:
             return
         snapshot = copy.deepcopy(world_data)
-        self.planning_state[self.current_year] = snapshot
-        self.world_state = snapshot
-        self._last_recorded_year = self.current_year
         if reason:
             meta = snapshot.setdefault("meta", {})
             meta.setdefault("changes", []).append(reason)
+        self.planning_state[self.current_year] = snapshot
+        self.world_state = snapshot
+        self._last_recorded_year = self.current_year
         return snapshot
 
     def get_current_snapshot(self):
@@ -105,17 +112,24 @@ class TimeEngine:
         working_state = copy.deepcopy(self.world_state)
         if executor:
             working_state = executor(working_state)
-        snapshot = copy.deepcopy(working_state)
-        self.history[self.current_year] = snapshot
-        self.planning_state[self.current_year] = copy.deepcopy(snapshot)
+        # The stores copy what they keep, so working_state is not aliased
+        self.history[self.current_year] = working_state
+        self.planning_state[self.current_year] = working_state
         self.current_year += 1
-        self._ensure_planning_state(self.current_year, base_state=snapshot)
-        self.world_state = copy.deepcopy(self.planning_state[self.current_year])
+        self._ensure_planning_state(self.current_year, base_state=working_state)
+        self.world_state = self.planning_state[self.current_year]
         return self.current_position
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def memory_usage(self) -> Dict[int, int]:
+        """Return the approximate bytes stored per year, history and planning."""
+        usage = self.planning_state.memory_usage()
+        for year, size in self.history.memory_usage().items():
+            usage[year] = usage.get(year, 0) + size
+        return usage
+
     def get_year_entries(self) -> List[YearEntry]:
         entries: List[YearEntry] = []
         for year in self.list_years():
@@ -127,12 +141,12 @@ class TimeEngine:
     def reset_timeline(
         self, world_state: Dict[str, Any] | None = None, start_year: int = 1, **_
     ) -> None:
-        self.history = {}
-        self.planning_state = {}
+        self.history = YearStore(self.keyframe_interval)
+        self.planning_state = YearStore(self.keyframe_interval)
         self.current_year = max(1, start_year)
         self.world_state = copy.deepcopy(world_state) if world_state is not None else None
         if self.world_state is not None:
-            self.planning_state[self.current_year] = copy.deepcopy(self.world_state)
+            self.planning_state[self.current_year] = self.world_state
         self._last_recorded_year = None
 
     def _ensure_planning_state(
@@ -140,10 +154,6 @@ class TimeEngine:
     ) -> None:
         if year in self.planning_state:
             return
-        template = (
-            copy.deepcopy(base_state)
-            if base_state is not None
-            else copy.deepcopy(self.world_state)
-        )
+        template = base_state if base_state is not None else self.world_state
         self.planning_state[year] = template or {}
 
@@ -0,0 +1,171 @@
+"""Per-year world states stored as diffs against periodic keyframes.
+
+Keeping a full copy of the world for every year makes a long campaign cost
+years × world size in memory, although consecutive years differ in few
+places. ``YearStore`` keeps a full copy (a *keyframe*) only every
+``keyframe_interval`` years along a chain; every other year is stored as a
+structural diff against the closest earlier stored year. Reading a year
+copies its keyframe and applies at most ``keyframe_interval - 1`` diffs.
+
+States are nested dicts as produced by the world JSON. Reading returns a
+fresh state each time, so callers may modify it freely.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterator, List, MutableMapping, Tuple
+
+KEYFRAME_INTERVAL = 8
+
+# An entry is either ("key", state) or ("diff", base_year, diff)
+_Entry = Tuple[Any, ...]
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the changes turning ``old`` into ``new``.
+
+    Nested dicts present in both are diffed recursively (``"sub"``); other
+    changed values are stored whole (``"set"``) and removed keys are listed
+    under ``"del"``. Empty parts are left out, so equal states give ``{}``.
+    """
+    changes: Dict[str, Any] = {}
+    set_: Dict[str, Any] = {}
+    sub: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            set_[key] = copy.deepcopy(value)
+            continue
+        before = old[key]
+        if before is value or before == value:
+            continue
+        if isinstance(before, dict) and isinstance(value, dict):
+            sub[key] = diff_state(before, value)
+        else:
+            set_[key] = copy.deepcopy(value)
+    removed = [key for key in old if key not in new]
+    if set_:
+        changes["set"] = set_
+    if sub:
+        changes["sub"] = sub
+    if removed:
+        changes["del"] = removed
+    return changes
+
+
+def apply_diff(state: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply ``changes`` from :func:`diff_state` to ``state`` in place."""
+    for key in changes.get("del", ()):
+        state.pop(key, None)
+    for key, value in changes.get("set", {}).items():
+        state[key] = copy.deepcopy(value)
+    for key, nested in changes.get("sub", {}).items():
+        apply_diff(state[key], nested)
+    return state
+
+
+class YearStore(MutableMapping):
+    """Mapping of year -> world state, delta-encoded between keyframes."""
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._entries: Dict[int, _Entry] = {}
+        # Diffs applied on top of the keyframe to rebuild each year
+        self._depth: Dict[int, int] = {}
+        self._years: List[int] = []
+        self._sizes: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # Mapping protocol
+    # ------------------------------------------------------------------
+    def __getitem__(self, year: int) -> Dict[str, Any]:
+        entry = self._entries[year]
+        chain: List[Dict[str, Any]] = []
+        while entry[0] == "diff":
+            chain.append(entry[2])
+            entry = self._entries[entry[1]]
+        state = copy.deepcopy(entry[1])
+        for changes in reversed(chain):
+            apply_diff(state, changes)
+        return state
+
+    def __setitem__(self, year: int, state: Dict[str, Any]) -> None:
+        # Years stored as diffs against ``year`` are re-encoded, as their
+        # base is about to change
+        dependents = [
+            (dep, self[dep])
+            for dep, entry in self._entries.items()
+            if entry[0] == "diff" and entry[1] == year
+        ]
+        self._encode(year, state)
+        for dep, dep_state in dependents:
+            self._encode(dep, dep_state, max_depth=self._depth[dep])
+
+    def __delitem__(self, year: int) -> None:
+        dependents = [
+            (dep, self[dep])
+            for dep, entry in self._entries.items()
+            if entry[0] == "diff" and entry[1] == year
+        ]
+        del self._entries[year]
+        del self._depth[year]
+        self._sizes.pop(year, None)
+        self._years.remove(year)
+        for dep, dep_state in dependents:
+            self._encode(dep, dep_state, max_depth=self._depth[dep])
+
+    def __contains__(self, year: object) -> bool:
+        return year in self._entries
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._years))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+    def _encode(
+        self, year: int, state: Dict[str, Any], max_depth: int | None = None
+    ) -> None:
+        if year not in self._entries:
+            insort(self._years, year)
+        self._sizes.pop(year, None)
+        pos = bisect_left(self._years, year)
+        base = self._years[pos - 1] if pos > 0 else None
+        depth = self._depth[base] + 1 if base is not None else 0
+        limit = self.keyframe_interval - 1
+        if max_depth is not None:
+            # Re-encoded years must not lengthen the chains built on them
+            limit = min(limit, max_depth)
+        if base is None or depth > limit:
+            self._entries[year] = ("key", copy.deepcopy(state))
+            self._depth[year] = 0
+        else:
+            self._entries[year] = ("diff", base, diff_state(self[base], state))
+            self._depth[year] = depth
+
+    def is_keyframe(self, year: int) -> bool:
+        return self._entries[year][0] == "key"
+
+    def chain_length(self, year: int) -> int:
+        """Return the number of diffs applied when reading ``year``."""
+        return self._depth[year]
+
+    def memory_usage(self) -> Dict[int, int]:
+        """Return the approximate stored size in bytes of every year.
+
+        Sizes are those of the JSON encoding of each keyframe or diff; they
+        are computed on first request and kept until the year changes.
+        """
+        sizes = self._sizes
+        for year in self._years:
+            if year not in sizes:
+                payload = self._entries[year][-1]
+                sizes[year] = len(
+                    json.dumps(payload, default=repr, ensure_ascii=False)
+                )
+        return {year: sizes[year] for year in self._years}
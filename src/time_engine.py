@@ -12,13 +12,20 @@ import copy
 import gzip
 import hashlib
 import json
+import pickle
 import random
+import struct
+from bisect import bisect_right, insort
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
 
 from weather import roll_weather
 
+if TYPE_CHECKING:
+    from pipeline import Pipeline
+
 
 SEASONS = ["spring", "summer", "autumn", "winter"]
 SEASON_LABELS = {
@@ -27,7 +34,11 @@ SEASON_LABELS = {
     "autumn": "höst",
     "winter": "vinter",
 }
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 2
+# Depth of the nodes whose subtrees become one snapshot chunk each
+CHUNK_DEPTH = 3
+# Bytes of decoded chunks kept in memory by ChunkStore
+CHUNK_CACHE_BYTES = 64 * 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -93,25 +104,305 @@ def rng_for(
 
 
 class SnapshotStore:
-    """Persist snapshots and events to a JSON file."""
+    """Persist snapshots and events as an append-only segment log.
+
+    Each snapshot is one record in ``timeline_<id>.seg``: a 4-byte big-endian
+    length followed by the JSON of the snapshot entry. The small index file
+    ``timeline_<id>.idx.json`` holds the timeline header and, per snapshot,
+    its position and the offset and length of its record. Saving a season
+    appends one record and rewrites only the index; dropping snapshots only
+    rewrites the index. Records no longer indexed are reclaimed by
+    :meth:`compact` once they outweigh the live ones.
+
+    Timelines saved in the older single-file ``timeline_<id>.json`` format
+    are still read and are converted on load.
+    """
+
+    _LENGTH = struct.Struct(">I")
 
     def __init__(self, base_path: Path, timeline_id: str) -> None:
         self.base_path = base_path
         self.timeline_id = timeline_id
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.path = self.base_path / f"timeline_{timeline_id}.json"
+        self.log_path = self.base_path / f"timeline_{timeline_id}.seg"
+        self.index_path = self.base_path / f"timeline_{timeline_id}.idx.json"
+        self.header: dict[str, Any] = {}
+        # One {"year", "season", "offset", "length"} per indexed snapshot
+        self.records: list[dict[str, Any]] = []
 
     def load(self) -> dict | None:
+        if self.index_path.exists():
+            with self.index_path.open("r", encoding="utf-8") as fh:
+                index = json.load(fh)
+            self.records = index.pop("records", [])
+            self.header = index
+            return {**index, "snapshots": self._read_all()}
         if not self.path.exists():
             return None
         with self.path.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
+            data = json.load(fh)
+        self.save(data)
+        self.path.unlink()
+        return data
+
+    def _read_all(self) -> list[dict[str, Any]]:
+        entries: list[dict[str, Any]] = []
+        if not self.records:
+            return entries
+        with self.log_path.open("rb") as fh:
+            for record in self.records:
+                fh.seek(record["offset"] + self._LENGTH.size)
+                entries.append(json.loads(fh.read(record["length"]).decode("utf-8")))
+        return entries
 
     def save(self, data: dict) -> None:
-        tmp_path = self.path.with_suffix(".tmp")
+        """Replace the stored timeline with ``data`` (header plus snapshots).
+
+        The new log is written beside the live one and swapped in before the
+        index is rewritten, so a crash while writing leaves the old timeline
+        intact.
+        """
+        tmp_path = self.log_path.with_suffix(".seg.tmp")
+        with tmp_path.open("wb") as fh:
+            records = [
+                self._write_record(fh, entry) for entry in data.get("snapshots", [])
+            ]
+        tmp_path.replace(self.log_path)
+        self.header = {k: v for k, v in data.items() if k != "snapshots"}
+        self.records = records
+        self._write_index()
+
+    def append(self, entry: dict[str, Any], header: dict[str, Any]) -> None:
+        """Append one snapshot ``entry`` and index it."""
+        self.header = header
+        with self.log_path.open("ab") as fh:
+            self.records.append(self._write_record(fh, entry))
+        self._write_index()
+
+    def retain(self, keep: Iterable[int], header: dict[str, Any]) -> None:
+        """Keep only the snapshots at the indexes ``keep``, in order."""
+        self.header = header
+        self.records = [self.records[i] for i in keep]
+        live = sum(self._LENGTH.size + rec["length"] for rec in self.records)
+        size = self.log_path.stat().st_size if self.log_path.exists() else 0
+        if size - live > live:
+            self.compact()
+        else:
+            self._write_index()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the indexed records."""
+        self.save({**self.header, "snapshots": self._read_all()})
+
+    def _write_record(self, fh, entry: dict[str, Any]) -> dict[str, Any]:
+        payload = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        offset = fh.tell()
+        fh.write(self._LENGTH.pack(len(payload)))
+        fh.write(payload)
+        return {
+            "year": entry.get("year"),
+            "season": entry.get("season"),
+            "offset": offset,
+            "length": len(payload),
+        }
+
+    def _write_index(self) -> None:
+        tmp_path = self.index_path.with_suffix(".tmp")
         with tmp_path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
+            json.dump({**self.header, "records": self.records}, fh, ensure_ascii=False)
+        tmp_path.replace(self.index_path)
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(
+        value, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _node_groups(nodes: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Split ``nodes`` into one group per subtree rooted at ``CHUNK_DEPTH``.
+
+    Nodes above that depth, or without a resolvable parent chain, form the
+    group ``"upper"``.
+    """
+    group_of: Dict[str, str] = {}
+    depth_of: Dict[str, int] = {}
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key in nodes:
+        chain: list[str] = []
+        current: str | None = key
+        while current is not None and current not in depth_of:
+            node = nodes.get(current)
+            if not isinstance(node, dict) or current in chain:
+                break
+            chain.append(current)
+            parent = node.get("parent_id")
+            current = str(parent) if parent is not None else None
+        if current is not None and current in depth_of:
+            depth, group = depth_of[current], group_of[current]
+        else:
+            depth, group = -1, "upper"
+        for nid in reversed(chain):
+            depth += 1
+            if depth == CHUNK_DEPTH:
+                group = nid
+            depth_of[nid] = depth
+            group_of[nid] = group
+        groups.setdefault(group_of[key], {})[key] = nodes[key]
+    return groups
+
+
+class ChunkStore:
+    """Content-addressed, append-only store of gzipped JSON chunks.
+
+    Records in ``timeline_<id>.chunks`` are the SHA-256 digest of the chunk's
+    canonical JSON, a 4-byte length and the gzipped JSON. A chunk already
+    present is not written again, so snapshots that share content share
+    records. The digest -> offset map is rebuilt by scanning the file; a
+    partial record left at the end by an interrupted write is cut off.
+    Chunks no longer referenced are reclaimed by :meth:`retain`.
+
+    Chunks are returned with their keys in canonical (sorted) order, both
+    when read from disk and from the cache, so every read of a snapshot
+    gives the same state.
+
+    Decoded chunks are kept, pickled, in an LRU cache of at most
+    ``cache_bytes``. Unpickling is several times cheaper than reading,
+    gunzipping and parsing a chunk, so restoring nearby seasons again is
+    mostly served from memory; see :meth:`cache_stats`.
+    """
+
+    _HEAD = struct.Struct(">32sI")
+
+    def __init__(
+        self, base_path: Path, timeline_id: str, cache_bytes: int = CHUNK_CACHE_BYTES
+    ) -> None:
+        self.base_path = base_path
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.path = self.base_path / f"timeline_{timeline_id}.chunks"
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        self._offsets = {}
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        pos = 0
+        with self.path.open("r+b") as fh:
+            while pos < size:
+                head = fh.read(self._HEAD.size)
+                if len(head) < self._HEAD.size:
+                    break
+                digest, length = self._HEAD.unpack(head)
+                end = pos + self._HEAD.size + length
+                if end > size:
+                    break
+                self._offsets[digest.hex()] = (pos + self._HEAD.size, length)
+                pos = end
+                fh.seek(pos)
+            if pos < size:
+                # Torn tail of a write interrupted by a crash; no snapshot
+                # refers to it, as snapshots are indexed after their chunks
+                fh.truncate(pos)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._offsets
+
+    def put(self, value: Any) -> str:
+        """Store ``value`` unless already present and return its hash."""
+        payload = _canonical(value)
+        digest = hashlib.sha256(payload).digest()
+        key = digest.hex()
+        if key not in self._offsets:
+            compressed = gzip.compress(payload)
+            with self.path.open("ab") as fh:
+                fh.write(self._HEAD.pack(digest, len(compressed)))
+                self._offsets[key] = (fh.tell(), len(compressed))
+                fh.write(compressed)
+            # Freshly saved states are the likeliest to be restored next;
+            # cache them in the same key order a read from disk gives
+            self._remember(key, json.loads(payload))
+        return key
+
+    def get(self, digest: str) -> Any:
+        """Return a fresh copy of the chunk stored under ``digest``."""
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(digest)
+            return pickle.loads(cached)
+        self.misses += 1
+        offset, length = self._offsets[digest]
+        with self.path.open("rb") as fh:
+            fh.seek(offset)
+            value = json.loads(gzip.decompress(fh.read(length)).decode("utf-8"))
+        self._remember(digest, value)
+        return value
+
+    def _remember(self, digest: str, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.cache_bytes:
+            return
+        cache = self._cache
+        cache[digest] = data
+        self._cached_bytes += len(data)
+        while self._cached_bytes > self.cache_bytes:
+            _digest, dropped = cache.popitem(last=False)
+            self._cached_bytes -= len(dropped)
+
+    def retain(self, live: Iterable[str]) -> None:
+        """Drop the chunks not in ``live`` once they outweigh the live ones.
+
+        The file is then rewritten with only the live chunks, in their
+        current order.
+        """
+        live = set(live)
+        record = self._HEAD.size
+        live_bytes = sum(
+            record + length for digest, (_o, length) in self._offsets.items() if digest in live
+        )
+        total = sum(record + length for _o, length in self._offsets.values())
+        if total - live_bytes <= live_bytes:
+            return
+        kept = sorted(
+            (offset, length, digest)
+            for digest, (offset, length) in self._offsets.items()
+            if digest in live
+        )
+        offsets: dict[str, tuple[int, int]] = {}
+        tmp_path = self.path.with_suffix(".tmp")
+        with self.path.open("rb") as src, tmp_path.open("wb") as dst:
+            for offset, length, digest in kept:
+                src.seek(offset)
+                dst.write(self._HEAD.pack(bytes.fromhex(digest), length))
+                offsets[digest] = (dst.tell(), length)
+                dst.write(src.read(length))
         tmp_path.replace(self.path)
+        self._offsets = offsets
+        for digest in [d for d in self._cache if d not in live]:
+            self._cached_bytes -= len(self._cache.pop(digest))
+
+    def cache_stats(self) -> dict[str, int]:
+        """Return cache hits, misses, entries and bytes held."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+            "bytes": self._cached_bytes,
+        }
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self._offsets = {}
+        self._cache.clear()
+        self._cached_bytes = 0
 
 
 class TimeEngine:
@@ -126,16 +417,26 @@ class TimeEngine:
         season_processors: Optional[
             List[Callable[["TimeEngine", TimePosition, random.Random], None]]
         ] = None,
+        pipeline: Optional["Pipeline"] = None,
     ) -> None:
         self.timeline_id = timeline_id
         self.rng_seed = rng_seed
         self.world_state: Dict[str, Any] = copy.deepcopy(world_state) if world_state is not None else {}
         self.store = SnapshotStore(Path(base_path) / "timelines", timeline_id)
+        self.chunks = ChunkStore(self.store.base_path, timeline_id)
         self.schema_version = SCHEMA_VERSION
         self.season_processors = season_processors or [self._run_weather]
+        if pipeline is not None:
+            # Runs after the other processors of each season
+            self.season_processors = [*self.season_processors, pipeline]
         self._events: list[dict[str, Any]] = []
         self._dirty_from: TimePosition | None = None
         self._catch_up_target: TimePosition | None = None
+        # Position of every snapshot, parallel to self.snapshots, and the
+        # distinct positions in order with the snapshots at each
+        self._snapshot_positions: list[TimePosition] = []
+        self._positions: list[TimePosition] = []
+        self._at_position: dict[TimePosition, list[int]] = {}
         stored = self.store.load()
         if stored:
             self._load_from_dict(stored)
@@ -147,53 +448,105 @@ class TimeEngine:
     # ------------------------------------------------------------------
     # Snapshot helpers
     # ------------------------------------------------------------------
-    def _compress_state(self, state: dict[str, Any]) -> str:
-        payload = json.dumps(state, ensure_ascii=False).encode("utf-8")
-        compressed = gzip.compress(payload)
-        return base64.b64encode(compressed).decode("ascii")
+    def _store_state(self, state: dict[str, Any]) -> str:
+        """Store ``state`` as a tree of chunks and return the root hash.
+
+        The root chunk lists the hash of every top-level value, with
+        ``nodes`` split into one chunk per jarldom subtree (see
+        :func:`_node_groups`). Unchanged parts hash the same and are stored
+        once across all snapshots.
+        """
+        keys: list[list[str]] = []
+        for key, value in state.items():
+            if key == "nodes" and isinstance(value, dict):
+                groups = [
+                    [group, self.chunks.put(members)]
+                    for group, members in _node_groups(value).items()
+                ]
+                keys.append([key, self.chunks.put({"groups": groups})])
+            else:
+                keys.append([key, self.chunks.put({"value": value})])
+        return self.chunks.put({"keys": keys})
+
+    def _load_state(self, root: str) -> dict[str, Any]:
+        state: dict[str, Any] = {}
+        for key, digest in self.chunks.get(root)["keys"]:
+            chunk = self.chunks.get(digest)
+            if "groups" in chunk:
+                nodes: dict[str, Any] = {}
+                for _group, group_digest in chunk["groups"]:
+                    nodes.update(self.chunks.get(group_digest))
+                state[key] = nodes
+            else:
+                state[key] = chunk["value"]
+        return state
 
     def _decompress_state(self, blob: str) -> dict[str, Any]:
         raw = gzip.decompress(base64.b64decode(blob.encode("ascii")))
         return json.loads(raw.decode("utf-8"))
 
-    def _state_checksum(self, state: dict[str, Any]) -> str:
-        payload = json.dumps(state, sort_keys=True, ensure_ascii=False)
-        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    def _state_from_snapshot(self, snap: dict[str, Any]) -> dict[str, Any]:
+        if "state_root" in snap:
+            return self._load_state(snap["state_root"])
+        # Snapshots written before schema version 2 carry the whole state
+        return self._decompress_state(snap.get("state_blob", ""))
 
     def _save_snapshot(self, pos: TimePosition, meta: dict[str, Any] | None = None) -> None:
-        snapshot_state = copy.deepcopy(self.world_state)
-        compressed = self._compress_state(snapshot_state)
+        root = self._store_state(self.world_state)
         entry = {
             "schema_version": self.schema_version,
             "timeline_id": self.timeline_id,
             "year": pos.year,
             "season": pos.season,
-            "state_blob": compressed,
-            "checksum": self._state_checksum(snapshot_state),
+            "state_root": root,
+            # The root hash covers every chunk, so it doubles as checksum
+            "checksum": root,
             "events": list(self._events),
         }
         if meta:
             entry["meta"] = meta
         self.snapshots.append(entry)
-        self._persist()
-
-    def _persist(self) -> None:
-        payload = {
+        self._index_snapshot(len(self.snapshots) - 1, pos)
+        self.store.append(entry, self._header())
+
+    def _index_snapshot(self, index: int, pos: TimePosition) -> None:
+        self._snapshot_positions.append(pos)
+        slots = self._at_position.get(pos)
+        if slots is None:
+            insort(self._positions, pos)
+            self._at_position[pos] = [index]
+        else:
+            slots.append(index)
+
+    def _rebuild_index(self, positions: list[TimePosition] | None = None) -> None:
+        if positions is None:
+            positions = [self._pos_from_snapshot(snap) for snap in self.snapshots]
+        self._snapshot_positions = []
+        self._positions = []
+        self._at_position = {}
+        for index, pos in enumerate(positions):
+            self._index_snapshot(index, pos)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Return hit/miss counts of the decoded chunk cache."""
+        return self.chunks.cache_stats()
+
+    def _header(self) -> dict[str, Any]:
+        return {
             "schema_version": self.schema_version,
             "timeline_id": self.timeline_id,
             "rng_seed": self.rng_seed,
-            "snapshots": self.snapshots,
         }
-        self.store.save(payload)
 
     def _load_from_dict(self, data: dict[str, Any]) -> None:
         self.schema_version = data.get("schema_version", SCHEMA_VERSION)
         self.timeline_id = data.get("timeline_id", self.timeline_id)
         self.rng_seed = data.get("rng_seed", self.rng_seed)
         self.snapshots = data.get("snapshots", [])
+        self._rebuild_index()
         if self.snapshots:
             last = self.snapshots[-1]
-            self.world_state = self._decompress_state(last.get("state_blob", ""))
+            self.world_state = self._state_from_snapshot(last)
             self.current_position = TimePosition.from_season(
                 last.get("year", 0), last.get("season", "spring")
             )
@@ -201,10 +554,11 @@ class TimeEngine:
             self.current_position = TimePosition(0, 0)
 
     def _nearest_snapshot(self, target: TimePosition) -> dict[str, Any] | None:
-        candidates = [s for s in self.snapshots if self._pos_from_snapshot(s) <= target]
-        if not candidates:
+        # Latest snapshot at the last position not after ``target``
+        k = bisect_right(self._positions, target)
+        if k == 0:
             return None
-        return candidates[-1]
+        return self.snapshots[self._at_position[self._positions[k - 1]][-1]]
 
     def _pos_from_snapshot(self, snap: dict[str, Any]) -> TimePosition:
         return TimePosition.from_season(int(snap.get("year", 0)), snap.get("season", "spring"))
@@ -229,18 +583,22 @@ class TimeEngine:
         if timeline_id is not None:
             self.timeline_id = timeline_id
             self.store = SnapshotStore(self.store.base_path, self.timeline_id)
+            self.chunks = ChunkStore(self.store.base_path, self.timeline_id)
         self.current_position = TimePosition(0, 0)
         self.snapshots = []
+        self._rebuild_index()
+        self.store.save(self._header())
+        self.chunks.clear()
         self._events = []
         self._dirty_from = None
         self._catch_up_target = None
         self._save_snapshot(self.current_position)
 
     def events_for_position(self, pos: TimePosition) -> list[dict[str, Any]]:
-        for snap in self.snapshots:
-            if self._pos_from_snapshot(snap) == pos:
-                return list(snap.get("events", []))
-        return []
+        slots = self._at_position.get(pos)
+        if not slots:
+            return []
+        return list(self.snapshots[slots[0]].get("events", []))
 
     def step_seasons(self, delta: int) -> TimePosition:
         target = self.current_position.step(delta)
@@ -296,7 +654,7 @@ class TimeEngine:
         if snap is None:
             self.reset_timeline(self.world_state, self.rng_seed, self.timeline_id)
             return
-        self.world_state = self._decompress_state(snap.get("state_blob", ""))
+        self.world_state = self._state_from_snapshot(snap)
         self.current_position = self._pos_from_snapshot(snap)
         self._events = list(snap.get("events", []))
         if self.current_position < target:
@@ -309,11 +667,31 @@ class TimeEngine:
     def _truncate_future(self, pivot: TimePosition) -> None:
         """Remove snapshots at or after ``pivot`` to force recalculation."""
 
-        kept: list[dict[str, Any]] = []
+        positions = self._snapshot_positions
+        keep = [i for i, pos in enumerate(positions) if pos < pivot]
+        if len(keep) == len(self.snapshots):
+            return
+        self.snapshots = [self.snapshots[i] for i in keep]
+        self._rebuild_index([positions[i] for i in keep])
+        self.store.retain(keep, self._header())
+        self.chunks.retain(self._live_chunks())
+
+    def _live_chunks(self) -> set[str]:
+        """Return the hashes of every chunk the snapshots refer to."""
+        live: set[str] = set()
         for snap in self.snapshots:
-            if self._pos_from_snapshot(snap) < pivot:
-                kept.append(snap)
-        self.snapshots = kept
+            root = snap.get("state_root")
+            if root is None or root in live:
+                continue
+            live.add(root)
+            for key, digest in self.chunks.get(root)["keys"]:
+                if digest in live:
+                    continue
+                live.add(digest)
+                if key == "nodes":
+                    chunk = self.chunks.get(digest)
+                    live.update(group_digest for _group, group_digest in chunk.get("groups", ()))
+        return live
 
     def record_change(self, reason: str | None = None) -> None:
         """Create a snapshot for a domain change at the current position.
@@ -324,7 +702,7 @@ class TimeEngine:
         """
 
         if self.snapshots:
-            previous_max = self._pos_from_snapshot(self.snapshots[-1])
+            previous_max = self._snapshot_positions[-1]
         else:
             previous_max = self.current_position
         if self.current_position < previous_max:
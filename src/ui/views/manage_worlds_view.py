@@ -6,12 +6,43 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 from typing import TYPE_CHECKING
 
-from data_manager import load_worlds_from_file
+from world_store import WorldSummary
 
 if TYPE_CHECKING:  # pragma: no cover - for type hints only
     from feodal_simulator import FeodalSimulator
 
 
+def world_summaries(all_worlds) -> list[WorldSummary]:
+    """Return sorted catalogue entries for ``all_worlds``.
+
+    Plain dictionaries are summarised from memory; stores provide their
+    catalogue without reading any world.
+    """
+    catalogue = getattr(all_worlds, "catalogue", None)
+    if callable(catalogue):
+        return catalogue()
+    return [
+        WorldSummary(
+            name=name,
+            node_count=len(data.get("nodes", {}) or {}),
+            character_count=len(data.get("characters", {}) or {}),
+        )
+        for name, data in sorted(all_worlds.items())
+    ]
+
+
+def format_world_summary(summary: WorldSummary) -> str:
+    """Return the listbox label for ``summary``."""
+    details: list[str] = []
+    if summary.node_count is not None:
+        details.append(f"{summary.node_count} noder")
+    if summary.size_bytes is not None:
+        details.append(f"{max(1, round(summary.size_bytes / 1024))} kB")
+    if not details:
+        return summary.name
+    return f"{summary.name} ({', '.join(details)})"
+
+
 def show_manage_worlds_view(app: "FeodalSimulator", parent: tk.Misc) -> None:
     """Displays the UI for managing worlds (create, load, delete, copy)."""
     app._clear_right_frame()
@@ -32,28 +63,35 @@ def show_manage_worlds_view(app: "FeodalSimulator", parent: tk.Misc) -> None:
     list_scroll.pack(side=tk.RIGHT, fill="y")
     world_listbox.pack(side=tk.LEFT, fill="x", expand=True)
 
-    # Populate listbox
-    app.all_worlds = load_worlds_from_file()  # Ensure latest data
+    # Populate listbox from catalogue metadata; worlds are not parsed here.
+    # The live collection already includes changes a scheduled save has not
+    # written yet, so it is listed as is rather than reopened from disk.
     world_listbox.delete(0, tk.END)  # Clear previous entries
-    for wname in sorted(app.all_worlds.keys()):
-        world_listbox.insert(tk.END, wname)
-        if wname == app.active_world_name:
+    listed_names: list[str] = []
+    for summary in world_summaries(app.all_worlds):
+        listed_names.append(summary.name)
+        world_listbox.insert(tk.END, format_world_summary(summary))
+        if summary.name == app.active_world_name:
             idx = world_listbox.size() - 1
             world_listbox.itemconfig(idx, {"bg": "#aaddff"})  # Highlight active slightly darker
             world_listbox.selection_set(idx)  # Select active
 
+    def selected_world() -> str | None:
+        selection = world_listbox.curselection()
+        if not selection:
+            return None
+        return listed_names[selection[0]]
+
     # --- Actions ---
     def do_load():
-        selection = world_listbox.curselection()
-        if selection:
-            wname = world_listbox.get(selection[0])
+        wname = selected_world()
+        if wname:
             app.load_world(wname)
             app.show_manage_worlds_view()  # Refresh view to show highlight
 
     def do_delete():
-        selection = world_listbox.curselection()
-        if selection:
-            wname = world_listbox.get(selection[0])
+        wname = selected_world()
+        if wname:
             if messagebox.askyesno(
                 "Radera Värld?",
                 f"Är du säker på att du vill radera världen '{wname}'?\nDetta kan inte ångras.",
@@ -81,9 +119,8 @@ def show_manage_worlds_view(app: "FeodalSimulator", parent: tk.Misc) -> None:
                     app.show_manage_worlds_view()  # Refresh list anyway
 
     def do_copy():
-        selection = world_listbox.curselection()
-        if selection:
-            wname_to_copy = world_listbox.get(selection[0])
+        wname_to_copy = selected_world()
+        if wname_to_copy:
             new_name = simpledialog.askstring(
                 "Kopiera Värld",
                 f"Ange ett namn för kopian av '{wname_to_copy}':",
@@ -156,4 +193,4 @@ def show_manage_worlds_view(app: "FeodalSimulator", parent: tk.Misc) -> None:
     )
 
 
-__all__ = ["show_manage_worlds_view"]
+__all__ = ["format_world_summary", "show_manage_worlds_view", "world_summaries"]
@@ -412,8 +412,9 @@ class NodeDetailsView:
         )
         population = node_data.get("population", "Saknas ännu")
 
-        work_available = self.app.world_manager.calculate_work_available(node_id)
-        work_needed = self.app.world_manager.calculate_work_needed(node_id)
+        rollup = self.app.world_manager.node_rollup(node_id)
+        work_available = rollup.work_available
+        work_needed = rollup.work_needed
         self._add_overview_section(
             parent,
             "Sammanfattning",
@@ -443,18 +444,14 @@ class NodeDetailsView:
             node_id,
         )
         self._add_reported_storage_section(parent, storage_overview)
-        soldiers = self.app.world_manager.aggregate_resources(node_id)["soldiers"]
-        soldier_rows = sorted(soldiers.items()) or [("Soldater", "Saknas ännu")]
+        soldier_rows = sorted(rollup.soldiers.items()) or [("Soldater", "Saknas ännu")]
         self._add_overview_section(parent, "Soldater", soldier_rows)
         weather_effect = node_data.get("weather_effect", "Saknas ännu")
         self._add_overview_section(
             parent,
             "Umbärande",
             (
-                (
-                    "Umbärande",
-                    self.app.world_manager.calculate_umbarande(node_id),
-                ),
+                ("Umbärande", rollup.umbarande),
                 ("Vädereffekt", weather_effect),
             ),
         )
@@ -515,14 +512,14 @@ class NodeDetailsView:
             (("Status", "Ny skattefördelning är inte implementerad ännu."),),
         )
 
-        soldiers = self.app.world_manager.aggregate_resources(node_id)["soldiers"]
-        soldier_rows = sorted(soldiers.items()) or [
+        rollup = self.app.world_manager.node_rollup(node_id)
+        soldier_rows = sorted(rollup.soldiers.items()) or [
             ("Rapporterade soldater", "Saknas ännu")
         ]
         self._add_overview_section(parent, "Soldater", soldier_rows)
 
         status_rows = [
-            ("Umbärande", self.app.world_manager.calculate_umbarande(node_id)),
+            ("Umbärande", rollup.umbarande),
             ("Befolkning", node_data.get("population", "Saknas ännu")),
             ("Vädereffekt", node_data.get("weather_effect", "Saknas ännu")),
         ]
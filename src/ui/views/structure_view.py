@@ -218,6 +218,9 @@ class StructureView:
                     if node_data.get("node_id") != node_id_int:
                         node_data["node_id"] = node_id_int
                     root_nodes_data.append(node_data)
+            if root_nodes_data:
+                # The hierarchy and owner indexes still hold the old parents
+                self.app.clear_depth_cache()
 
         if not root_nodes_data:
             self.app.add_status_message(
@@ -283,7 +286,9 @@ class StructureView:
             child_nodes.sort(key=lambda n: self.app.get_display_name_for_node(n, depth + 1))
             for child_node in child_nodes:
                 self._add_tree_node_recursive(node_id_str, child_node)
-            node_data["children"] = valid_children_ids
+            if valid_children_ids != children_ids:
+                node_data["children"] = valid_children_ids
+                self.app.clear_depth_cache()
 
     def _render_province_subtrees(
         self, owner_id: int | None, restore_state: dict | None = None
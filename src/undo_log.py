@@ -0,0 +1,151 @@
+"""Bounded undo/redo history of node field edits.
+
+``WorldManager.create_snapshot`` used to keep a deep copy of the entire world
+for every recorded edit, so memory grew with the number of edits times the
+size of the world and was never released.
+
+``UndoLog`` records only what an edit changed: for each touched node the
+fields with their values before and after. Undo writes the *before* values
+back, redo the *after* values. The log is bounded both by entry count and by
+the approximate serialised size of the recorded values; the oldest entries
+are dropped first.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from node_store import NodeStore
+
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+
+class _Missing:
+    """Marks a field that did not exist on the node."""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_Missing":
+        return self
+
+
+MISSING: Any = _Missing()
+
+# node id -> field -> (value before, value after)
+Changes = Dict[int, Dict[str, Tuple[Any, Any]]]
+
+
+def _size_of(changes: Changes) -> int:
+    return len(json.dumps(changes, default=repr, ensure_ascii=False))
+
+
+@dataclass
+class UndoEntry:
+    """One recorded edit."""
+
+    reason: str
+    context: Dict[str, Any]
+    changes: Changes
+    size: int = field(default=0)
+
+
+class UndoLog:
+    """Undo and redo stacks of :class:`UndoEntry` with count and size limits."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._undo: List[UndoEntry] = []
+        self._redo: List[UndoEntry] = []
+        # Size of all entries on both stacks
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def entries(self) -> List[UndoEntry]:
+        """Return the undoable entries, oldest first."""
+        return list(self._undo)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(
+        self,
+        reason: str,
+        context: Dict[str, Any] | None,
+        changes: Changes,
+    ) -> UndoEntry:
+        """Append an edit whose changes were already applied to the nodes.
+
+        Recording a new edit discards everything that could be redone.
+        """
+        # Copied so later in-place edits of the nodes do not leak into history
+        changes = copy.deepcopy(changes)
+        entry = UndoEntry(reason, dict(context or {}), changes, _size_of(changes))
+        self._undo.append(entry)
+        self.total_bytes += entry.size
+        self._drop_redo()
+        self._trim()
+        return entry
+
+    def undo(self, store: NodeStore) -> UndoEntry | None:
+        """Revert the latest entry on the nodes of ``store`` and return it."""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        _apply(store, entry.changes, 0)
+        self._redo.append(entry)
+        return entry
+
+    def redo(self, store: NodeStore) -> UndoEntry | None:
+        """Re-apply the latest undone entry and return it."""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        _apply(store, entry.changes, 1)
+        self._undo.append(entry)
+        return entry
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self.total_bytes = 0
+
+    def _drop_redo(self) -> None:
+        self.total_bytes -= sum(entry.size for entry in self._redo)
+        self._redo.clear()
+
+    def _trim(self) -> None:
+        undo = self._undo
+        # The newest entry is kept even when it alone exceeds max_bytes
+        while len(undo) > 1 and (
+            len(undo) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            self.total_bytes -= undo.pop(0).size
+
+
+def _apply(store: NodeStore, changes: Changes, side: int) -> None:
+    """Write the ``side`` (0 = before, 1 = after) values of ``changes``."""
+    for node_id, fields in changes.items():
+        node = store.get(node_id)
+        if node is None:
+            continue
+        for key, values in fields.items():
+            value = values[side]
+            if value is MISSING:
+                node.pop(key, None)
+            else:
+                node[key] = copy.deepcopy(value)
@@ -0,0 +1,221 @@
+"""Compact binary encoding of a single world.
+
+Nodes are grouped by *shape*, the ordered tuple of their keys. After
+validation most nodes of one ``res_type`` share a shape, so each group can
+be stored column-wise: one typed column per key holding that field for every
+node in the group. Numeric columns use the narrowest ``array`` type that
+fits, strings are stored as indexes into a shared string table, and anything
+else (lists, mixed types) falls back to a JSON array for that column.
+
+Loading rebuilds each group with ``dict(zip(keys, row))`` over the decoded
+columns, which avoids the per-key work of parsing JSON text. The encoding is
+lossless: key order, ``bool``/``int``/``float`` types and ``None`` values all
+survive a round trip.
+
+Layout (little-endian)::
+
+    b"FSWB" | u16 version | u32 header length | header JSON | column data
+
+The header holds the string table, the shapes, the non-node parts of the
+world and the offset/length of every column in the data section.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Tuple
+
+MAGIC = b"FSWB"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sHI")
+
+# Smallest first; picked by the value range of each integer column
+_INT_TYPECODES = ("b", "h", "i", "q")
+_INT_BITS = {code: 8 * array(code).itemsize for code in _INT_TYPECODES}
+_INDEX_TYPECODES = ("B", "H", "I", "Q")
+
+
+def _to_le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, payload: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _int_typecode(values: List[int]) -> str | None:
+    low, high = min(values), max(values)
+    for code in _INT_TYPECODES:
+        bound = 1 << (_INT_BITS[code] - 1)
+        if -bound <= low and high < bound:
+            return code
+    return None
+
+
+def _index_typecode(size: int) -> str:
+    for code in _INDEX_TYPECODES:
+        if size < (1 << (8 * array(code).itemsize)):
+            return code
+    return "Q"  # pragma: no cover - more entries than fit in memory
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.offset = 0
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+    def add(self, payload: bytes) -> List[int]:
+        self.chunks.append(payload)
+        span = [self.offset, len(payload)]
+        self.offset += len(payload)
+        return span
+
+    def string_id(self, value: str) -> int:
+        idx = self._string_ids.get(value)
+        if idx is None:
+            idx = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def column(self, values: List[Any]) -> List[Any]:
+        """Encode ``values`` and return ``[type, typecode, offset, length]``."""
+        types = set(map(type, values))
+        if types == {type(None)}:
+            return ["n", "", 0, 0]
+        if types == {bool}:
+            return ["?", "B", *self.add(bytes(values))]
+        if types == {int}:
+            code = _int_typecode(values)
+            if code is not None:
+                return ["i", code, *self.add(_to_le(array(code, values)))]
+        elif types == {float}:
+            return ["f", "d", *self.add(_to_le(array("d", values)))]
+        elif types == {str}:
+            ids = [self.string_id(value) for value in values]
+            code = _index_typecode(len(self.strings))
+            return ["s", code, *self.add(_to_le(array(code, ids)))]
+        payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+        return ["j", "", *self.add(payload.encode("utf-8"))]
+
+
+def dumps_world(world_data: Dict[str, Any]) -> bytes:
+    """Encode ``world_data`` in the binary format."""
+    writer = _Writer()
+    nodes = world_data.get("nodes")
+    header: Dict[str, Any] = {
+        "world": {key: value for key, value in world_data.items() if key != "nodes"},
+        "order": list(world_data.keys()),
+    }
+    if isinstance(nodes, dict) and all(isinstance(n, dict) for n in nodes.values()):
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        node_list = list(nodes.values())
+        for position, node in enumerate(node_list):
+            groups.setdefault(tuple(node), []).append(position)
+
+        keys = list(nodes)
+        if all(isinstance(k, str) and k.isdigit() and str(int(k)) == k for k in keys):
+            # Canonical numeric ids are stored as integers, not strings
+            int_keys = [int(k) for k in keys]
+            code = (_int_typecode(int_keys) if int_keys else "b") or "q"
+            header["node_keys"] = ["k", code, *writer.add(_to_le(array(code, int_keys)))]
+        else:
+            header["node_keys"] = writer.column(keys)
+        header["node_count"] = len(keys)
+
+        position_code = _index_typecode(len(node_list))
+        shapes = []
+        for shape, positions in groups.items():
+            shapes.append(
+                {
+                    "keys": list(shape),
+                    "positions": writer.add(_to_le(array(position_code, positions))),
+                    "count": len(positions),
+                    "columns": [
+                        writer.column([node_list[p][key] for p in positions])
+                        for key in shape
+                    ],
+                }
+            )
+        header["shapes"] = shapes
+        header["position_code"] = position_code
+    elif "nodes" in world_data:
+        header["world"]["nodes"] = nodes
+
+    header["strings"] = writer.strings
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    return b"".join(
+        [_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes]
+        + writer.chunks
+    )
+
+
+def _read_column(
+    spec: List[Any], data: memoryview, count: int, strings: List[str]
+) -> List[Any]:
+    kind, code, offset, length = spec
+    if kind == "n":
+        return [None] * count
+    payload = data[offset : offset + length]
+    if kind == "j":
+        return json.loads(bytes(payload).decode("utf-8"))
+    values = _from_le(code, payload)
+    if kind == "?":
+        return list(map(bool, values))
+    if kind == "s":
+        return list(map(strings.__getitem__, values))
+    return values.tolist()
+
+
+def loads_world(payload: bytes) -> Dict[str, Any]:
+    """Decode a world produced by :func:`dumps_world`."""
+    magic, version, header_len = _PREAMBLE.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError("Not a binary world file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary world version {version}")
+    start = _PREAMBLE.size
+    header = json.loads(payload[start : start + header_len].decode("utf-8"))
+    data = memoryview(payload)[start + header_len :]
+    strings = header["strings"]
+    world_parts = header["world"]
+
+    if "shapes" in header:
+        count = header["node_count"]
+        key_spec = header["node_keys"]
+        if key_spec[0] == "k":
+            _, code, offset, length = key_spec
+            keys = list(map(str, _from_le(code, data[offset : offset + length])))
+        else:
+            keys = _read_column(key_spec, data, count, strings)
+        ordered: List[Any] = [None] * count
+        for shape in header["shapes"]:
+            offset, length = shape["positions"]
+            positions = _from_le(header["position_code"], data[offset : offset + length])
+            shape_keys = shape["keys"]
+            if not shape_keys:
+                for position in positions:
+                    ordered[position] = {}
+                continue
+            columns = [
+                _read_column(spec, data, shape["count"], strings)
+                for spec in shape["columns"]
+            ]
+            for position, row in zip(positions, zip(*columns)):
+                ordered[position] = dict(zip(shape_keys, row))
+        world_parts["nodes"] = dict(zip(keys, ordered))
+
+    return {key: world_parts[key] for key in header["order"]}
@@ -13,6 +13,8 @@ from constants import (
     DAGSVERKEN_LEVELS,
 )
 from weather import NORMAL_WEATHER
+from world_binary import dumps_world, loads_world
+from world_stream import read_worlds
 
 
 class WorldInterface(ABC):
@@ -38,7 +40,7 @@ class WorldInterface(ABC):
         if os.path.exists(file_path):
             try:
                 with open(file_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                    return read_worlds(f)
             except Exception as e:  # json.JSONDecodeError or IOError
                 print(f"Error loading file {file_path}: {e}")
         return {}
@@ -50,8 +52,38 @@ class WorldInterface(ABC):
             dir_name = os.path.dirname(file_path)
             if dir_name:
                 os.makedirs(dir_name, exist_ok=True)
-            with open(file_path, "w", encoding="utf-8") as f:
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(all_worlds, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            print(f"Error saving file {file_path}: {e}")
+
+    @staticmethod
+    def load_world_binary(file_path: str) -> Dict[str, Any]:
+        """Load one world saved with :meth:`save_world_binary`.
+
+        Returns empty dict on failure.
+        """
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, "rb") as f:
+                    return loads_world(f.read())
+            except Exception as e:  # ValueError, struct.error or IOError
+                print(f"Error loading file {file_path}: {e}")
+        return {}
+
+    @staticmethod
+    def save_world_binary(world_data: Dict[str, Any], file_path: str) -> None:
+        """Save ``world_data`` to ``file_path`` in the compact binary format."""
+        try:
+            dir_name = os.path.dirname(file_path)
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(dumps_world(world_data))
+            os.replace(tmp_path, file_path)
         except Exception as e:
             print(f"Error saving file {file_path}: {e}")
 
@@ -78,7 +110,6 @@ class WorldInterface(ABC):
             self.world_data["next_node_id"] = max_id + 1
 
         nodes_updated = 0
-        chars_updated = 0
         max_node_id_found = 0
         all_node_ids: set[int] = set()
 
@@ -93,304 +124,321 @@ class WorldInterface(ABC):
             all_node_ids.add(nid_int)
             max_node_id_found = max(max_node_id_found, nid_int)
 
-            updated = False
-            if "node_id" not in node:
-                node["node_id"] = nid_int
+            if self.validate_node(nid_int, node):
+                nodes_updated += 1
+
+        return self._finish_validation(
+            all_node_ids, max_node_id_found, nodes_updated
+        )
+
+    def validate_node(self, nid_int: int, node: Dict[str, Any]) -> bool:
+        """Fill in defaults for a single node. Returns ``True`` if changed.
+
+        The node's ancestors must already be in ``self.world_data`` so its
+        depth can be resolved.
+        """
+        updated = False
+        if "node_id" not in node:
+            node["node_id"] = nid_int
+            updated = True
+        if "parent_id" not in node:
+            node["parent_id"] = None
+        if "name" not in node:
+            node["name"] = ""
+            updated = True
+        if "custom_name" not in node:
+            node["custom_name"] = ""
+            updated = True
+        if "ruler_id" not in node:
+            node["ruler_id"] = None
+        if "num_subfiefs" not in node:
+            node["num_subfiefs"] = 0
+            updated = True
+        if "children" not in node:
+            node["children"] = []
+            updated = True
+        res_type = node.get("res_type")
+        if res_type == "Vildmark":
+            if "tunnland" not in node:
+                node["tunnland"] = 0
                 updated = True
-            if "parent_id" not in node:
-                node["parent_id"] = None
-            if "name" not in node:
-                node["name"] = ""
+        elif res_type == "Jaktmark":
+            if "tunnland" not in node:
+                node["tunnland"] = 0
                 updated = True
-            if "custom_name" not in node:
-                node["custom_name"] = ""
+            if "hunters" not in node:
+                node["hunters"] = 0
                 updated = True
-            if "ruler_id" not in node:
-                node["ruler_id"] = None
-            if "num_subfiefs" not in node:
-                node["num_subfiefs"] = 0
+            if "gamekeeper_id" not in node:
+                node["gamekeeper_id"] = None
                 updated = True
-            if "children" not in node:
-                node["children"] = []
+        elif res_type == "Mark":
+            for key in ("total_land", "forest_land", "cleared_land"):
+                if key not in node:
+                    node[key] = 0
+                    updated = True
+        elif res_type == "Djur":
+            if "population" in node:
+                del node["population"]
+                updated = True
+        else:
+            if "population" not in node:
+                node["population"] = 0
+                updated = True
+
+        node["children"] = [int(c) for c in node.get("children", []) if str(c).isdigit()]
+
+        depth = self.get_depth_of_node(nid_int)
+        if depth == 3:
+            if "neighbors" not in node:
+                node["neighbors"] = [
+                    {"id": None, "border": NEIGHBOR_NONE_STR} for _ in range(MAX_NEIGHBORS)
+                ]
+                updated = True
+            else:
+                neighbors = node["neighbors"]
+                if not isinstance(neighbors, list):
+                    neighbors = []
+                validated_neighbors = []
+                for i in range(MAX_NEIGHBORS):
+                    if i < len(neighbors) and isinstance(neighbors[i], dict):
+                        n_data = neighbors[i]
+                        n_id = n_data.get("id")
+                        n_border = n_data.get("border", NEIGHBOR_NONE_STR)
+                        final_id = None
+                        if isinstance(n_id, int):
+                            final_id = n_id
+                        elif str(n_id).isdigit():
+                            final_id = int(n_id)
+                        elif n_id == NEIGHBOR_OTHER_STR:
+                            final_id = NEIGHBOR_OTHER_STR
+                        if n_border not in BORDER_TYPES:
+                            n_border = NEIGHBOR_NONE_STR
+                        validated_neighbors.append({"id": final_id, "border": n_border})
+                    else:
+                        validated_neighbors.append({"id": None, "border": NEIGHBOR_NONE_STR})
+                if node.get("neighbors") != validated_neighbors:
+                    node["neighbors"] = validated_neighbors
+                    updated = True
+            if "dagsverken" not in node or node["dagsverken"] not in DAGSVERKEN_LEVELS:
+                node["dagsverken"] = "normalt"
+                updated = True
+            for key in (
+                "work_available",
+                "work_needed",
+                "storage_silver",
+                "storage_basic",
+                "storage_luxury",
+                "jarldom_area",
+                "expected_license_income",
+            ):
+                if key not in node:
+                    node[key] = 0
+                    updated = True
+        elif depth >= 4:
+            if "res_type" not in node:
+                node["res_type"] = "Resurs"
                 updated = True
             res_type = node.get("res_type")
-            if res_type == "Vildmark":
-                if "tunnland" not in node:
-                    node["tunnland"] = 0
+            # Soldiers field only for Soldier resources
+            if res_type == "Soldater":
+                if "soldiers" not in node or not isinstance(node["soldiers"], list):
+                    node["soldiers"] = []
                     updated = True
-            elif res_type == "Jaktmark":
-                if "tunnland" not in node:
-                    node["tunnland"] = 0
+            else:
+                if "soldiers" in node:
+                    del node["soldiers"]
                     updated = True
-                if "hunters" not in node:
-                    node["hunters"] = 0
+
+            # Animals field only for Animal resources
+            if res_type == "Djur":
+                if "animals" not in node or not isinstance(node["animals"], list):
+                    node["animals"] = []
                     updated = True
-                if "gamekeeper_id" not in node:
-                    node["gamekeeper_id"] = None
+            else:
+                if "animals" in node:
+                    del node["animals"]
                     updated = True
-            elif res_type == "Mark":
+
+            # Land fields only for Mark resources
+            if res_type == "Mark":
                 for key in ("total_land", "forest_land", "cleared_land"):
                     if key not in node:
                         node[key] = 0
                         updated = True
+            elif res_type == "Gods":
+                defaults = {
+                    "manor_land": 0,
+                    "cultivated_land": 0,
+                    "cultivated_quality": 3,
+                    "fallow_land": 0,
+                    "has_herd": False,
+                    "forest_land": 0,
+                    "hunt_quality": 3,
+                    "hunting_law": 0,
+                }
+                for key, val in defaults.items():
+                    if key not in node:
+                        node[key] = val
+                        updated = True
+                try:
+                    cq = int(node.get("cultivated_quality", 3))
+                except (ValueError, TypeError):
+                    cq = 3
+                cq = max(1, min(cq, 5))
+                if node.get("cultivated_quality") != cq:
+                    node["cultivated_quality"] = cq
+                    updated = True
+                try:
+                    hq = int(node.get("hunt_quality", 3))
+                except (ValueError, TypeError):
+                    hq = 3
+                hq = max(1, min(hq, 5))
+                if node.get("hunt_quality") != hq:
+                    node["hunt_quality"] = hq
+                    updated = True
+                try:
+                    hl = int(node.get("hunting_law", 0))
+                except (ValueError, TypeError):
+                    hl = 0
+                hl = max(0, min(hl, 20))
+                if node.get("hunting_law") != hl:
+                    node["hunting_law"] = hl
+                    updated = True
             elif res_type == "Djur":
                 if "population" in node:
                     del node["population"]
                     updated = True
-            else:
-                if "population" not in node:
-                    node["population"] = 0
+            elif res_type in {"Hav", "Flod"}:
+                if "fish_quality" not in node:
+                    node["fish_quality"] = "Normalt"
                     updated = True
-
-            node["children"] = [int(c) for c in node.get("children", []) if str(c).isdigit()]
-
-            depth = self.get_depth_of_node(nid_int)
-            if depth == 3:
-                if "neighbors" not in node:
-                    node["neighbors"] = [
-                        {"id": None, "border": NEIGHBOR_NONE_STR} for _ in range(MAX_NEIGHBORS)
-                    ]
+                if "fishing_boats" not in node:
+                    node["fishing_boats"] = 0
                     updated = True
-                else:
-                    neighbors = node["neighbors"]
-                    if not isinstance(neighbors, list):
-                        neighbors = []
-                    validated_neighbors = []
-                    for i in range(MAX_NEIGHBORS):
-                        if i < len(neighbors) and isinstance(neighbors[i], dict):
-                            n_data = neighbors[i]
-                            n_id = n_data.get("id")
-                            n_border = n_data.get("border", NEIGHBOR_NONE_STR)
-                            final_id = None
-                            if isinstance(n_id, int):
-                                final_id = n_id
-                            elif str(n_id).isdigit():
-                                final_id = int(n_id)
-                            elif n_id == NEIGHBOR_OTHER_STR:
-                                final_id = NEIGHBOR_OTHER_STR
-                            if n_border not in BORDER_TYPES:
-                                n_border = NEIGHBOR_NONE_STR
-                            validated_neighbors.append({"id": final_id, "border": n_border})
-                        else:
-                            validated_neighbors.append({"id": None, "border": NEIGHBOR_NONE_STR})
-                    if node.get("neighbors") != validated_neighbors:
-                        node["neighbors"] = validated_neighbors
+                if res_type == "Flod":
+                    if "river_level" not in node:
+                        node["river_level"] = 1
                         updated = True
-                if "dagsverken" not in node or node["dagsverken"] not in DAGSVERKEN_LEVELS:
-                    node["dagsverken"] = "normalt"
+                elif "river_level" in node:
+                    del node["river_level"]
                     updated = True
+            elif res_type == "Lager":
+                defaults = {
+                    "lager_text": "",
+                    "storage_silver": 0,
+                    "storage_basic": 0,
+                    "storage_luxury": 0,
+                    "storage_timber": 0,
+                    "storage_coal": 0,
+                    "storage_iron_ore": 0,
+                    "storage_iron": 0,
+                    "storage_animal_feed": 0,
+                    "storage_skin": 0,
+                }
+                for key, val in defaults.items():
+                    if key not in node:
+                        node[key] = val
+                        updated = True
                 for key in (
-                    "work_available",
-                    "work_needed",
-                    "storage_silver",
-                    "storage_basic",
-                    "storage_luxury",
-                    "jarldom_area",
-                    "expected_license_income",
+                    "population",
+                    "tunnland",
+                    "hunters",
+                    "gamekeeper_id",
+                    "animals",
+                    "soldiers",
+                    "total_land",
+                    "forest_land",
+                    "cleared_land",
+                    "manor_land",
+                    "cultivated_land",
+                    "cultivated_quality",
+                    "fallow_land",
+                    "has_herd",
+                    "hunt_quality",
+                    "hunting_law",
+                    "fish_quality",
+                    "fishing_boats",
+                    "river_level",
                 ):
-                    if key not in node:
-                        node[key] = 0
+                    if key in node:
+                        del node[key]
                         updated = True
-            elif depth >= 4:
-                if "res_type" not in node:
-                    node["res_type"] = "Resurs"
+            elif res_type == "Jaktmark":
+                if "tunnland" not in node:
+                    node["tunnland"] = 0
                     updated = True
-                res_type = node.get("res_type")
-                # Soldiers field only for Soldier resources
-                if res_type == "Soldater":
-                    if "soldiers" not in node or not isinstance(node["soldiers"], list):
-                        node["soldiers"] = []
-                        updated = True
-                else:
-                    if "soldiers" in node:
-                        del node["soldiers"]
+                if "hunters" not in node:
+                    node["hunters"] = 0
+                    updated = True
+                if "gamekeeper_id" not in node:
+                    node["gamekeeper_id"] = None
+                    updated = True
+            elif res_type == "Väder":
+                defaults = {
+                    "spring_weather": NORMAL_WEATHER["spring"],
+                    "summer_weather": NORMAL_WEATHER["summer"],
+                    "autumn_weather": NORMAL_WEATHER["autumn"],
+                    "winter_weather": NORMAL_WEATHER["winter"],
+                    "weather_effect": "",
+                }
+                for key, val in defaults.items():
+                    if key not in node:
+                        node[key] = val
                         updated = True
-
-                # Animals field only for Animal resources
-                if res_type == "Djur":
-                    if "animals" not in node or not isinstance(node["animals"], list):
-                        node["animals"] = []
+                for key in (
+                    "population",
+                    "tunnland",
+                    "hunters",
+                    "gamekeeper_id",
+                    "animals",
+                    "soldiers",
+                    "total_land",
+                    "forest_land",
+                    "cleared_land",
+                    "manor_land",
+                    "cultivated_land",
+                    "cultivated_quality",
+                    "fallow_land",
+                    "has_herd",
+                    "hunt_quality",
+                    "hunting_law",
+                    "fish_quality",
+                    "fishing_boats",
+                    "river_level",
+                ):
+                    if key in node:
+                        del node[key]
                         updated = True
-                else:
-                    if "animals" in node:
-                        del node["animals"]
+            else:
+                for key in (
+                    "total_land",
+                    "forest_land",
+                    "cleared_land",
+                    "manor_land",
+                    "cultivated_land",
+                    "cultivated_quality",
+                    "fallow_land",
+                    "has_herd",
+                    "hunt_quality",
+                    "hunting_law",
+                ):
+                    if key in node:
+                        del node[key]
                         updated = True
 
-                # Land fields only for Mark resources
-                if res_type == "Mark":
-                    for key in ("total_land", "forest_land", "cleared_land"):
-                        if key not in node:
-                            node[key] = 0
-                            updated = True
-                elif res_type == "Gods":
-                    defaults = {
-                        "manor_land": 0,
-                        "cultivated_land": 0,
-                        "cultivated_quality": 3,
-                        "fallow_land": 0,
-                        "has_herd": False,
-                        "forest_land": 0,
-                        "hunt_quality": 3,
-                        "hunting_law": 0,
-                    }
-                    for key, val in defaults.items():
-                        if key not in node:
-                            node[key] = val
-                            updated = True
-                    try:
-                        cq = int(node.get("cultivated_quality", 3))
-                    except (ValueError, TypeError):
-                        cq = 3
-                    cq = max(1, min(cq, 5))
-                    if node.get("cultivated_quality") != cq:
-                        node["cultivated_quality"] = cq
-                        updated = True
-                    try:
-                        hq = int(node.get("hunt_quality", 3))
-                    except (ValueError, TypeError):
-                        hq = 3
-                    hq = max(1, min(hq, 5))
-                    if node.get("hunt_quality") != hq:
-                        node["hunt_quality"] = hq
-                        updated = True
-                    try:
-                        hl = int(node.get("hunting_law", 0))
-                    except (ValueError, TypeError):
-                        hl = 0
-                    hl = max(0, min(hl, 20))
-                    if node.get("hunting_law") != hl:
-                        node["hunting_law"] = hl
-                        updated = True
-                elif res_type == "Djur":
-                    if "population" in node:
-                        del node["population"]
-                        updated = True
-                elif res_type in {"Hav", "Flod"}:
-                    if "fish_quality" not in node:
-                        node["fish_quality"] = "Normalt"
-                        updated = True
-                    if "fishing_boats" not in node:
-                        node["fishing_boats"] = 0
-                        updated = True
-                    if res_type == "Flod":
-                        if "river_level" not in node:
-                            node["river_level"] = 1
-                            updated = True
-                    elif "river_level" in node:
-                        del node["river_level"]
-                        updated = True
-                elif res_type == "Lager":
-                    defaults = {
-                        "lager_text": "",
-                        "storage_silver": 0,
-                        "storage_basic": 0,
-                        "storage_luxury": 0,
-                        "storage_timber": 0,
-                        "storage_coal": 0,
-                        "storage_iron_ore": 0,
-                        "storage_iron": 0,
-                        "storage_animal_feed": 0,
-                        "storage_skin": 0,
-                    }
-                    for key, val in defaults.items():
-                        if key not in node:
-                            node[key] = val
-                            updated = True
-                    for key in (
-                        "population",
-                        "tunnland",
-                        "hunters",
-                        "gamekeeper_id",
-                        "animals",
-                        "soldiers",
-                        "total_land",
-                        "forest_land",
-                        "cleared_land",
-                        "manor_land",
-                        "cultivated_land",
-                        "cultivated_quality",
-                        "fallow_land",
-                        "has_herd",
-                        "hunt_quality",
-                        "hunting_law",
-                        "fish_quality",
-                        "fishing_boats",
-                        "river_level",
-                    ):
-                        if key in node:
-                            del node[key]
-                            updated = True
-                elif res_type == "Jaktmark":
-                    if "tunnland" not in node:
-                        node["tunnland"] = 0
-                        updated = True
-                    if "hunters" not in node:
-                        node["hunters"] = 0
-                        updated = True
-                    if "gamekeeper_id" not in node:
-                        node["gamekeeper_id"] = None
-                        updated = True
-                elif res_type == "Väder":
-                    defaults = {
-                        "spring_weather": NORMAL_WEATHER["spring"],
-                        "summer_weather": NORMAL_WEATHER["summer"],
-                        "autumn_weather": NORMAL_WEATHER["autumn"],
-                        "winter_weather": NORMAL_WEATHER["winter"],
-                        "weather_effect": "",
-                    }
-                    for key, val in defaults.items():
-                        if key not in node:
-                            node[key] = val
-                            updated = True
-                    for key in (
-                        "population",
-                        "tunnland",
-                        "hunters",
-                        "gamekeeper_id",
-                        "animals",
-                        "soldiers",
-                        "total_land",
-                        "forest_land",
-                        "cleared_land",
-                        "manor_land",
-                        "cultivated_land",
-                        "cultivated_quality",
-                        "fallow_land",
-                        "has_herd",
-                        "hunt_quality",
-                        "hunting_law",
-                        "fish_quality",
-                        "fishing_boats",
-                        "river_level",
-                    ):
-                        if key in node:
-                            del node[key]
-                            updated = True
-                else:
-                    for key in (
-                        "total_land",
-                        "forest_land",
-                        "cleared_land",
-                        "manor_land",
-                        "cultivated_land",
-                        "cultivated_quality",
-                        "fallow_land",
-                        "has_herd",
-                        "hunt_quality",
-                        "hunting_law",
-                    ):
-                        if key in node:
-                            del node[key]
-                            updated = True
-
-                for key in ("characters", "buildings"):
-                    if key not in node or not isinstance(node[key], list):
-                        node[key] = []
-                        updated = True
+            for key in ("characters", "buildings"):
+                if key not in node or not isinstance(node[key], list):
+                    node[key] = []
+                    updated = True
 
-            if updated:
-                nodes_updated += 1
+        return updated
 
+    def _finish_validation(
+        self, all_node_ids: set[int], max_node_id_found: int, nodes_updated: int
+    ) -> Tuple[int, int]:
+        """Run the cross-node checks that need every node to be present."""
+        chars_updated = 0
         for nid_str, node in self.world_data.get("nodes", {}).items():
             nid_int = int(nid_str)
             parent_id = node.get("parent_id")
@@ -6,7 +6,14 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
 from events import PROVINCE_OWNER_CHANGED
-from utils import generate_swedish_village_name
+from field_index import FieldIndex
+from hierarchy_index import HierarchyIndex
+from node_store import NodeStore, as_node_id
+from node_table import BASE_POPULATION, NodeTable, base_population
+from owner_index import OwnerIndex
+from rollup_cache import RollupCache
+from rollup_engine import NodeRollup, RollupEngine, local_rollup
+from undo_log import MISSING, Changes, UndoEntry, UndoLog
 from constants import (
     MAX_NEIGHBORS,
     NEIGHBOR_NONE_STR,
@@ -14,21 +21,24 @@ from constants import (
     DAGSVERKEN_UMBARANDE,
     CRAFTSMAN_LICENSE_FEES,
 )
-from node import Node
+from node import Node, NodeView
 from personal_province import (
     PersonalProvinceError,
     build_personal_path,
     validate_assignment,
 )
 from rollup_policy import (
-    STORAGE_RESOURCE_KEYS,
     get_local_population_contribution,
-    get_local_storage_contribution,
     get_local_work_available_contribution,
     get_local_work_needed_contribution,
 )
 from world_interface import WorldInterface
 
+# Fields that feed a node's own population
+POPULATION_FIELDS = frozenset(
+    {"population", "free_peasants", "unfree_peasants", "thralls", "burghers"}
+)
+
 
 @dataclass
 class AssignResult:
@@ -47,8 +57,13 @@ class WorldManager(WorldInterface):
         self, world_data: Dict[str, Any] | None = None, event_bus=None
     ) -> None:
         super().__init__(world_data)
-        self._depth_cache: Dict[int, int] = {}
-        self._snapshots: list[dict[str, Any]] = []
+        self._hierarchy: HierarchyIndex | None = None
+        self._node_store: NodeStore | None = None
+        self._node_table: NodeTable | None = None
+        self._owner_index: OwnerIndex | None = None
+        self._field_indexes: Dict[str, FieldIndex] = {}
+        self._rollup_cache: RollupCache | None = None
+        self._undo_log = UndoLog()
         self._tax_cache_stale = False
         self._event_bus = event_bus
 
@@ -56,29 +71,176 @@ class WorldManager(WorldInterface):
     # Utility methods
     # -------------------------------------------
     def clear_depth_cache(self) -> None:
-        self._depth_cache = {}
+        """Drop the hierarchy, field indexes and cached rollups after the
+        hierarchy changed."""
+        self._hierarchy = None
+        self._node_store = None
+        self._node_table = None
+        self._owner_index = None
+        self._field_indexes = {}
+        self.invalidate_rollups()
+
+    def set_world_data(self, world_data: Dict[str, Any]) -> None:
+        super().set_world_data(world_data)
+        self.clear_depth_cache()
+
+    @property
+    def hierarchy(self) -> HierarchyIndex:
+        """Return the hierarchy index for the current nodes."""
+        nodes = self.world_data.get("nodes", {})
+        if self._hierarchy is None or self._hierarchy.nodes is not nodes:
+            self._hierarchy = HierarchyIndex(nodes)
+        return self._hierarchy
+
+    @property
+    def node_store(self) -> NodeStore:
+        """Return the int-keyed view of the current nodes."""
+        nodes = self.world_data.get("nodes", {})
+        if self._node_store is None or self._node_store.nodes is not nodes:
+            self._node_store = NodeStore(nodes)
+        return self._node_store
+
+    @property
+    def node_table(self) -> NodeTable:
+        """Return the columnar view of the numeric node fields."""
+        table = self._node_table
+        if (
+            table is None
+            or table.store is not self.node_store
+            or table.order is not self.hierarchy.tour_order()
+        ):
+            table = self._node_table = NodeTable(self.node_store, self.hierarchy)
+        return table
+
+    @property
+    def owner_index(self) -> OwnerIndex:
+        """Return the personal provinces of the current nodes by owner."""
+        index = self._owner_index
+        if (
+            index is None
+            or index.store is not self.node_store
+            or index.order is not self.hierarchy.tour_order()
+        ):
+            index = self._owner_index = OwnerIndex(self.node_store, self.hierarchy)
+        return index
+
+    def _field_index(self, field: str) -> FieldIndex:
+        nodes = self.world_data.get("nodes", {})
+        index = self._field_indexes.get(field)
+        if index is None or index.nodes is not nodes:
+            index = self._field_indexes[field] = FieldIndex(nodes, field)
+        return index
+
+    def reindex_node(self, node_id: int) -> None:
+        """Refresh the field indexes and cached rollups after fields of
+        ``node_id`` were edited."""
+        for index in self._field_indexes.values():
+            index.update(as_node_id(node_id))
+        if self._node_table is not None:
+            self._node_table.update(as_node_id(node_id))
+        if self._owner_index is not None:
+            self._owner_index.update(as_node_id(node_id))
+        self.mark_node_changed(node_id)
+
+    def _rollups(self) -> RollupCache:
+        nodes = self.world_data.get("nodes", {})
+        if self._rollup_cache is None or self._rollup_cache.nodes is not nodes:
+            self._rollup_cache = RollupCache(nodes)
+        return self._rollup_cache
+
+    def mark_node_changed(self, node_id: int) -> None:
+        """Invalidate the cached rollups that include ``node_id``."""
+        nid = as_node_id(node_id)
+        if nid is None:
+            return
+        self._rollups().invalidate([nid, *self.hierarchy.ancestors(nid)])
+
+    def invalidate_rollups(self) -> None:
+        """Drop all cached rollups, e.g. after edits made outside this class."""
+        if self._rollup_cache is not None:
+            self._rollup_cache.clear()
+
+    def rollup_cache_stats(self) -> Dict[str, int]:
+        """Return hit/miss counts of the rollup cache."""
+        return self._rollups().stats()
+
+    def _nodes_for_ids(self, node_ids: List[int]) -> List[Dict[str, Any]]:
+        store = self.node_store
+        return [store[nid] for nid in node_ids]
+
+    def node_ids_at_depth(self, depth: int) -> List[int]:
+        """Return the ids of all nodes at ``depth`` in ascending order."""
+        return list(self.hierarchy.ids_at_depth(depth))
+
+    def nodes_at_depth(self, depth: int) -> List[Dict[str, Any]]:
+        """Return node dicts at ``depth`` ordered by id."""
+        return self._nodes_for_ids(self.hierarchy.ids_at_depth(depth))
+
+    def nodes_at_depth_by_name(self, depth: int) -> List[Dict[str, Any]]:
+        """Return node dicts at ``depth`` ordered by display name."""
+        return sorted(
+            self.nodes_at_depth(depth),
+            key=lambda node: self.get_display_name_for_node(node, depth),
+        )
+
+    def nodes_by_res_type(self, res_type: str) -> List[Dict[str, Any]]:
+        return self._nodes_for_ids(self._field_index("res_type").ids_with(res_type))
+
+    def nodes_by_settlement_type(self, settlement_type: str) -> List[Dict[str, Any]]:
+        return self._nodes_for_ids(
+            self._field_index("settlement_type").ids_with(settlement_type)
+        )
 
     def set_event_bus(self, event_bus) -> None:
         self._event_bus = event_bus
 
     def create_snapshot(
-        self, reason: str = "", context: Dict[str, Any] | None = None
-    ) -> None:
-        """Store a lightweight copy of the world for undo/inspection."""
+        self,
+        reason: str = "",
+        context: Dict[str, Any] | None = None,
+        changes: Changes | None = None,
+    ) -> UndoEntry:
+        """Record an applied edit in the undo history.
+
+        ``changes`` maps node ids to the edited fields and their values
+        before and after the edit; see :mod:`undo_log`.
+        """
 
-        snapshot = {
-            "reason": reason,
-            "context": context or {},
-            "state": copy.deepcopy(self.world_data),
-        }
-        self._snapshots.append(snapshot)
+        return self._undo_log.record(reason, context, changes or {})
+
+    def undo(self) -> UndoEntry | None:
+        """Revert the latest recorded edit, if any, and return it."""
+        entry = self._undo_log.undo(self.node_store)
+        if entry is not None:
+            self._after_history_step(entry)
+        return entry
+
+    def redo(self) -> UndoEntry | None:
+        """Re-apply the latest undone edit, if any, and return it."""
+        entry = self._undo_log.redo(self.node_store)
+        if entry is not None:
+            self._after_history_step(entry)
+        return entry
+
+    def _after_history_step(self, entry: UndoEntry) -> None:
+        if any(
+            "parent_id" in fields or "children" in fields
+            for fields in entry.changes.values()
+        ):
+            self.clear_depth_cache()
+        for node_id, fields in entry.changes.items():
+            self.reindex_node(node_id)
+            if "owner_assigned_id" in fields or "owner_assigned_level" in fields:
+                node = self.node_store.get(node_id) or {}
+                self._recalculate_personal_economy(node_id)
+                self._emit_owner_change_event(node_id, node.get("owner_assigned_id"))
 
     def _lineage_for_node(self, node_id: int) -> List[int]:
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
         lineage: List[int] = []
         current = node_id
         while True:
-            node = nodes.get(str(current))
+            node = store.get(current)
             if not node:
                 break
             parent_raw = node.get("parent_id")
@@ -93,25 +255,7 @@ class WorldManager(WorldInterface):
         return lineage
 
     def _is_descendant(self, ancestor_id: int, candidate_id: int) -> bool:
-        nodes = self.world_data.get("nodes", {})
-        stack = [ancestor_id]
-        visited: set[int] = set()
-        while stack:
-            current = stack.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            if current == candidate_id and current != ancestor_id:
-                return True
-            node = nodes.get(str(current))
-            if not node:
-                continue
-            for child in node.get("children", []):
-                try:
-                    stack.append(int(child))
-                except (TypeError, ValueError):
-                    continue
-        return False
+        return self.hierarchy.is_ancestor(ancestor_id, candidate_id)
 
     def _recalculate_personal_economy(self, node_id: int) -> None:
         """Mark caches dirty and recompute simple income placeholders."""
@@ -150,8 +294,8 @@ class WorldManager(WorldInterface):
         except (TypeError, ValueError):
             return AssignResult(False, "Ogiltigt provins-id")
 
-        nodes = self.world_data.get("nodes", {})
-        node_data = nodes.get(str(province_int))
+        store = self.node_store
+        node_data = store.get(province_int)
         if not node_data:
             return AssignResult(False, "Provinsen kunde inte hittas")
 
@@ -188,7 +332,7 @@ class WorldManager(WorldInterface):
             return AssignResult(False, str(exc))
 
         if owner_level != "none":
-            if owner_id is None or str(owner_id) not in nodes:
+            if owner_id is None or owner_id not in store:
                 return AssignResult(False, "Ägaren finns inte i världen")
             owner_depth = self.get_depth_of_node(owner_id)
             try:
@@ -206,14 +350,27 @@ class WorldManager(WorldInterface):
         except PersonalProvinceError as exc:
             return AssignResult(False, str(exc))
 
+        changes = {
+            province_int: {
+                key: (node_data.get(key, MISSING), value)
+                for key, value in (
+                    ("owner_assigned_level", owner_level),
+                    ("owner_assigned_id", owner_id),
+                    ("personal_province_path", personal_path),
+                )
+            }
+        }
         node_data["owner_assigned_level"] = owner_level
         node_data["owner_assigned_id"] = owner_id
         node_data["personal_province_path"] = personal_path
+        if self._owner_index is not None:
+            self._owner_index.update(province_int)
 
         self._recalculate_personal_economy(province_int)
         self.create_snapshot(
             reason="owner-change",
             context={"province_id": province_int, "owner_id": owner_id},
+            changes=changes,
         )
         self._emit_owner_change_event(province_int, owner_id)
 
@@ -245,90 +402,183 @@ class WorldManager(WorldInterface):
             return 0
 
     def update_population_totals(self) -> None:
-        """Update population for each node by summing immediate children."""
-        nodes = self.world_data.get("nodes", {})
-        if not nodes:
+        """Store each node's population plus that of all its descendants.
+
+        Tree-shaped worlds are summed over the node table in one pass; see
+        :mod:`node_table`.
+        """
+        store = self.node_store
+        if not store:
             return
 
-        depth_map: Dict[int, int] = {}
-        max_depth = 0
-        for nid_str in nodes.keys():
-            try:
-                nid = int(nid_str)
-            except ValueError:
-                continue
-            d = self.get_depth_of_node(nid)
-            depth_map[nid] = d
-            max_depth = max(max_depth, d)
+        hierarchy = self.hierarchy
+        if hierarchy.is_tree_shaped():
+            # Each total is a subtree sum of the base values over the tour
+            table = self.node_table
+            own = table.refresh(BASE_POPULATION)
+            totals = table.subtree_sums(BASE_POPULATION)
+            for nid, base_pop, total in zip(table.order, own, totals):
+                node = store[nid]
+                node["_base_population"] = base_pop
+                node["population"] = total
+            return
+        self._update_population_totals_by_walk()
 
-        base_population: Dict[int, int] = {}
+    def _update_population_totals_by_walk(self) -> None:
+        """Child-by-child version of :meth:`update_population_totals`.
+
+        Needed when nodes are shared between parents or sit in cycles, where
+        the tour does not match the children lists.
+        """
+        store = self.node_store
+        hierarchy = self.hierarchy
+        depth_map: Dict[int, int] = {nid: hierarchy.depth_of(nid) for nid in store}
+
+        own_population: Dict[int, int] = {}
         # Determine the intrinsic population for each node. Always recompute the
         # base value so that changes to settlement fields are reflected on
         # subsequent calls. Use the previously stored ``_base_population`` as the
         # population field to avoid compounding child totals from earlier runs.
-        for nid in depth_map:
-            node = nodes.get(str(nid))
-            if not node:
-                continue
-            base_input = dict(node)
-            if "_base_population" in node:
-                base_input["population"] = node["_base_population"]
-            base_pop = self.calculate_population_from_fields(base_input)
+        for nid, node in store.items():
+            base_pop = base_population(node)
             node["_base_population"] = base_pop
-            base_population[nid] = base_pop
+            own_population[nid] = base_pop
 
         # Reset all nodes to their base population
-        for nid, base_pop in base_population.items():
-            nodes[str(nid)]["population"] = base_pop
+        for nid, base_pop in own_population.items():
+            store[nid]["population"] = base_pop
 
         # Now accumulate child populations from deepest level upwards
-        parent_lookup: Dict[int, List[int]] = {}
-        for cid_str, cdata in nodes.items():
-            try:
-                cid = int(cid_str)
-            except ValueError:
+        for nid in sorted(depth_map, key=depth_map.__getitem__, reverse=True):
+            if depth_map[nid] < 0:
                 continue
-            pid = cdata.get("parent_id")
-            if isinstance(pid, str) and pid.isdigit():
-                pid = int(pid)
-            if isinstance(pid, int):
-                parent_lookup.setdefault(pid, []).append(cid)
-
-        for depth in range(max_depth, -1, -1):
-            for nid, d in depth_map.items():
-                if d != depth:
-                    continue
-                node = nodes.get(str(nid))
-                if not node:
+            total = own_population.get(nid, 0)
+            for cid in hierarchy.children_of(nid):
+                try:
+                    total += int(store[cid].get("population", 0) or 0)
+                except (ValueError, TypeError):
                     continue
-                total = base_population.get(nid, 0)
-                child_ids = set(node.get("children", []))
-                child_ids.update(parent_lookup.get(nid, []))
-                for cid in child_ids:
-                    child = nodes.get(str(cid))
-                    if not child:
-                        continue
-                    try:
-                        total += int(child.get("population", 0) or 0)
-                    except (ValueError, TypeError):
-                        continue
-                node["population"] = total
+            store[nid]["population"] = total
+
+    def set_node_field(self, node_id: int, key: str, value: Any) -> bool:
+        """Store ``value`` on a node and update the stored totals above it.
+
+        Instead of recomputing every node, the change in the node's local
+        contributions is added to the node and each ancestor: ``population``
+        as kept by :meth:`update_population_totals` and any
+        ``total_resources`` left by :meth:`calculate_total_resources`. Both
+        then match what a full recompute would give, provided they did
+        before the change.
+
+        Returns ``False`` without writing anything if the node does not exist.
+        """
+        store = self.node_store
+        node = store.get(node_id)
+        if node is None:
+            return False
+        node_id = as_node_id(node_id)
+        hierarchy = self.hierarchy
+        depth = hierarchy.depth_of(node_id)
+        before = local_rollup(node, depth)
+        old_base = node.get("_base_population")
+        node[key] = value
+
+        chain = [node_id, *hierarchy.ancestors(node_id)]
+        if key in POPULATION_FIELDS:
+            if key == "population" or old_base is None or depth < 0:
+                # A full recompute ignores a hand-edited total, and there is no
+                # consistent base to start from; let it decide.
+                self.update_population_totals()
+            else:
+                new_base = self.calculate_population_from_fields(
+                    {**node, "population": old_base}
+                )
+                node["_base_population"] = new_base
+                delta = new_base - old_base
+                if delta:
+                    for nid in chain:
+                        target = store[nid]
+                        try:
+                            current = int(target.get("population", 0) or 0)
+                        except (ValueError, TypeError):
+                            current = 0
+                        target["population"] = current + delta
+
+        after = local_rollup(node, depth)
+        self._apply_total_resources_delta(chain, before, after)
+        self._rollups().invalidate(chain)
+        if self._node_table is not None:
+            self._node_table.update(node_id)
+        return True
+
+    def _apply_total_resources_delta(
+        self, node_ids: List[int], before: NodeRollup, after: NodeRollup
+    ) -> None:
+        changes: Dict[str, Dict[str, int]] = {}
+        for name in ("soldiers", "characters", "animals", "buildings"):
+            old, new = getattr(before, name), getattr(after, name)
+            diff = {
+                kind: new.get(kind, 0) - old.get(kind, 0)
+                for kind in old.keys() | new.keys()
+            }
+            diff = {kind: amount for kind, amount in diff.items() if amount}
+            if diff:
+                changes[name] = diff
+        population = after.population - before.population
+        if not population and not changes:
+            return
+
+        store = self.node_store
+        for nid in node_ids:
+            totals = store[nid].get("total_resources")
+            if not isinstance(totals, dict):
+                continue
+            totals["population"] = totals.get("population", 0) + population
+            for name, diff in changes.items():
+                counts = totals.setdefault(name, {})
+                for kind, amount in diff.items():
+                    remaining = counts.get(kind, 0) + amount
+                    if remaining:
+                        counts[kind] = remaining
+                    else:
+                        counts.pop(kind, None)
+
+    def rollup(self, node_id: int) -> Dict[int, NodeRollup]:
+        """Return every subtree aggregate for ``node_id`` and its descendants.
+
+        One traversal computes work, umbäranden, license income, resources
+        and storage for each node of the subtree; see :mod:`rollup_engine`.
+        """
+        root_id = as_node_id(node_id)
+        if root_id is None:
+            return {}
+        return RollupEngine(self.node_store, self.hierarchy).run(root_id)
+
+    def node_rollup(self, node_id: int) -> NodeRollup:
+        """Return the aggregates of ``node_id`` from the rollup cache.
+
+        Results stay cached until :meth:`mark_node_changed` (or
+        :meth:`reindex_node`) is called for the node or a descendant, or the
+        hierarchy changes.
+        """
+        root_id = as_node_id(node_id)
+        if root_id is None:
+            return NodeRollup()
+        return self._rollups().get(root_id, self.rollup)
 
     def aggregate_resources(self, node_id: int) -> Dict[str, Dict[str, int]]:
         """Return aggregated resource counts for ``node_id`` and descendants."""
 
         totals = {"soldiers": {}, "characters": {}, "animals": {}, "buildings": {}}
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
 
         def add_count(target: Dict[str, int], key: str, amount: int = 1) -> None:
             if not key:
                 return
             target[key] = target.get(key, 0) + amount
 
-        def recurse(nid: int) -> None:
-            node = nodes.get(str(nid))
-            if not node:
-                return
+        for nid in self.hierarchy.subtree(node_id):
+            node = store[nid]
             for entry in node.get("soldiers", []):
                 t = entry.get("type")
                 c = entry.get("count", 0)
@@ -357,10 +607,6 @@ class WorldManager(WorldInterface):
                     c = 0
                 add_count(totals["buildings"], t, c)
 
-            for child in node.get("children", []):
-                recurse(child)
-
-        recurse(node_id)
         return totals
 
     def calculate_work_available(
@@ -368,13 +614,13 @@ class WorldManager(WorldInterface):
     ) -> int:
         """Sum available work days for ``node_id`` and all descendants."""
 
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
         if visited is None:
             visited = set()
         if node_id in visited:
             return 0
         visited.add(node_id)
-        node = nodes.get(str(node_id))
+        node = store.get(node_id)
         if not node:
             return 0
         depth = self.get_depth_of_node(node_id)
@@ -383,9 +629,8 @@ class WorldManager(WorldInterface):
             depth=depth,
         )
         for child in node.get("children", []):
-            try:
-                cid = int(child)
-            except (ValueError, TypeError):
+            cid = as_node_id(child)
+            if cid is None:
                 continue
             total += self.calculate_work_available(cid, visited)
         return total
@@ -399,13 +644,13 @@ class WorldManager(WorldInterface):
         are added recursively.
         """
 
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
         if visited is None:
             visited = set()
         if node_id in visited:
             return 0
         visited.add(node_id)
-        node = nodes.get(str(node_id))
+        node = store.get(node_id)
         if not node:
             return 0
 
@@ -413,9 +658,8 @@ class WorldManager(WorldInterface):
         total = get_local_work_needed_contribution(node, depth=depth)
 
         for child in node.get("children", []):
-            try:
-                cid = int(child)
-            except (ValueError, TypeError):
+            cid = as_node_id(child)
+            if cid is None:
                 continue
             total += self.calculate_work_needed(cid, visited)
 
@@ -430,7 +674,7 @@ class WorldManager(WorldInterface):
         """
 
         total = self.calculate_work_needed(jarldom_id)
-        node = self.world_data.get("nodes", {}).get(str(jarldom_id))
+        node = self.node_store.get(jarldom_id)
         if node is not None:
             node["work_needed"] = total
         return total
@@ -441,13 +685,13 @@ class WorldManager(WorldInterface):
         Includes both dagsverken and weather modifiers stored on the node.
         """
 
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
         if visited is None:
             visited = set()
         if node_id in visited:
             return 0
         visited.add(node_id)
-        node = nodes.get(str(node_id))
+        node = store.get(node_id)
         if not node:
             return 0
         level = node.get("dagsverken", "normalt")
@@ -457,9 +701,8 @@ class WorldManager(WorldInterface):
         except (ValueError, TypeError):
             pass
         for child in node.get("children", []):
-            try:
-                cid = int(child)
-            except (ValueError, TypeError):
+            cid = as_node_id(child)
+            if cid is None:
                 continue
             total += self.calculate_umbarande(cid, visited)
         return total
@@ -469,13 +712,13 @@ class WorldManager(WorldInterface):
     ) -> int:
         """Sum expected license income for ``node_id`` and all descendants."""
 
-        nodes = self.world_data.get("nodes", {})
+        store = self.node_store
         if visited is None:
             visited = set()
         if node_id in visited:
             return 0
         visited.add(node_id)
-        node = nodes.get(str(node_id))
+        node = store.get(node_id)
         if not node:
             return 0
         try:
@@ -483,9 +726,8 @@ class WorldManager(WorldInterface):
         except (ValueError, TypeError):
             total = 0
         for child in node.get("children", []):
-            try:
-                cid = int(child)
-            except (ValueError, TypeError):
+            cid = as_node_id(child)
+            if cid is None:
                 continue
             total += self.calculate_license_income(cid, visited)
         return total
@@ -493,8 +735,8 @@ class WorldManager(WorldInterface):
     def _calculate_craftsman_license(self, node_id: int) -> int:
         """Recursively calculate license fees from craftsmen for ``node_id``."""
 
-        nodes = self.world_data.get("nodes", {})
-        node = nodes.get(str(node_id))
+        store = self.node_store
+        node = store.get(node_id)
         if not node:
             return 0
 
@@ -509,9 +751,8 @@ class WorldManager(WorldInterface):
             total += fee * count
 
         for child in node.get("children", []):
-            try:
-                cid = int(child)
-            except (ValueError, TypeError):
+            cid = as_node_id(child)
+            if cid is None:
                 continue
             total += self._calculate_craftsman_license(cid)
         return total
@@ -520,7 +761,7 @@ class WorldManager(WorldInterface):
         """Update ``expected_license_income`` for a jarldom from craftsmen."""
 
         total = self._calculate_craftsman_license(jarldom_id)
-        node = self.world_data.get("nodes", {}).get(str(jarldom_id))
+        node = self.node_store.get(jarldom_id)
         if node is not None:
             node["expected_license_income"] = total
         return total
@@ -534,22 +775,11 @@ class WorldManager(WorldInterface):
         """Recursively sum resources for ``node_id`` and store on each node.
 
         ``visited`` prevents infinite recursion if cycles exist in the hierarchy.
+        Children come from the hierarchy index unless an explicit
+        ``parent_lookup`` is given.
         """
 
-        nodes = self.world_data.get("nodes", {})
-        if parent_lookup is None:
-            parent_lookup = {}
-            for cid_str, cdata in nodes.items():
-                try:
-                    cid = int(cid_str)
-                except ValueError:
-                    continue
-                pid = cdata.get("parent_id")
-                if isinstance(pid, str) and pid.isdigit():
-                    pid = int(pid)
-                if isinstance(pid, int):
-                    parent_lookup.setdefault(pid, []).append(cid)
-
+        store = self.node_store
         if visited is None:
             visited = set()
         if node_id in visited:
@@ -567,7 +797,7 @@ class WorldManager(WorldInterface):
                 return
             target[key] = target.get(key, 0) + amount
 
-        node = nodes.get(str(node_id))
+        node = store.get(node_id)
         if not node:
             return {
                 "population": 0,
@@ -612,8 +842,11 @@ class WorldManager(WorldInterface):
                 c = 0
             add_count(totals["buildings"], t, c)
 
-        child_ids = set(node.get("children", []))
-        child_ids.update(parent_lookup.get(node_id, []))
+        if parent_lookup is None:
+            child_ids = self.hierarchy.children_of(node_id)
+        else:
+            child_ids = set(node.get("children", []))
+            child_ids.update(parent_lookup.get(node_id, []))
         for child_id in child_ids:
             child_totals = self.calculate_total_resources(
                 child_id, visited, parent_lookup
@@ -629,114 +862,37 @@ class WorldManager(WorldInterface):
 
     def get_storage_report(self, node_id) -> dict[str, int]:
         """Return reported physical storage totals for the rooted subtree."""
-        totals = {resource_key: 0 for resource_key in STORAGE_RESOURCE_KEYS}
-        nodes = self.world_data.get("nodes", {})
-
-        try:
-            root_id = int(node_id)
-        except (TypeError, ValueError):
-            return totals
-
-        parent_lookup: Dict[int, List[int]] = {}
-        for child_id_raw, child_data in nodes.items():
-            try:
-                child_id = int(child_id_raw)
-            except (TypeError, ValueError):
-                continue
-            parent_id = child_data.get("parent_id")
-            try:
-                parent_id = int(parent_id)
-            except (TypeError, ValueError):
-                continue
-            parent_lookup.setdefault(parent_id, []).append(child_id)
-
-        visited: set[int] = set()
-        pending = [root_id]
-        while pending:
-            current_id = pending.pop()
-            if current_id in visited:
-                continue
-            visited.add(current_id)
-
-            node = nodes.get(str(current_id))
-            if not node:
-                continue
-
-            depth = self.get_depth_of_node(current_id)
-            for resource_key in STORAGE_RESOURCE_KEYS:
-                totals[resource_key] += get_local_storage_contribution(
-                    node, resource_key, depth=depth
-                )
-
-            child_ids = list(node.get("children", []))
-            child_ids.extend(parent_lookup.get(current_id, []))
-            for child_id in child_ids:
-                try:
-                    pending.append(int(child_id))
-                except (TypeError, ValueError):
-                    continue
-
-        return totals
+        return self.node_rollup(node_id).storage_report()
 
     # -------------------------------------------
     # WorldInterface implementation
     # -------------------------------------------
     def get_depth_of_node(self, node_id: int) -> int:
         """Calculates the depth of ``node_id`` in the hierarchy."""
-        if node_id in self._depth_cache:
-            return self._depth_cache[node_id]
+        return self.hierarchy.depth_of(node_id)
 
-        nodes_dict = self.world_data.get("nodes", {})
-        depth = 0
-        current_node_id = node_id
-        visited = {current_node_id}
+    def get_children(self, node_id: int) -> List[NodeView]:
+        """Return :class:`NodeView` proxies for the direct children of ``node_id``."""
 
-        while True:
-            current_node_data = nodes_dict.get(str(current_node_id))
-            if not current_node_data:
-                self._depth_cache[node_id] = -1
-                return -1
-            parent_id = current_node_data.get("parent_id")
-            if parent_id is None:
-                self._depth_cache[node_id] = depth
-                return depth
-            if str(parent_id) not in nodes_dict:
-                self._depth_cache[node_id] = depth
-                return depth
-            depth += 1
-            current_node_id = parent_id
-            if current_node_id in visited:
-                self._depth_cache[node_id] = -99
-                return -99
-            visited.add(current_node_id)
-            if depth > 50:
-                self._depth_cache[node_id] = -100
-                return -100
-
-    def get_children(self, node_id: int) -> List[Node]:
-        """Return ``Node`` instances for the direct children of ``node_id``."""
-
-        nodes_dict = self.world_data.get("nodes", {})
-        node_data = nodes_dict.get(str(node_id))
+        store = self.node_store
+        node_data = store.get(node_id)
         if not node_data:
             return []
 
-        result: List[Node] = []
+        result: List[NodeView] = []
         for child_id in node_data.get("children", []):
-            try:
-                cid = int(child_id)
-            except (TypeError, ValueError):
-                continue
-            child_data = nodes_dict.get(str(cid))
+            child_data = store.get(child_id)
             if not child_data:
                 continue
-            result.append(Node.from_dict(child_data))
+            result.append(NodeView(child_data))
         return result
 
     def get_display_name_for_node(
         self, node_data: Dict[str, Any] | Any, depth: int
     ) -> str:
         """Return a readable name for ``node_data`` at ``depth``."""
+        if isinstance(node_data, NodeView):
+            node_data = node_data.data
         if isinstance(node_data, Node):
             node_id = node_data.node_id
             name = node_data.name
@@ -759,7 +915,7 @@ class WorldManager(WorldInterface):
         else:
             parent_id = node_data.get("parent_id")
         if parent_id is not None:
-            parent = self.world_data.get("nodes", {}).get(str(parent_id))
+            parent = self.node_store.get(parent_id)
             if parent:
                 parent_custom = str(parent.get("custom_name", "")).strip()
                 parent_name = parent_custom or parent.get("name") or f"Nod {parent_id}"
@@ -808,16 +964,22 @@ class WorldManager(WorldInterface):
             return
         target_count = node_data.get("num_subfiefs", 0)
         depth = self.get_depth_of_node(node_data["node_id"])
+        hierarchy = self.hierarchy
+        store = self.node_store
 
         next_id = max(
             self.world_data.get("next_node_id", 1),
-            max((int(nid) for nid in self.world_data.get("nodes", {})), default=0) + 1,
+            max(store, default=0) + 1,
         )
 
+        if len(current_children_ids) < target_count:
+            # New children change the tour the owner index was resolved
+            # along; rebuild it once on next use rather than re-resolving
+            # along a fresh tour for every child added
+            self._owner_index = None
         while len(current_children_ids) < target_count:
             new_id = next_id
             next_id += 1
-            new_id_str = str(new_id)
 
             if depth == 0:
                 child_name = "Furstendöme"
@@ -837,14 +999,19 @@ class WorldManager(WorldInterface):
                 "ruler_id": None,
             }
             if depth == 2:
+                # utils imports Tk; keep it out of headless imports of this module
+                from utils import generate_swedish_village_name
+
                 new_node["res_type"] = "Resurs"
                 new_node["custom_name"] = generate_swedish_village_name()
             elif depth >= 3:
                 new_node["res_type"] = "Resurs"
                 new_node["custom_name"] = ""
 
-            self.world_data["nodes"][new_id_str] = new_node
+            store.add(new_id, new_node)
             node_data.setdefault("children", []).append(new_id)
+            hierarchy.add_node(new_id, node_data["node_id"])
+            self.reindex_node(new_id)
             current_children_ids.add(new_id)
 
         self.world_data["next_node_id"] = next_id
@@ -857,44 +1024,32 @@ class WorldManager(WorldInterface):
             self.delete_node_and_descendants(child_id_to_remove)
 
     def delete_node_and_descendants(self, node_id: int) -> int:
-        node_id_str = str(node_id)
-        if node_id_str not in self.world_data.get("nodes", {}):
+        store = self.node_store
+        node_to_delete = store.get(node_id)
+        if node_to_delete is None:
             return 0
         deleted_count = 1
-        node_to_delete = self.world_data["nodes"][node_id_str]
+        self.mark_node_changed(node_id)
         for child_id in list(node_to_delete.get("children", [])):
             deleted_count += self.delete_node_and_descendants(child_id)
         parent_id = node_to_delete.get("parent_id")
         if parent_id is not None:
-            parent_node = self.world_data["nodes"].get(str(parent_id))
+            parent_node = store.get(parent_id)
             if parent_node and "children" in parent_node:
                 if node_id in parent_node["children"]:
                     parent_node["children"].remove(node_id)
                 elif str(node_id) in parent_node["children"]:
                     parent_node["children"].remove(str(node_id))
-        if node_id_str in self.world_data["nodes"]:
-            del self.world_data["nodes"][node_id_str]
+        nid = as_node_id(node_id)
+        if store.remove(nid) is not None:
+            self.hierarchy.remove_node(nid)
+            for index in self._field_indexes.values():
+                index.remove(nid)
         return deleted_count
 
     def count_descendants(self, node_id: int) -> int:
         """Return the total number of descendant nodes for ``node_id``."""
-        nodes = self.world_data.get("nodes", {})
-        visited: set[int] = set()
-
-        def recurse(nid: int) -> int:
-            if nid in visited:
-                return 0
-            visited.add(nid)
-            node = nodes.get(str(nid))
-            if not node:
-                return 0
-            total = 0
-            for child in node.get("children", []):
-                total += 1
-                total += recurse(child)
-            return total
-
-        return recurse(node_id)
+        return max(self.hierarchy.subtree_size(node_id) - 1, 0)
 
     def attempt_link_neighbors(
         self,
@@ -903,8 +1058,8 @@ class WorldManager(WorldInterface):
         slot1: int | None = None,
         slot2: int | None = None,
     ) -> tuple[bool, str]:
-        node1 = self.world_data["nodes"].get(str(node_id1))
-        node2 = self.world_data["nodes"].get(str(node_id2))
+        node1 = self.node_store.get(node_id1)
+        node2 = self.node_store.get(node_id2)
         if not node1 or not node2:
             return False, "Fel: En eller båda noder kunde inte hittas."
         if (
@@ -983,7 +1138,8 @@ class WorldManager(WorldInterface):
         """Replace ``node_id`` neighbor list with ``new_neighbors`` and ensure
         links are bidirectional."""
 
-        node = self.world_data.get("nodes", {}).get(str(node_id))
+        store = self.node_store
+        node = store.get(node_id)
         if not node:
             return
 
@@ -1011,11 +1167,9 @@ class WorldManager(WorldInterface):
             if isinstance(nb, dict) and isinstance(nb.get("id"), int)
         }
 
-        nodes_dict = self.world_data.get("nodes", {})
-
         # Remove stale links from neighbors no longer referenced
         for rid in old_ids - new_ids:
-            other = nodes_dict.get(str(rid))
+            other = store.get(rid)
             if not other:
                 continue
             other_neighbors = other.get("neighbors", [])
@@ -1035,7 +1189,7 @@ class WorldManager(WorldInterface):
             nid = entry.get("id")
             if not isinstance(nid, int):
                 continue
-            other = nodes_dict.get(str(nid))
+            other = store.get(nid)
             if not other:
                 continue
             border_val = entry.get("border", NEIGHBOR_NONE_STR)
@@ -1062,9 +1216,8 @@ class WorldManager(WorldInterface):
         """Set border type for the connection between two nodes."""
         if border_type not in BORDER_TYPES:
             border_type = NEIGHBOR_NONE_STR
-        nodes = self.world_data.get("nodes", {})
-        n1 = nodes.get(str(node_id1))
-        n2 = nodes.get(str(node_id2))
+        n1 = self.node_store.get(node_id1)
+        n2 = self.node_store.get(node_id2)
         if not n1 or not n2:
             return False
 
@@ -2,16 +2,22 @@ from __future__ import annotations
 
 from typing import Any, Callable, Dict
 
-from data_manager import save_worlds_to_file
+from data_manager import persist_worlds, record_world_edit
+from world_store import WorldCollection
 
 
 class WorldManagerUI:
     """High level world data operations used by the UI."""
 
     def __init__(
-        self, save_func: Callable[[Dict[str, Any]], None] = save_worlds_to_file
+        self,
+        save_func: Callable[[Dict[str, Any]], None] = persist_worlds,
+        journal_func: Callable[..., bool] = record_world_edit,
+        scheduler=None,
     ) -> None:
         self._save_func = save_func
+        self._journal_func = journal_func
+        self._scheduler = scheduler
 
     def save_current_world(
         self,
@@ -20,13 +26,61 @@ class WorldManagerUI:
         all_worlds: Dict[str, Any],
         refresh_cb: Callable[[], None] | None = None,
     ) -> None:
-        """Persist ``world_data`` and refresh any viewers."""
+        """Persist ``world_data`` and refresh any viewers.
+
+        With a sharded store only the active world is marked as changed, so
+        the other worlds are left untouched on disk.
+        """
         if active_world and world_data is not None:
             all_worlds[active_world] = world_data
             self.persist_worlds(all_worlds)
             if refresh_cb:
                 refresh_cb()
 
+    def save_node_edit(
+        self,
+        active_world: str | None,
+        world_data: Dict[str, Any] | None,
+        all_worlds: Dict[str, Any],
+        node_id: int | None,
+        key: str,
+        value: Any,
+        refresh_cb: Callable[[], None] | None = None,
+    ) -> None:
+        """Persist one node field change, appending to the journal if possible."""
+        if not active_world or world_data is None:
+            return
+        if node_id is not None and self._uses_scheduler(all_worlds):
+            all_worlds.stage_edit(active_world, world_data, node_id, key, value)
+            self.persist_worlds(all_worlds)
+            if refresh_cb:
+                refresh_cb()
+            return
+        if node_id is None or not self._journal_func(
+            all_worlds, active_world, world_data, node_id, key, value
+        ):
+            self.save_current_world(active_world, world_data, all_worlds, refresh_cb)
+            return
+        if refresh_cb:
+            refresh_cb()
+
     def persist_worlds(self, all_worlds: Dict[str, Any]) -> None:
-        """Write ``all_worlds`` to storage."""
+        """Write ``all_worlds`` to storage.
+
+        With a scheduler the write is debounced and done on its worker
+        thread from a snapshot taken when the debounce window closes.
+        """
+        if self._uses_scheduler(all_worlds):
+            self._scheduler.schedule(
+                id(all_worlds), lambda: all_worlds.detach(copy_data=True)
+            )
+            return
         self._save_func(all_worlds)
+
+    def flush(self) -> None:
+        """Block until every scheduled save has been written."""
+        if self._scheduler is not None:
+            self._scheduler.flush()
+
+    def _uses_scheduler(self, all_worlds: Dict[str, Any]) -> bool:
+        return self._scheduler is not None and isinstance(all_worlds, WorldCollection)
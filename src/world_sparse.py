@@ -0,0 +1,156 @@
+"""Sparse world serialisation that leaves default-valued node fields out.
+
+``Node.to_dict`` and ``validate_world_data`` give every node a full set of
+fields, most of which hold their default (``storage_timber: 0``, empty
+lists, the normal weather strings, six empty neighbour slots, ...). Writing
+those defaults for every node makes the saved world mostly noise.
+
+``sparsify_world`` drops every field whose value equals a known default and
+replaces it with a reference to a *profile*: the node's full key order plus
+the default values that were dropped. Nodes with the same layout share a
+profile, so the table stays small. ``rehydrate_world`` expands the nodes
+again, restoring both the values and the original key order, so the round
+trip is exact.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import MISSING, fields
+from typing import Any, Callable, Dict, List, Tuple
+
+from constants import MAX_NEIGHBORS, NEIGHBOR_NONE_STR
+from node import Node
+
+# Reserved node key naming the profile of a sparse node
+PROFILE_KEY = "_p"
+# World key holding the profile table of a sparse world
+PROFILES_KEY = "_sparse_profiles"
+
+
+def _default_candidates() -> Dict[str, List[Any]]:
+    """Return the default values each node field may be dropped at."""
+    candidates: Dict[str, List[Any]] = {}
+    for spec in fields(Node):
+        if spec.default is not MISSING:
+            candidates[spec.name] = [spec.default]
+        elif spec.default_factory is not MISSING:
+            candidates[spec.name] = [spec.default_factory()]
+    # ``validate_world_data`` and ``Node.to_dict`` pad neighbours to a full
+    # set of empty slots rather than the dataclass' empty list.
+    candidates["neighbors"].append(
+        [{"id": None, "border": NEIGHBOR_NONE_STR} for _ in range(MAX_NEIGHBORS)]
+    )
+    return candidates
+
+
+FIELD_DEFAULTS = _default_candidates()
+
+
+def _default_index(key: str, value: Any) -> int | None:
+    for idx, default in enumerate(FIELD_DEFAULTS.get(key, ())):
+        # ``False == 0`` so the type has to match as well
+        if type(value) is type(default) and value == default:
+            return idx
+    return None
+
+
+def is_sparse(world_data: Dict[str, Any]) -> bool:
+    return isinstance(world_data, dict) and PROFILES_KEY in world_data
+
+
+def sparsify_world(world_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of ``world_data`` with default node fields left out.
+
+    ``world_data`` itself is not modified; untouched values are shared with
+    the returned dict.
+    """
+    nodes = world_data.get("nodes")
+    if not isinstance(nodes, dict) or is_sparse(world_data):
+        return world_data
+    profile_ids: Dict[Tuple[Any, ...], int] = {}
+    profiles: List[Dict[str, Any]] = []
+    sparse_nodes: Dict[str, Any] = {}
+    for node_key, node in nodes.items():
+        if not isinstance(node, dict) or PROFILE_KEY in node:
+            sparse_nodes[node_key] = node
+            continue
+        kept: Dict[str, Any] = {}
+        dropped: List[Tuple[str, int]] = []
+        for key, value in node.items():
+            idx = _default_index(key, value)
+            if idx is None:
+                kept[key] = value
+            else:
+                dropped.append((key, idx))
+        if not dropped:
+            sparse_nodes[node_key] = node
+            continue
+        signature = (tuple(node), tuple(dropped))
+        profile_id = profile_ids.get(signature)
+        if profile_id is None:
+            profile_id = profile_ids[signature] = len(profiles)
+            profiles.append(
+                {
+                    "keys": list(node),
+                    "defaults": {key: FIELD_DEFAULTS[key][idx] for key, idx in dropped},
+                }
+            )
+        kept[PROFILE_KEY] = profile_id
+        sparse_nodes[node_key] = kept
+
+    sparse = {
+        key: sparse_nodes if key == "nodes" else value
+        for key, value in world_data.items()
+    }
+    sparse[PROFILES_KEY] = profiles
+    return sparse
+
+
+def rehydrate_world(world_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a world written by :func:`sparsify_world` in place.
+
+    Worlds that are not sparse are returned unchanged.
+    """
+    if not is_sparse(world_data):
+        return world_data
+    profiles = world_data.pop(PROFILES_KEY)
+    # One template per profile with every key in its original position;
+    # copying it and updating with the stored fields keeps that order.
+    # Lists and dicts need a fresh copy per node, scalars are shared.
+    expanded = []
+    for profile in profiles:
+        defaults = profile["defaults"]
+        template = {key: defaults.get(key) for key in profile["keys"]}
+        mutable = [
+            (key, _factory(value))
+            for key, value in defaults.items()
+            if isinstance(value, (list, dict))
+        ]
+        expanded.append((template, mutable))
+
+    nodes = world_data.get("nodes", {})
+    for node_key, node in nodes.items():
+        if not isinstance(node, dict) or PROFILE_KEY not in node:
+            continue
+        template, mutable = expanded[node.pop(PROFILE_KEY)]
+        restored = template.copy()
+        for key, factory in mutable:
+            restored[key] = factory()
+        restored.update(node)
+        nodes[node_key] = restored
+    return world_data
+
+
+def _factory(value: Any) -> Callable[[], Any]:
+    """Return a callable producing fresh copies of a list or dict default."""
+    if not value:
+        return type(value)
+    if isinstance(value, list) and all(
+        isinstance(item, dict)
+        and not any(isinstance(v, (list, dict)) for v in item.values())
+        for item in value
+    ):
+        # e.g. the empty neighbour slots: a shallow copy of each slot suffices
+        return lambda: [item.copy() for item in value]
+    return lambda: json.loads(json.dumps(value))
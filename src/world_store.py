@@ -0,0 +1,547 @@
+"""Sharded world storage with one file per world and a small manifest.
+
+The legacy format keeps every world in a single ``worlds.json`` which has to
+be parsed and rewritten as a whole. ``ShardedWorldStore`` instead writes each
+world to its own file and keeps a manifest that maps world names to files, so
+saving touches only the world that changed and loading reads only the
+manifest plus the world being opened.
+
+Stores opened with ``sparse=True`` leave default-valued node fields out of
+the shards; they are restored when a world is loaded.
+
+Single field edits are appended to a per-world journal (one JSON line per
+change) instead of rewriting the shard. Loading replays the journal on top of
+the shard, and compaction folds it back into the shard once it grows.
+
+The manifest also records node/character counts and shard sizes, so the world
+catalogue can be listed without parsing any world.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+from world_sparse import rehydrate_world, sparsify_world
+from world_stream import read_world
+
+MANIFEST_FILE_NAME = "index.json"
+MANIFEST_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+# Number of journal entries after which a world is folded into its shard
+JOURNAL_COMPACT_THRESHOLD = 200
+
+
+def _write_atomic(path: Path, payload: str) -> None:
+    """Write ``payload`` to ``path`` via a temporary file and rename."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        fh.write(payload)
+    tmp_path.replace(path)
+
+
+def _copy_json(value: Any) -> Any:
+    """Copy JSON-shaped data (dicts, lists and scalars) much faster than deepcopy."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+def _locked(method):
+    """Serialise access to the store between the UI and a save worker."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def shard_file_name(world_name: str) -> str:
+    """Return a stable, filesystem-safe file name for ``world_name``."""
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", world_name).strip("_")[:40] or "world"
+    digest = hashlib.sha1(world_name.encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}.json"
+
+
+@dataclass(frozen=True)
+class WorldSummary:
+    """Catalogue metadata for one stored world."""
+
+    name: str
+    node_count: int | None = None
+    character_count: int | None = None
+    size_bytes: int | None = None
+
+
+def _summary_fields(world_data: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "node_count": len(world_data.get("nodes", {}) or {}),
+        "character_count": len(world_data.get("characters", {}) or {}),
+    }
+
+
+def apply_journal_entry(world_data: Dict[str, Any], entry: Dict[str, Any]) -> bool:
+    """Apply one journal ``entry`` to ``world_data``.
+
+    Returns ``False`` if the entry is malformed or targets a missing node.
+    """
+    try:
+        node_key = str(int(entry["node_id"]))
+        key = str(entry["key"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    node = world_data.get("nodes", {}).get(node_key)
+    if not isinstance(node, dict):
+        return False
+    node[key] = entry.get("value")
+    return True
+
+
+class ShardedWorldStore:
+    """Persist worlds as individual JSON files indexed by a manifest."""
+
+    def __init__(self, base_dir: str | Path, sparse: bool = False) -> None:
+        self.base_dir = Path(base_dir)
+        # Write shards without default-valued node fields (see world_sparse)
+        self.sparse = sparse
+        self.manifest_path = self.base_dir / MANIFEST_FILE_NAME
+        self._manifest: Dict[str, Dict[str, Any]] | None = None
+        self._journal_counts: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    @_locked
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Return the manifest entries keyed by world name."""
+        if self._manifest is None:
+            entries: Dict[str, Dict[str, Any]] = {}
+            if self.manifest_path.exists():
+                with self.manifest_path.open("r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+                raw_entries = data.get("worlds", {}) if isinstance(data, dict) else {}
+                for name, entry in raw_entries.items():
+                    if isinstance(entry, dict) and entry.get("file"):
+                        entries[name] = dict(entry)
+            self._manifest = entries
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        payload = {"version": MANIFEST_VERSION, "worlds": self.load_manifest()}
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(
+            self.manifest_path, json.dumps(payload, ensure_ascii=False, indent=2)
+        )
+
+    def world_names(self) -> list[str]:
+        return list(self.load_manifest().keys())
+
+    def shard_path(self, world_name: str) -> Path | None:
+        entry = self.load_manifest().get(world_name)
+        if not entry:
+            return None
+        return self.base_dir / entry["file"]
+
+    def journal_path(self, world_name: str) -> Path | None:
+        path = self.shard_path(world_name)
+        if path is None:
+            return None
+        return path.with_suffix(path.suffix + JOURNAL_SUFFIX)
+
+    # ------------------------------------------------------------------
+    # Edit journal
+    # ------------------------------------------------------------------
+    @_locked
+    def read_journal(self, world_name: str) -> list[Dict[str, Any]]:
+        """Return the journal entries recorded since the last compaction.
+
+        A torn final line from an interrupted append is ignored.
+        """
+        path = self.journal_path(world_name)
+        entries: list[Dict[str, Any]] = []
+        if path is None or not path.exists():
+            self._journal_counts[world_name] = 0
+            return entries
+        with path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict):
+                    entries.append(entry)
+        self._journal_counts[world_name] = len(entries)
+        return entries
+
+    @_locked
+    def journal_length(self, world_name: str) -> int:
+        if world_name not in self._journal_counts:
+            self.read_journal(world_name)
+        return self._journal_counts.get(world_name, 0)
+
+    @_locked
+    def append_journal(
+        self, world_name: str, entries: list[Dict[str, Any]]
+    ) -> int:
+        """Append ``entries`` to the journal of an existing world.
+
+        Each entry is ``{"node_id": ..., "key": ..., "value": ...}``. The file
+        is flushed to disk before returning. Returns the journal length.
+        """
+        path = self.journal_path(world_name)
+        if path is None:
+            raise KeyError(world_name)
+        count = self.journal_length(world_name)
+        lines = "".join(
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for entry in entries
+        )
+        if path.exists() and path.stat().st_size:
+            with path.open("rb") as fh:
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    # Terminate a torn line so the new entries stay readable
+                    lines = "\n" + lines
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._journal_counts[world_name] = count + len(entries)
+        return self._journal_counts[world_name]
+
+    def _clear_journal(self, world_name: str, file_name: str) -> None:
+        path = self.base_dir / (file_name + JOURNAL_SUFFIX)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._journal_counts[world_name] = 0
+
+    # ------------------------------------------------------------------
+    # World shards
+    # ------------------------------------------------------------------
+    @_locked
+    def load_world(self, world_name: str) -> Dict[str, Any] | None:
+        """Read a single world and replay its journal.
+
+        Returns ``None`` if the world is unknown.
+        """
+        path = self.shard_path(world_name)
+        if path is None or not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as fh:
+            world_data, _ = read_world(fh)
+        rehydrate_world(world_data)
+        for entry in self.read_journal(world_name):
+            apply_journal_entry(world_data, entry)
+        manifest_entry = self.load_manifest()[world_name]
+        if "node_count" not in manifest_entry:
+            # Entries written before the catalogue existed lack metadata
+            manifest_entry.update(_summary_fields(world_data))
+            manifest_entry["size_bytes"] = path.stat().st_size
+            self._save_manifest()
+        return world_data
+
+    @_locked
+    def catalogue(self) -> list[WorldSummary]:
+        """Return metadata for every world without reading any shard."""
+        summaries: list[WorldSummary] = []
+        for world_name, entry in self.load_manifest().items():
+            size = entry.get("size_bytes")
+            if size is None:
+                try:
+                    size = (self.base_dir / entry["file"]).stat().st_size
+                except OSError:
+                    size = None
+            summaries.append(
+                WorldSummary(
+                    name=world_name,
+                    node_count=entry.get("node_count"),
+                    character_count=entry.get("character_count"),
+                    size_bytes=size,
+                )
+            )
+        return summaries
+
+    def _write_shard(
+        self, world_name: str, entry: Dict[str, Any], world_data: Dict[str, Any]
+    ) -> None:
+        path = self.base_dir / entry["file"]
+        payload = sparsify_world(world_data) if self.sparse else world_data
+        _write_atomic(
+            path, json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        )
+        self._clear_journal(world_name, entry["file"])
+        entry.update(_summary_fields(world_data))
+        entry["size_bytes"] = path.stat().st_size
+
+    @_locked
+    def save_world(self, world_name: str, world_data: Dict[str, Any]) -> None:
+        """Write ``world_data`` to its shard and update the manifest entry.
+
+        A full write supersedes the journal, which is removed afterwards. A
+        crash between the two steps only replays edits already in the shard.
+        """
+        manifest = self.load_manifest()
+        entry = manifest.setdefault(world_name, {"file": shard_file_name(world_name)})
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._write_shard(world_name, entry, world_data)
+        self._save_manifest()
+
+    @_locked
+    def delete_world(self, world_name: str) -> bool:
+        """Remove ``world_name`` from the manifest and delete its shard."""
+        manifest = self.load_manifest()
+        entry = manifest.pop(world_name, None)
+        if entry is None:
+            return False
+        self._save_manifest()
+        self._clear_journal(world_name, entry["file"])
+        try:
+            os.remove(self.base_dir / entry["file"])
+        except FileNotFoundError:
+            pass
+        return True
+
+    @_locked
+    def import_worlds(self, all_worlds: Dict[str, Any]) -> int:
+        """Write every world in ``all_worlds`` as a shard.
+
+        Used once to migrate a legacy monolithic ``worlds.json``. Returns the
+        number of worlds imported.
+        """
+        manifest = self.load_manifest()
+        count = 0
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        for world_name, world_data in all_worlds.items():
+            if not isinstance(world_data, dict):
+                continue
+            entry = manifest.setdefault(
+                world_name, {"file": shard_file_name(world_name)}
+            )
+            self._write_shard(world_name, entry, world_data)
+            count += 1
+        self._save_manifest()
+        return count
+
+
+class WorldCollection(MutableMapping):
+    """Dict-like view of a :class:`ShardedWorldStore`.
+
+    Only world names are known up front; world data is read from its shard on
+    first access. Assignments and deletions are staged and written by
+    :meth:`flush`, which only touches the worlds that changed.
+    """
+
+    def __init__(
+        self,
+        store: ShardedWorldStore,
+        compact_threshold: int = JOURNAL_COMPACT_THRESHOLD,
+    ) -> None:
+        self.store = store
+        self.compact_threshold = compact_threshold
+        self._names: list[str] = store.world_names()
+        self._loaded: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set[str] = set()
+        self._deleted: set[str] = set()
+        # Field edits waiting to be journalled, keyed by (node_id, key)
+        self._pending_edits: Dict[str, Dict[tuple[int, str], Any]] = {}
+        self._journal_lengths: Dict[str, int] = {}
+        # Worlds whose background write failed; rewritten in full next time
+        self._failed: set[str] = set()
+        self._failed_lock = threading.Lock()
+
+    def __getitem__(self, world_name: str) -> Dict[str, Any]:
+        if world_name not in self._names:
+            raise KeyError(world_name)
+        if world_name not in self._loaded:
+            data = self.store.load_world(world_name)
+            if data is None:
+                raise KeyError(world_name)
+            self._loaded[world_name] = data
+        return self._loaded[world_name]
+
+    def __setitem__(self, world_name: str, world_data: Dict[str, Any]) -> None:
+        if world_name not in self._names:
+            self._names.append(world_name)
+        self._loaded[world_name] = world_data
+        self._dirty.add(world_name)
+        self._deleted.discard(world_name)
+        self._pending_edits.pop(world_name, None)
+
+    def __delitem__(self, world_name: str) -> None:
+        if world_name not in self._names:
+            raise KeyError(world_name)
+        self._names.remove(world_name)
+        self._loaded.pop(world_name, None)
+        self._dirty.discard(world_name)
+        self._pending_edits.pop(world_name, None)
+        self._deleted.add(world_name)
+
+    def __contains__(self, world_name: object) -> bool:
+        return world_name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def catalogue(self) -> list[WorldSummary]:
+        """Return sorted metadata for the worlds in this collection.
+
+        Worlds that are staged but not yet flushed are summarised from memory;
+        nothing is read from disk besides the manifest.
+        """
+        stored = {summary.name: summary for summary in self.store.catalogue()}
+        summaries: list[WorldSummary] = []
+        for world_name in sorted(self._names):
+            if world_name in self._dirty or world_name not in stored:
+                data = self._loaded.get(world_name, {})
+                summaries.append(WorldSummary(world_name, **_summary_fields(data)))
+            else:
+                summaries.append(stored[world_name])
+        return summaries
+
+    def is_loaded(self, world_name: str) -> bool:
+        return world_name in self._loaded
+
+    def flush(self) -> list[str]:
+        """Write staged changes to the store and return the names written."""
+        return self.detach()()
+
+    def detach(self, copy_data: bool = False) -> Callable[[], list[str]]:
+        """Take the staged changes and return a callable that writes them.
+
+        Staged state is cleared straight away. With ``copy_data`` the world
+        data is snapshotted first, so the returned callable can run on a
+        worker thread while the live worlds keep changing. Only worlds staged
+        for a full write are snapshotted; a world whose journal reaches the
+        compaction threshold is compacted by the callable from its shard and
+        journal instead. It returns the names of the worlds written in full.
+        """
+        copy = _copy_json if copy_data else (lambda value: value)
+        with self._failed_lock:
+            self._dirty.update(name for name in self._failed if name in self._loaded)
+            self._failed.clear()
+
+        deleted = sorted(self._deleted)
+        full_writes = set(self._dirty)
+        journals: Dict[str, list[Dict[str, Any]]] = {}
+        compactions: list[str] = []
+        for world_name, edits in self._pending_edits.items():
+            if world_name in full_writes:
+                continue
+            length = self._journal_length(world_name) + len(edits)
+            if length >= self.compact_threshold:
+                if not copy_data:
+                    full_writes.add(world_name)
+                    continue
+                compactions.append(world_name)
+                length = 0
+            self._journal_lengths[world_name] = length
+            journals[world_name] = [
+                {"node_id": node_id, "key": key, "value": copy(value)}
+                for (node_id, key), value in edits.items()
+            ]
+        written = sorted(full_writes)
+        for world_name in written:
+            self._journal_lengths[world_name] = 0
+        snapshots = [(name, copy(self._loaded[name])) for name in written]
+        self._deleted.clear()
+        self._dirty.clear()
+        self._pending_edits.clear()
+
+        store = self.store
+
+        def write() -> list[str]:
+            try:
+                for world_name in deleted:
+                    store.delete_world(world_name)
+                for world_name, entries in journals.items():
+                    store.append_journal(world_name, entries)
+                for world_name in compactions:
+                    store.save_world(world_name, store.load_world(world_name))
+                for world_name, world_data in snapshots:
+                    store.save_world(world_name, world_data)
+            except Exception:
+                with self._failed_lock:
+                    self._failed.update(journals)
+                    self._failed.update(written)
+                raise
+            return sorted(written + compactions)
+
+        return write
+
+    def _journal_length(self, world_name: str) -> int:
+        if world_name not in self._journal_lengths:
+            self._journal_lengths[world_name] = self.store.journal_length(world_name)
+        return self._journal_lengths[world_name]
+
+    def stage_edit(
+        self,
+        world_name: str,
+        world_data: Dict[str, Any],
+        node_id: int,
+        key: str,
+        value: Any,
+    ) -> None:
+        """Stage a single node field change for the next write.
+
+        ``world_data`` is the live world the edit was applied to. Worlds that
+        have never been written, or have staged full writes, are written in
+        full instead. Repeated edits of one field keep only the latest value.
+        """
+        if world_name not in self._names:
+            self._names.append(world_name)
+        self._deleted.discard(world_name)
+        self._loaded[world_name] = world_data
+        if world_name in self._dirty or world_name not in self.store.load_manifest():
+            self._dirty.add(world_name)
+            return
+        edits = self._pending_edits.setdefault(world_name, {})
+        edits.pop((node_id, key), None)
+        edits[(node_id, key)] = value
+
+    def record_edit(
+        self,
+        world_name: str,
+        world_data: Dict[str, Any],
+        node_id: int,
+        key: str,
+        value: Any,
+    ) -> None:
+        """Persist a single node field change through the journal.
+
+        The journal is compacted into the shard once it reaches
+        ``compact_threshold`` entries. See :meth:`stage_edit`.
+        """
+        self.stage_edit(world_name, world_data, node_id, key, value)
+        self.flush()
+
+    def compact(self, world_name: str) -> None:
+        """Fold the journal of ``world_name`` into its shard."""
+        if world_name in self._loaded:
+            self._pending_edits.pop(world_name, None)
+            self.store.save_world(world_name, self._loaded[world_name])
+            self._dirty.discard(world_name)
+            self._journal_lengths[world_name] = 0
@@ -0,0 +1,233 @@
+"""Incremental, bounded-memory reader for world JSON files.
+
+``json.load`` reads the entire file into one string before building any
+objects, so loading a large world briefly needs room for both the text and
+the parsed dicts. The reader here pulls the file in fixed-size chunks and
+decodes the ``nodes`` mapping one node at a time, discarding consumed text as
+it goes. Peak memory therefore stays close to the size of the parsed world.
+
+Nodes can be handed to a ``WorldInterface`` as they arrive so validation and
+the depth cache are built during the read instead of in a second pass over
+the finished dict.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import only for annotations
+    from world_interface import WorldInterface
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+
+class _ChunkReader:
+    """Minimal pull parser over a text stream."""
+
+    def __init__(self, fh: IO[str], chunk_size: int | None = None) -> None:
+        self._fh = fh
+        self._chunk_size = chunk_size or CHUNK_SIZE
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        if self._pos > self._chunk_size:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        # Grow reads with the pending text so a long value is retried
+        # O(log n) times rather than once per chunk.
+        chunk = self._fh.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in world file, found {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode and return the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the
+            # next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+    def keys(self) -> Iterator[str]:
+        """Iterate the keys of an object; the caller reads each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("Object keys in world file must be strings")
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in world file, found {separator!r}")
+
+
+def _read_world(
+    reader: _ChunkReader,
+    on_node: Callable[[str, Any], None] | None = None,
+    world: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    if world is None:
+        world = {}
+    for key in reader.keys():
+        if key == "nodes" and reader.peek() == "{":
+            nodes = world["nodes"] = {}
+            for node_key in reader.keys():
+                node = reader.value()
+                if isinstance(node, dict):
+                    # ``json.load`` shares equal keys across a document;
+                    # decoding node by node would give each node its own copies.
+                    node = {sys.intern(key): value for key, value in node.items()}
+                nodes[node_key] = node
+                if on_node is not None:
+                    on_node(node_key, node)
+        else:
+            world[key] = reader.value()
+    return world
+
+
+def _as_parent_id(value: Any) -> Any:
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+class _NodeFeeder:
+    """Validate nodes as they are decoded.
+
+    ``validate_node`` needs every ancestor in place to resolve a node's
+    depth, so a node arriving before its parent waits until the parent has
+    been validated. Orphans and cycles are handled once the read finishes.
+    """
+
+    def __init__(self, manager: "WorldInterface", world: Dict[str, Any]) -> None:
+        self.manager = manager
+        manager.set_world_data(world)
+        clear_cache = getattr(manager, "clear_depth_cache", None)
+        if clear_cache is not None:
+            clear_cache()
+        self.world = world
+        self.nodes_updated = 0
+        self.max_node_id = 0
+        self.node_ids: set[int] = set()
+        self.invalid_keys: List[str] = []
+        self._validated: set[int] = set()
+        self._waiting: Dict[Any, List[Tuple[int, Dict[str, Any]]]] = {}
+
+    def __call__(self, node_key: str, node: Any) -> None:
+        try:
+            nid_int = int(node_key)
+        except ValueError:
+            self.invalid_keys.append(node_key)
+            return
+        self.node_ids.add(nid_int)
+        self.max_node_id = max(self.max_node_id, nid_int)
+        parent_id = _as_parent_id(node.get("parent_id"))
+        if parent_id is None or parent_id in self._validated:
+            self._validate(nid_int, node)
+        else:
+            self._waiting.setdefault(parent_id, []).append((nid_int, node))
+
+    def _validate(self, nid_int: int, node: Dict[str, Any]) -> None:
+        stack = [(nid_int, node)]
+        while stack:
+            current_id, current = stack.pop()
+            if self.manager.validate_node(current_id, current):
+                self.nodes_updated += 1
+            self._validated.add(current_id)
+            stack.extend(self._waiting.pop(current_id, ()))
+
+    def finish(self) -> Tuple[int, int]:
+        nodes = self.world.setdefault("nodes", {})
+        self.world.setdefault("characters", {})
+        self.world.setdefault("next_node_id", self.max_node_id + 1)
+        for key in self.invalid_keys:
+            print(f"Skipping node with non-integer key: {key}")
+            del nodes[key]
+        while self._waiting:
+            # Parents that never appeared (or cycles): depths are final now
+            _, pending = self._waiting.popitem()
+            for nid_int, node in pending:
+                self._validate(nid_int, node)
+        return self.manager._finish_validation(
+            self.node_ids, self.max_node_id, self.nodes_updated
+        )
+
+
+def read_world(
+    fh: IO[str], manager: "WorldInterface" | None = None
+) -> Tuple[Dict[str, Any], Tuple[int, int]]:
+    """Read one world object from ``fh``.
+
+    When ``manager`` is given its ``world_data`` is set to the world being
+    read and each node is validated as soon as it is decoded. Returns the
+    world together with ``(nodes_updated, chars_updated)``, which is
+    ``(0, 0)`` without a manager.
+    """
+    reader = _ChunkReader(fh)
+    if manager is None:
+        return _read_world(reader), (0, 0)
+    world: Dict[str, Any] = {}
+    feeder = _NodeFeeder(manager, world)
+    _read_world(reader, feeder, world)
+    return world, feeder.finish()
+
+
+def load_world_file(
+    path: str | Path, manager: "WorldInterface" | None = None
+) -> Tuple[Dict[str, Any], Tuple[int, int]]:
+    """Stream a single world file. See :func:`read_world`."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return read_world(fh, manager)
+
+
+def read_worlds(fh: IO[str]) -> Dict[str, Any]:
+    """Read a ``{world name: world}`` mapping, streaming each world's nodes."""
+    reader = _ChunkReader(fh)
+    return {
+        name: _read_world(reader) if reader.peek() == "{" else reader.value()
+        for name in reader.keys()
+    }
@@ -1,6 +1,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
@@ -9,3 +11,10 @@ if str(SRC_ROOT) not in sys.path:
     sys.path.insert(0, str(SRC_ROOT))
 
 import sitecustomize  # Ensure project time package is active
+from src.bench_world_load import build_world
+
+
+@pytest.fixture
+def build_realm():
+    """Return a builder of ``node_count``-node realms for tests."""
+    return build_world
@@ -49,5 +49,25 @@ def test_assign_personal_owner_creates_snapshot_and_marks_cache():
     result = manager.assign_personal_owner(4, ("0", 1))
 
     assert result.success
-    assert manager._snapshots
+    assert manager._undo_log.can_undo()
     assert manager._tax_cache_stale is True
+
+
+def test_assign_personal_owner_can_be_undone_and_redone():
+    manager = WorldManager(_world())
+    node = manager.world_data["nodes"]["4"]
+
+    manager.assign_personal_owner(4, ("1", 2))
+    assert manager.owner_index.members(2) == {4}
+
+    assert manager.undo() is not None
+    assert node["owner_assigned_level"] == "none"
+    assert "owner_assigned_id" not in node
+    assert node["personal_province_path"] == []
+    assert manager.owner_index.members(2) == set()
+
+    assert manager.redo() is not None
+    assert node["owner_assigned_id"] == 2
+    assert node["personal_province_path"] == [1, 2]
+    assert manager.owner_index.members(2) == {4}
+    assert manager.redo() is None
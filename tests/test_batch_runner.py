@@ -0,0 +1,119 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.batch_runner import STAGES, load_world, main, run_years
+from src.pipeline import Pipeline, Stage
+from src.world_store import ShardedWorldStore
+
+
+def _add_umbarande(state):
+    for node in state["nodes"].values():
+        node["umbarande"] = int(node.get("umbarande", 0) or 0) + 1
+
+
+def _add_umbarande_to_node(node, ctx):
+    node["umbarande"] = int(node.get("umbarande", 0) or 0) + 1
+
+
+def test_run_years_runs_a_pipeline(build_realm):
+    pipeline = Pipeline(
+        [
+            Stage(
+                "umbarande",
+                _add_umbarande_to_node,
+                reads={"nodes.umbarande"},
+                writes={"nodes.umbarande"},
+                per_node=True,
+            )
+        ]
+    )
+    # Time spent in earlier runs is not reported again
+    pipeline.timings["umbarande"] = 100.0
+    report = run_years(build_realm(30), 2, hooks=[_add_umbarande], pipeline=pipeline)
+
+    assert [row["umbarande"] for row in report.metrics] == [60, 120]
+    assert 0 < report.stage_seconds["execute.umbarande"] < 100
+
+
+def test_run_years_writes_snapshots_and_summary(tmp_path, build_realm):
+    report = run_years(
+        build_realm(30),
+        5,
+        hooks=[_add_umbarande],
+        output_dir=tmp_path,
+        snapshot_every=2,
+    )
+
+    assert report.years == 5
+    assert [row["year"] for row in report.metrics] == [1, 2, 3, 4, 5]
+    # The hook runs once per year on the state carried over from the last
+    assert [row["umbarande"] for row in report.metrics] == [30, 60, 90, 120, 150]
+    assert set(report.stage_seconds) == set(STAGES)
+    assert report.years_per_second > 0
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["summary.json", "year_2.json", "year_4.json", "year_5.json"]
+    snapshot = json.loads((tmp_path / "year_4.json").read_text(encoding="utf-8"))
+    assert snapshot["nodes"]["5"]["umbarande"] == 4
+    summary = json.loads((tmp_path / "summary.json").read_text(encoding="utf-8"))
+    assert summary["years"] == 5
+    assert summary["metrics"][-1]["nodes"] == 30
+
+
+def test_batch_runner_does_not_import_tk():
+    code = "import sys, batch_runner; print('tkinter' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent / "src",
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert out.strip() == "False"
+
+
+def test_load_world_falls_back_to_worlds_file(tmp_path, build_realm):
+    worlds_file = tmp_path / "worlds.json"
+    worlds_file.write_text(json.dumps({"Gammal": build_realm(3)}), encoding="utf-8")
+    store_dir = tmp_path / "store"
+    ShardedWorldStore(store_dir).save_world("Ny", build_realm(4))
+
+    assert len(load_world("Ny", store_dir, str(worlds_file))["nodes"]) == 4
+    assert len(load_world("Gammal", store_dir, str(worlds_file))["nodes"]) == 3
+    with pytest.raises(KeyError):
+        load_world("Saknas", store_dir, str(worlds_file))
+
+
+def test_main_runs_a_stored_world(tmp_path, capsys, build_realm):
+    store_dir = tmp_path / "store"
+    ShardedWorldStore(store_dir).save_world("Riket", build_realm(20))
+    out_dir = tmp_path / "out"
+
+    code = main(
+        [
+            "--world",
+            "Riket",
+            "--store-dir",
+            str(store_dir),
+            "--worlds-file",
+            str(tmp_path / "none.json"),
+            "--years",
+            "3",
+            "--snapshot-every",
+            "0",
+            "--hook",
+            "tests.test_batch_runner:_add_umbarande",
+            "--output",
+            str(out_dir),
+        ]
+    )
+
+    assert code == 0
+    assert "3 years in" in capsys.readouterr().out
+    summary = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+    assert summary["metrics"][-1]["umbarande"] == 60
+    assert sorted(p.name for p in out_dir.iterdir()) == ["summary.json"]
@@ -76,3 +76,36 @@ def test_save_worlds_to_file_error(tmp_path, monkeypatch):
     monkeypatch.setattr(data_manager.messagebox, "showerror", lambda *a, **k: called.append(True))
     data_manager.save_worlds_to_file({})
     assert called
+
+
+def test_open_world_collection_migrates_legacy_file(tmp_path, monkeypatch):
+    legacy = tmp_path / "worlds.json"
+    legacy.write_text(
+        json.dumps({"A": {"nodes": {}}, "B": {"nodes": {}}}), encoding="utf-8"
+    )
+    store_dir = tmp_path / "worlds"
+    monkeypatch.setattr(data_manager, "DEFAULT_WORLDS_FILE", str(legacy))
+    monkeypatch.setattr(data_manager, "WORLDS_STORE_DIRECTORY", str(store_dir))
+
+    worlds = data_manager.open_world_collection()
+
+    assert sorted(worlds) == ["A", "B"]
+    assert (store_dir / "index.json").exists()
+    assert worlds["A"] == {"nodes": {}}
+
+
+def test_persist_worlds_flushes_collection(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_manager, "DEFAULT_WORLDS_FILE", str(tmp_path / "none.json"))
+    monkeypatch.setattr(data_manager, "WORLDS_STORE_DIRECTORY", str(tmp_path / "worlds"))
+    legacy_calls = []
+    monkeypatch.setattr(data_manager, "save_worlds_to_file", lambda d: legacy_calls.append(d))
+
+    worlds = data_manager.open_world_collection()
+    worlds["A"] = {"nodes": {}}
+    data_manager.persist_worlds(worlds)
+
+    assert not legacy_calls
+    assert sorted(data_manager.open_world_collection()) == ["A"]
+
+    data_manager.persist_worlds({"X": {}})
+    assert legacy_calls == [{"X": {}}]
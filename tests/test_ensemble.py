@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.ensemble import main, run_ensemble, summarize
+
+
+def test_runs_are_deterministic_per_seed(build_realm):
+    world = build_realm(30)
+    serial = run_ensemble(world, [1, 2, 3], seasons=4, workers=1)
+    parallel = run_ensemble(world, [3, 1, 2], seasons=4, workers=2)
+
+    for seed in (1, 2, 3):
+        assert parallel.runs[seed] == serial.runs[seed]
+    assert serial.runs[1] != serial.runs[2]
+
+
+def test_ensemble_does_not_import_tk():
+    code = "import sys, ensemble; print('tkinter' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent / "src",
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert out.strip() == "False"
+
+
+def test_seasons_summarise_each_metric(build_realm):
+    world = build_realm(30)
+    world["nodes"]["5"]["umbarande"] = 4
+    result = run_ensemble(world, range(5), seasons=2, workers=1)
+
+    first = result.seasons[0]
+    assert (first["year"], first["season"]) == (0, "summer")
+    assert sum(first["weather"]["counts"].values()) == 5
+    assert first["umbarande"]["mean"] == 4
+    assert first["population"]["min"] == first["population"]["max"] == 250
+
+
+def test_summarize_numbers_and_categories():
+    assert summarize([1, 2, 3, 4])["p50"] == 2.5
+    assert summarize(["Regn", "Sol", "Regn"]) == {"counts": {"Regn": 2, "Sol": 1}}
+
+
+def test_cli_writes_result(tmp_path, capsys, build_realm):
+    world_path = tmp_path / "world.json"
+    world_path.write_text(json.dumps({"Värld": build_realm(10)}), encoding="utf-8")
+    out_path = tmp_path / "out.json"
+
+    assert main([
+        "--world", str(world_path), "--seeds", "2", "--seasons", "3",
+        "--workers", "1", "--metrics", "weather,population",
+        "--output", str(out_path),
+    ]) == 0
+
+    data = json.loads(out_path.read_text(encoding="utf-8"))
+    assert data["seeds"] == [0, 1]
+    assert len(data["seasons"]) == 3
+    assert "population" in capsys.readouterr().out
@@ -0,0 +1,104 @@
+from src.hierarchy_index import HierarchyIndex
+from src.world_manager import WorldManager
+
+
+def _nodes() -> dict:
+    return {
+        "1": {"node_id": 1, "parent_id": None, "children": [2, 3]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [4]},
+        "3": {"node_id": 3, "parent_id": 1, "children": []},
+        # Not listed by its parent, found through parent_id
+        "4": {"node_id": 4, "parent_id": 2, "children": []},
+        "5": {"node_id": 5, "parent_id": 2, "children": []},
+        # Parent missing from the world
+        "6": {"node_id": 6, "parent_id": 42, "children": []},
+        # Two-node cycle and a node hanging below it
+        "7": {"node_id": 7, "parent_id": 8, "children": [8]},
+        "8": {"node_id": 8, "parent_id": 7, "children": [7, 9]},
+        "9": {"node_id": 9, "parent_id": 8, "children": []},
+    }
+
+
+def test_depths_match_parent_walk():
+    index = HierarchyIndex(_nodes())
+    assert [index.depth_of(n) for n in (1, 2, 3, 4, 5)] == [0, 1, 1, 2, 2]
+    assert index.depth_of(6) == 0
+    assert index.depth_of(99) == -1
+    assert [index.depth_of(n) for n in (7, 8, 9)] == [-99, -99, -99]
+
+
+def test_too_deep_chain_is_flagged():
+    nodes = {"0": {"node_id": 0, "parent_id": None}}
+    for nid in range(1, 60):
+        nodes[str(nid)] = {"node_id": nid, "parent_id": nid - 1}
+    index = HierarchyIndex(nodes)
+    assert index.depth_of(50) == 50
+    assert index.depth_of(51) == -100
+    assert index.depth_of(59) == -100
+
+
+def test_children_subtrees_and_ancestors():
+    index = HierarchyIndex(_nodes())
+    assert index.children_of(2) == [4, 5]
+    assert index.subtree(1) == [1, 2, 4, 5, 3]
+    assert index.subtree_size(2) == 3
+    assert index.is_ancestor(1, 5)
+    assert not index.is_ancestor(5, 1)
+    assert not index.is_ancestor(1, 1)
+    assert not index.is_ancestor(1, 6)
+    # Cycles are visited once
+    assert sorted(index.subtree(7)) == [7, 8, 9]
+
+
+def test_manager_updates_index_incrementally():
+    manager = WorldManager({"nodes": _nodes(), "characters": {}, "next_node_id": 10})
+    index = manager.hierarchy
+    assert manager.count_descendants(1) == 4
+
+    node = manager.world_data["nodes"]["3"]
+    node["num_subfiefs"] = 2
+    manager.update_subfiefs_for_node(node)
+    assert manager.hierarchy is index
+    assert index.children_of(3) == [10, 11]
+    assert manager.get_depth_of_node(11) == 2
+    assert manager._is_descendant(1, 11)
+
+    manager.delete_node_and_descendants(2)
+    assert manager.hierarchy is index
+    assert index.subtree(1) == [1, 3, 10, 11]
+    assert manager.get_depth_of_node(4) == -1
+
+
+def test_index_is_dropped_with_the_world():
+    manager = WorldManager({"nodes": _nodes(), "characters": {}})
+    index = manager.hierarchy
+    manager.clear_depth_cache()
+    assert manager.hierarchy is not index
+
+    index = manager.hierarchy
+    manager.set_world_data({"nodes": {"1": {"node_id": 1, "parent_id": None}}})
+    assert manager.hierarchy is not index
+    assert manager.count_descendants(1) == 0
+
+
+def test_nodes_added_outside_the_manager_trigger_rebuild():
+    nodes = _nodes()
+    manager = WorldManager({"nodes": nodes, "characters": {}})
+    assert manager.count_descendants(3) == 0
+    nodes["12"] = {"node_id": 12, "parent_id": 3, "children": []}
+    assert manager.count_descendants(3) == 1
+
+
+def test_ancestors_follow_parent_chain():
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [3]},
+        "3": {"node_id": 3, "parent_id": 2, "children": []},
+        "4": {"node_id": 4, "parent_id": 5, "children": []},
+        "5": {"node_id": 5, "parent_id": 4, "children": []},
+    }
+    index = HierarchyIndex(nodes)
+    assert index.ancestors(3) == [2, 1]
+    assert index.ancestors(1) == []
+    assert index.ancestors(4) == [5]
+    assert index.ancestors(99) == []
@@ -59,7 +59,7 @@ def test_unknown_path():
 def test_load_worlds_error(monkeypatch):
     def boom():
         raise RuntimeError('fail')
-    monkeypatch.setattr(http_server, 'load_worlds_from_file', boom)
+    monkeypatch.setattr(http_server, 'open_world_collection', boom)
     assert http_server.load_worlds() == {}
 
 
@@ -116,3 +116,20 @@ def test_http_server_script_entrypoint(monkeypatch, capsys):
     assert called.get('closed')
     assert 'http://localhost:8000' in out
     assert called['args'][2] is result['application']
+
+
+def test_load_worlds_is_lazy(monkeypatch, tmp_path):
+    from src.world_store import ShardedWorldStore, WorldCollection
+
+    store = ShardedWorldStore(tmp_path)
+    store.import_worlds({'A': {'nodes': {'1': {'name': 'Rot'}}}})
+    collection = WorldCollection(ShardedWorldStore(tmp_path))
+    monkeypatch.setattr(http_server, 'open_world_collection', lambda: collection)
+
+    worlds = http_server.load_worlds()
+    monkeypatch.setattr(http_server, 'ALL_WORLDS', worlds)
+
+    assert 'A' in run_app('/')['body']
+    assert not collection.is_loaded('A')
+    assert '<td>Rot</td>' in run_app('/world/A')['body']
+    assert collection.is_loaded('A')
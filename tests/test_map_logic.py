@@ -177,3 +177,13 @@ def test_hierarchy_layout_simple():
     assert logic.map_static_positions[111] == (1, 4)
     assert logic.map_static_positions[201] == (8, 1)
 
+
+
+def test_placement_with_listed_jarldoms():
+    world = make_world()
+    logic = StaticMapLogic(world, rows=3, cols=3, hex_size=30, spacing=15)
+    logic.place_jarldomes_bfs(lambda _nid: 0, jarldom_ids=[10, 20, 30])
+
+    assert logic.map_static_positions[10] == (0, 0)
+    assert logic.map_static_positions[20] == (1, 0)
+    assert logic.map_static_positions[30] == (0, 1)
@@ -1,4 +1,4 @@
-from src.node import Node
+from src.node import Node, NodeView
 from src.constants import NEIGHBOR_NONE_STR, MAX_NEIGHBORS
 
 
@@ -502,3 +502,58 @@ def test_weather_node_clears_custom_name():
     back = node.to_dict()
     assert "custom_name" not in back
     assert back["spring_weather"] == "Varmt och stabilt (-1)"
+
+
+def test_node_view_matches_from_dict():
+    raws = [
+        {
+            "node_id": 1,
+            "parent_id": "7",
+            "custom_name": "Svea",
+            "ruler_id": "x",
+            "children": ["2", 3, "a"],
+            "neighbors": [{"id": "2", "border": "väg"}],
+            "free_peasants": "3",
+            "burghers": 2,
+            "owner_assigned_level": "4",
+            "dagsverken": "okänt",
+        },
+        {"node_id": "5", "res_type": "Väder", "custom_name": "Regn", "population": 9},
+        {"node_id": 6, "res_type": "Jaktmark", "population": 40, "work_needed": "x"},
+    ]
+    fields = (
+        "node_id", "parent_id", "ruler_id", "owner_assigned_id",
+        "owner_assigned_level", "name", "custom_name", "res_type",
+        "dagsverken", "population", "children", "neighbors", "free_peasants",
+        "burghers", "work_needed", "cultivated_quality",
+    )
+    for raw in raws:
+        node = Node.from_dict(raw)
+        view = NodeView(raw)
+        for name in fields:
+            assert getattr(view, name) == getattr(node, name), name
+        assert view.to_node() == node
+
+
+def test_node_view_reflects_dict_edits():
+    raw = {"node_id": 1, "free_peasants": 2}
+    view = NodeView(raw)
+    assert view.population == 2
+    raw["free_peasants"] = 5
+    assert view.population == 5
+    assert view.data is raw
+
+
+def test_node_view_inherited_owner_matches_node():
+    class World:
+        world_data = {
+            "nodes": {
+                "1": {"node_id": 1, "owner_assigned_level": "1", "owner_assigned_id": "9"},
+                "2": {"node_id": 2, "parent_id": 1},
+                "3": {"node_id": 3, "parent_id": 2},
+            }
+        }
+
+    raw = World.world_data["nodes"]["3"]
+    assert NodeView(raw).inherited_owner(World) == ("1", 9)
+    assert Node.from_dict(raw).inherited_owner(World) == ("1", 9)
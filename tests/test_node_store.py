@@ -0,0 +1,44 @@
+from src.node_store import NodeStore, as_node_id
+
+
+def _nodes() -> dict:
+    return {
+        "1": {"node_id": 1, "children": [2]},
+        "2": {"node_id": 2, "children": []},
+        "meta": {"note": "not a node id"},
+        "3": "not a node dict",
+    }
+
+
+def test_lookups_use_int_ids():
+    nodes = _nodes()
+    store = NodeStore(nodes)
+    assert store.get(1) is nodes["1"]
+    assert store.get("2") is nodes["2"]
+    assert store.get(3) is None
+    assert store.get(None) is None
+    assert 2 in store and 9 not in store
+    assert sorted(store) == [1, 2]
+    assert len(store) == 2
+
+
+def test_add_and_remove_keep_json_keys_in_step():
+    nodes = _nodes()
+    store = NodeStore(nodes)
+    store.add(5, {"node_id": 5})
+    assert nodes["5"] == {"node_id": 5}
+    assert store.remove(1) is not None
+    assert "1" not in nodes and 1 not in store
+    assert store.remove(1) is None
+
+    # Keys changed behind the store's back are picked up on next use
+    nodes["7"] = {"node_id": 7}
+    assert store.get(7) is nodes["7"]
+
+
+def test_as_node_id():
+    assert as_node_id(4) == 4
+    assert as_node_id("12") == 12
+    assert as_node_id(True) is None
+    assert as_node_id("x") is None
+    assert as_node_id(None) is None
@@ -0,0 +1,63 @@
+import copy
+
+from src.node_table import BASE_POPULATION
+from src.world_manager import WorldManager
+
+
+def _manager() -> WorldManager:
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2, 3]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [4], "thralls": 2},
+        "3": {"node_id": 3, "parent_id": 1, "children": [], "population": 7},
+        "4": {
+            "node_id": 4,
+            "parent_id": 2,
+            "children": [],
+            "free_peasants": 5,
+            "storage_basic": 3,
+            "total_land": "12",
+        },
+    }
+    return WorldManager({"nodes": nodes, "characters": {}})
+
+
+def test_subtree_sums_follow_the_tour():
+    manager = _manager()
+    table = manager.node_table
+    assert table.subtree_sum(BASE_POPULATION, 1) == 14
+    assert table.subtree_sum(BASE_POPULATION, 2) == 7
+    assert table.subtree_sum("total_land", 1) == 12
+    sums = dict(zip(table.order, table.subtree_sums("storage_basic")))
+    assert sums == {1: 3, 2: 3, 3: 0, 4: 3}
+
+
+def test_table_follows_edits_and_structure_changes():
+    manager = _manager()
+    assert manager.node_table.subtree_sum("storage_basic", 1) == 3
+    manager.world_data["nodes"]["4"]["storage_basic"] = 10
+    manager.reindex_node(4)
+    assert manager.node_table.subtree_sum("storage_basic", 1) == 10
+
+    manager.delete_node_and_descendants(4)
+    assert manager.node_table.subtree_sum("storage_basic", 1) == 0
+    assert 4 not in manager.node_table.row_of
+
+
+def test_population_totals_match_the_walk(build_realm):
+    for world in (_manager().world_data, build_realm(300)):
+        fast = WorldManager(copy.deepcopy(world))
+        slow = WorldManager(copy.deepcopy(world))
+        assert fast.hierarchy.is_tree_shaped()
+        for _ in range(2):  # the second run starts from stored totals
+            fast.update_population_totals()
+            slow._update_population_totals_by_walk()
+            assert fast.world_data == slow.world_data
+
+
+def test_shared_nodes_use_the_walk():
+    manager = _manager()
+    manager.world_data["nodes"]["3"]["children"].append(4)
+    assert not manager.hierarchy.is_tree_shaped()
+    manager.update_population_totals()
+    # Node 4 is counted under both of its parents, as before
+    assert manager.world_data["nodes"]["1"]["population"] == 2 + 5 + 7 + 5
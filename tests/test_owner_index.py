@@ -0,0 +1,75 @@
+from src.world_manager import WorldManager
+
+
+def _manager() -> WorldManager:
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2, 5]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [3]},
+        "3": {"node_id": 3, "parent_id": 2, "children": [4, 6]},
+        "4": {"node_id": 4, "parent_id": 3, "children": [7]},
+        "5": {"node_id": 5, "parent_id": 1, "children": []},
+        "6": {"node_id": 6, "parent_id": 3, "children": []},
+        "7": {"node_id": 7, "parent_id": 4, "children": []},
+    }
+    nodes["4"].update(owner_assigned_level="1", owner_assigned_id=2)
+    return WorldManager({"nodes": nodes, "characters": {}})
+
+
+def test_explicit_owner_breaks_inheritance():
+    manager = _manager()
+    nodes = manager.world_data["nodes"]
+    nodes["7"].update(owner_assigned_level="0", owner_assigned_id="1")
+    index = manager.owner_index
+
+    assert index.members(2) == {4}
+    assert index.roots(2) == [4]
+    assert index.members(1) == {7}
+    assert index.owner_of(6) is None
+
+
+def test_assign_personal_owner_updates_index():
+    manager = _manager()
+    index = manager.owner_index
+
+    assert manager.assign_personal_owner(3, ("1", 2)).success
+    assert index.members(2) == {3, 4, 6, 7}
+    assert index.roots(2) == [3]
+
+    assert manager.assign_personal_owner(4, "none").success
+    assert manager.owner_index is index
+    assert index.members(2) == {3, 4, 6, 7}
+
+    assert manager.assign_personal_owner(3, "none").success
+    assert index.members(2) == set()
+    assert index.owner_of(7) is None
+
+
+def test_sync_picks_up_direct_edits():
+    manager = _manager()
+    index = manager.owner_index
+    nodes = manager.world_data["nodes"]
+    nodes["2"].update(owner_assigned_level="1", owner_assigned_id=2)
+    nodes["4"]["owner_assigned_level"] = "none"
+
+    index.sync()
+
+    assert index.members(2) == {2, 3, 4, 6, 7}
+    assert index.roots(2) == [2]
+
+
+def test_added_subfiefs_do_not_resolve_subtrees(monkeypatch):
+    manager = _manager()
+    manager.owner_index
+    hierarchy = manager.hierarchy
+    calls = []
+    subtree = hierarchy.subtree
+    monkeypatch.setattr(
+        hierarchy, "subtree", lambda nid: calls.append(nid) or subtree(nid)
+    )
+
+    node = manager.world_data["nodes"]["7"]
+    node["num_subfiefs"] = 3
+    manager.update_subfiefs_for_node(node)
+
+    assert calls == []
+    assert manager.owner_index.members(2) == {4, 7, 8, 9, 10}
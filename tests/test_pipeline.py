@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+
+from src.pipeline import Pipeline, Stage, StageContext, partition_nodes
+from src.time_engine import TimeEngine
+
+
+def _is_resource(node):
+    return node.get("res_type") == "Mark"
+
+
+def _harvest(node, ctx):
+    node["harvest"] = node["population"] * ctx.rng.randint(1, 6) + ctx.shared["bonus"]
+
+
+def _grow(node, ctx):
+    node["population"] += node["harvest"] // 10
+    if node["population"] > 12:
+        ctx.emit({"type": "growth", "node_id": ctx.node_id})
+
+
+def _set_bonus(world, ctx):
+    world["bonus"] = 2
+
+
+def _tally(world, ctx):
+    world["total_harvest"] = sum(
+        node.get("harvest", 0) for node in world["nodes"].values()
+    )
+
+
+def _mark_year(world, ctx):
+    world["marked"] = ctx.year
+
+
+def _stages():
+    return [
+        Stage("bonus", _set_bonus, writes={"bonus"}),
+        Stage("mark", _mark_year, writes={"marked"}),
+        Stage(
+            "harvest",
+            _harvest,
+            reads={"nodes.population", "nodes.res_type", "bonus"},
+            writes={"nodes.harvest"},
+            per_node=True,
+            select=_is_resource,
+        ),
+        Stage("tally", _tally, reads={"nodes.harvest"}, writes={"total_harvest"}),
+        Stage(
+            "grow",
+            _grow,
+            reads={"nodes.harvest", "nodes.res_type"},
+            writes={"nodes.population"},
+            per_node=True,
+            select=_is_resource,
+        ),
+    ]
+
+
+def _world(build_realm):
+    world = build_realm(60)
+    # A second duchy, so node stages have several partitions
+    nodes = world["nodes"]
+    nodes["2"]["children"].append(100)
+    nodes["100"] = {"node_id": 100, "parent_id": 2, "name": "Hertigdöme", "children": [101]}
+    nodes["101"] = {
+        "node_id": 101,
+        "parent_id": 100,
+        "name": "Resurs",
+        "res_type": "Mark",
+        "population": 10,
+    }
+    return world
+
+
+def test_waves_follow_declared_fields():
+    waves = [[stage.name for stage in wave] for wave in Pipeline(_stages()).waves()]
+    assert waves == [["bonus", "mark"], ["harvest"], ["tally", "grow"]]
+
+    cyclic = Pipeline(
+        [
+            Stage("a", _set_bonus, writes={"bonus"}, after=("b",)),
+            Stage("b", _mark_year, reads={"bonus"}),
+        ]
+    )
+    with pytest.raises(ValueError):
+        cyclic.waves()
+    with pytest.raises(ValueError):
+        Stage("bad", _harvest, writes={"bonus"}, per_node=True)
+
+
+def _next_b(node, ctx):
+    node["b"] = node.get("a", 0) + 1
+
+
+def test_node_stage_declaring_nodes_sees_whole_node(build_realm):
+    world = _world(build_realm)
+    world["nodes"]["5"]["a"] = 5
+    pipeline = Pipeline(
+        [
+            Stage("read_all", _next_b, reads={"nodes"}, writes={"nodes.b"}, per_node=True),
+            Stage("write_all", _next_b, reads={"nodes.a"}, writes={"nodes"}, per_node=True),
+        ]
+    )
+    pipeline.run(world, "main", 1, "spring")
+
+    assert world["nodes"]["5"]["b"] == 6
+    assert world["nodes"]["5"]["res_type"] == "Mark"
+    assert world["nodes"]["4"]["b"] == 1
+
+
+_both_running = threading.Barrier(2, timeout=5)
+
+
+def _meet(world, ctx):
+    # Only passes when the other world stage of the wave runs at the same time
+    _both_running.wait()
+    world[ctx.stage] = ctx.rng.random()
+
+
+def test_world_stages_of_a_wave_run_concurrently():
+    stages = [Stage("north", _meet, writes={"north"}), Stage("south", _meet, writes={"south"})]
+    world = {"nodes": {}}
+    with Pipeline(stages, workers=2) as pipeline:
+        pipeline.run(world, "main", 1, "spring")
+
+    for name in ("north", "south"):
+        expected = StageContext(name, "main", 1, "spring").rng_for().random()
+        assert world[name] == expected
+        assert pipeline.timings[name] > 0
+
+
+def test_partitions_cover_every_node_once(build_realm):
+    world = _world(build_realm)
+    partitions = partition_nodes(world["nodes"])
+
+    assert partitions[0] == ["1", "2"]
+    assert [part[0] for part in partitions[1:]] == ["3", "100"]
+    keys = [key for part in partitions for key in part]
+    assert sorted(keys) == sorted(world["nodes"])
+
+
+def test_result_does_not_depend_on_workers(build_realm):
+    serial_world = _world(build_realm)
+    serial = Pipeline(_stages(), workers=1)
+    serial_events = serial.run(serial_world, "main", 3, "summer", base_seed=7)
+
+    parallel_world = _world(build_realm)
+    with Pipeline(_stages(), workers=2) as parallel:
+        parallel_events = parallel.run(parallel_world, "main", 3, "summer", base_seed=7)
+
+    assert parallel_world == serial_world
+    assert parallel_events == serial_events
+    assert serial_events
+    assert serial_world["marked"] == 3
+    assert serial_world["total_harvest"] > 0
+    # Nodes outside the selection and undeclared fields are left alone
+    assert "harvest" not in serial_world["nodes"]["4"]
+    assert serial_world["nodes"]["5"]["res_type"] == "Mark"
+    assert set(serial.timings) == {stage.name for stage in _stages()}
+
+
+def test_pipeline_runs_as_season_processor(tmp_path, build_realm):
+    engine = TimeEngine(world_state=_world(build_realm), base_path=tmp_path, pipeline=Pipeline(_stages()))
+    engine.step_seasons(2)
+
+    assert engine.world_state["marked"] == engine.current_position.year
+    assert len(engine.world_state["weather_history"]) == 2
+    types = {event["type"] for event in engine.events_for_position(engine.current_position)}
+    assert {"weather_roll", "growth"} <= types
@@ -0,0 +1,145 @@
+import copy
+
+from src.rollup_engine import NodeRollup
+from src.world_manager import WorldManager
+
+
+def _world() -> dict:
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2, 3], "thralls": 1},
+        "2": {
+            "node_id": 2,
+            "parent_id": 1,
+            "children": [4, 5],
+            "dagsverken": "många",
+            "unfree_peasants": 3,
+            "weather_effect": 2,
+            "soldiers": [{"type": "Bågskytt", "count": 4}],
+        },
+        "3": {"node_id": 3, "parent_id": 1, "children": [6], "dagsverken": "få"},
+        "4": {
+            "node_id": 4,
+            "parent_id": 2,
+            "children": [],
+            "res_type": "Lager",
+            "storage_basic": 7,
+            "storage_iron": 2,
+            "characters": [{"type": "Präst"}, {"type": "Präst"}],
+        },
+        "5": {
+            "node_id": 5,
+            "parent_id": 2,
+            "children": [7],
+            "free_peasants": 10,
+            "work_needed": 30,
+            "craftsmen": [{"type": "Smed", "count": 2}],
+            "expected_license_income": 5,
+            "animals": [{"type": "Ko", "count": "3"}],
+        },
+        "6": {
+            "node_id": 6,
+            "parent_id": 3,
+            "children": [],
+            "res_type": "Hav",
+            "fishing_boats": 2,
+            "soldiers": [{"type": "Bågskytt", "count": 1}, {"type": "", "count": 9}],
+            "buildings": [{"type": "Kvarn", "count": 1}],
+        },
+        "7": {
+            "node_id": 7,
+            "parent_id": 5,
+            "children": [],
+            "thralls": 2,
+            "day_laborers_hired": 1,
+            "work_needed": 12,
+        },
+    }
+    return {"nodes": nodes, "characters": {}, "next_node_id": 8}
+
+
+def test_rollup_matches_individual_walks_for_every_node():
+    world = _world()
+    table = WorldManager(world).rollup(1)
+    assert set(table) == {1, 2, 3, 4, 5, 6, 7}
+
+    for node_id, result in table.items():
+        # Legacy helpers on a fresh copy, since some of them write to nodes
+        manager = WorldManager(copy.deepcopy(world))
+        assert result.work_available == manager.calculate_work_available(node_id)
+        assert result.work_needed == manager.calculate_work_needed(node_id)
+        assert result.umbarande == manager.calculate_umbarande(node_id)
+        assert result.license_income == manager.calculate_license_income(node_id)
+        assert result.craftsman_license == manager._calculate_craftsman_license(
+            node_id
+        )
+        assert result.storage_report() == manager.get_storage_report(node_id)
+        aggregated = manager.aggregate_resources(node_id)
+        for key in ("soldiers", "characters", "animals", "buildings"):
+            assert getattr(result, key) == aggregated[key]
+        assert result.resources() == manager.calculate_total_resources(node_id)
+
+
+def test_rollup_does_not_touch_world_data():
+    world = _world()
+    before = copy.deepcopy(world)
+    WorldManager(world).rollup(1)
+    assert world == before
+
+
+def test_rollup_counts_shared_and_cyclic_nodes_once():
+    world = _world()
+    nodes = world["nodes"]
+    nodes["3"]["children"].append(4)  # also listed by node 2
+    nodes["7"]["children"] = [5]  # cycle back up
+    table = WorldManager(world).rollup(1)
+    assert table[1].storage["storage_basic"] == 7
+    assert table[1].characters == {"Präst": 2}
+
+
+def test_rollup_of_missing_node_is_empty():
+    manager = WorldManager(_world())
+    assert manager.rollup(99) == {}
+    assert manager.rollup("x") == {}
+    assert NodeRollup().storage_report()["storage_basic"] == 0
+
+
+def test_node_rollup_is_cached_until_a_descendant_changes():
+    manager = WorldManager(_world())
+    assert manager.node_rollup(2).population == 15
+    # Children were filled by the same pass
+    assert manager.node_rollup(5).population == 12
+    assert manager.node_rollup(3).buildings == {"Kvarn": 1}
+    assert manager.rollup_cache_stats()["misses"] == 2
+    assert manager.rollup_cache_stats()["hits"] == 1
+
+    manager.world_data["nodes"]["7"]["thralls"] = 5
+    manager.reindex_node(7)
+    assert manager.node_rollup(2).population == 18
+    assert manager.node_rollup(3).buildings == {"Kvarn": 1}  # still cached
+    stats = manager.rollup_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_node_rollup_follows_structure_changes():
+    manager = WorldManager(_world())
+    assert manager.node_rollup(1).storage["storage_basic"] == 7
+    manager.delete_node_and_descendants(4)
+    assert manager.node_rollup(1).storage == {}
+
+    manager.world_data["nodes"]["5"]["num_subfiefs"] = 2
+    manager.update_subfiefs_for_node(manager.world_data["nodes"]["5"])
+    manager.world_data["nodes"]["1"]["weather_effect"] = 4
+    manager.invalidate_rollups()
+    assert manager.node_rollup(1) == manager.rollup(1)[1]
+    assert manager.node_rollup("x").population == 0
+
+
+def test_node_rollup_returns_a_copy_of_the_cached_totals():
+    manager = WorldManager(_world())
+    first = manager.node_rollup(2)
+    first.population = 0
+    first.soldiers["Bågskytt"] = 99
+
+    again = manager.node_rollup(2)
+    assert again.population == 15
+    assert again.soldiers == {"Bågskytt": 4}
@@ -0,0 +1,90 @@
+from src.save_scheduler import SaveScheduler
+from src.status_service import StatusService
+from src.world_store import ShardedWorldStore, WorldCollection
+
+
+class FakeRoot:
+    """Collects ``after`` callbacks so tests decide when timers fire."""
+
+    def __init__(self):
+        self.timers = {}
+        self._next = 0
+
+    def after(self, _ms, callback):
+        self._next += 1
+        self.timers[self._next] = callback
+        return self._next
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def fire(self):
+        timers, self.timers = self.timers, {}
+        for callback in timers.values():
+            callback()
+
+
+def _world(name: str) -> dict:
+    return {"nodes": {"1": {"node_id": 1, "parent_id": None, "custom_name": name}}}
+
+
+def test_without_root_saves_immediately():
+    ran = []
+    scheduler = SaveScheduler()
+    scheduler.schedule("k", lambda: lambda: ran.append(1))
+    assert ran == [1]
+    assert not scheduler.has_pending()
+
+
+def test_burst_is_coalesced_into_one_write():
+    root = FakeRoot()
+    prepared = []
+    ran = []
+    scheduler = SaveScheduler(root)
+
+    for idx in range(5):
+        scheduler.schedule(
+            "k", lambda idx=idx: prepared.append(idx) or (lambda: ran.append(idx))
+        )
+    assert prepared == [] and ran == []
+    assert len(root.timers) == 1
+
+    root.fire()
+    scheduler.flush()
+    assert prepared == [4]
+    assert ran == [4]
+
+
+def test_worker_writes_snapshot_taken_when_window_closes(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    root = FakeRoot()
+    scheduler = SaveScheduler(root)
+
+    live = worlds["A"]
+    live["nodes"]["1"]["custom_name"] = "Först"
+    worlds["A"] = live
+    scheduler.schedule(id(worlds), lambda: worlds.detach(copy_data=True))
+    root.fire()
+    # Edits after the snapshot must not leak into the queued write
+    live["nodes"]["1"]["custom_name"] = "Sedan"
+    scheduler.flush()
+
+    saved = ShardedWorldStore(tmp_path).load_world("A")
+    assert saved["nodes"]["1"]["custom_name"] == "Först"
+
+
+def test_worker_errors_are_reported_through_status_service():
+    root = FakeRoot()
+    status = StatusService()
+    scheduler = SaveScheduler(root, status_service=status)
+
+    def failing_job():
+        raise OSError("disk full")
+
+    scheduler.schedule("k", lambda: failing_job)
+    root.fire()
+    scheduler.flush()
+    assert len(status.messages) == 1
+    assert "disk full" in status.messages[0]
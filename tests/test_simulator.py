@@ -307,6 +307,33 @@ def test_load_world_updates_population_totals():
     assert sim.world_data["nodes"]["3"]["population"] == 4
 
 
+def test_auto_save_population_field_matches_full_recompute():
+    world = {
+        "nodes": {
+            "1": {"node_id": 1, "parent_id": None, "children": [2]},
+            "2": {
+                "node_id": 2,
+                "parent_id": 1,
+                "children": [],
+                "free_peasants": 5,
+            },
+        },
+        "characters": {},
+    }
+    sim = make_simulator(world)
+    sim.world_manager.update_population_totals()
+    sim.world_manager.calculate_total_resources(1)
+    leaf = world["nodes"]["2"]
+
+    sim._auto_save_field(leaf, "population", "7")
+    sim._auto_save_field(leaf, "free_peasants", 9)
+
+    assert leaf["population"] == 9
+    assert world["nodes"]["1"]["population"] == 9
+    stored = world["nodes"]["1"]["total_resources"]["population"]
+    assert stored == sim.world_manager.calculate_total_resources(1)["population"] == 9
+
+
 def test_auto_link_adjacent_hexes_adds_neighbors():
     world = {
         "nodes": {
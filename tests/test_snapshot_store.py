@@ -0,0 +1,182 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+from src.time_engine import SnapshotStore, TimeEngine, TimePosition
+
+
+def _engine(tmp_path, **kwargs) -> TimeEngine:
+    return TimeEngine(world_state={"nodes": {}}, base_path=tmp_path, **kwargs)
+
+
+def test_seasons_are_appended_without_rewriting_the_log(tmp_path):
+    engine = _engine(tmp_path)
+    log_path = engine.store.log_path
+    engine.step_seasons(4)
+    head = log_path.read_bytes()
+
+    engine.step_seasons(4)
+
+    data = log_path.read_bytes()
+    assert data.startswith(head)
+    assert len(engine.store.records) == 9
+    assert engine.store.records[-1]["offset"] >= len(head)
+
+
+def test_timeline_reloads_from_segments(tmp_path):
+    engine = _engine(tmp_path, rng_seed=7)
+    engine.step_seasons(6)
+
+    reloaded = _engine(tmp_path)
+
+    assert reloaded.snapshots == engine.snapshots
+    assert reloaded.current_position == engine.current_position
+    assert reloaded.rng_seed == 7
+    assert reloaded.world_state == engine.world_state
+
+
+def test_truncating_the_future_rewrites_the_index_and_compacts(tmp_path):
+    engine = _engine(tmp_path)
+    engine.step_seasons(8)
+    log_size = engine.store.log_path.stat().st_size
+
+    engine.step_to(TimePosition(1, 3))
+    engine.record_change("edit")
+
+    assert engine.store.log_path.stat().st_size > log_size
+    assert [(r["year"], r["season"]) for r in engine.store.records][-2:] == [
+        (1, "autumn"),
+        (1, "winter"),
+    ]
+    assert _engine(tmp_path).snapshots == engine.snapshots
+
+    engine.step_to(TimePosition(0, 1))
+    engine.record_change("edit")
+
+    assert engine.store.log_path.stat().st_size < log_size
+    assert _engine(tmp_path).snapshots == engine.snapshots
+
+
+def test_failed_compaction_keeps_the_timeline(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    engine.step_seasons(4)
+
+    def broken_write(self, fh, entry):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(SnapshotStore, "_write_record", broken_write)
+    with pytest.raises(OSError):
+        engine.store.compact()
+    monkeypatch.undo()
+
+    assert _engine(tmp_path).snapshots == engine.snapshots
+
+
+def test_legacy_json_timeline_is_converted(tmp_path):
+    state = {"nodes": {"1": {"node_id": 1}}, "weather_history": []}
+    blob = base64.b64encode(gzip.compress(json.dumps(state).encode("utf-8")))
+    payload = {
+        "schema_version": 1,
+        "timeline_id": "main",
+        "rng_seed": 3,
+        "snapshots": [
+            {"year": 0, "season": "spring", "state_blob": blob.decode("ascii")}
+        ],
+    }
+    store = SnapshotStore(tmp_path / "timelines", "main")
+    store.path.write_text(json.dumps(payload), encoding="utf-8")
+
+    engine = _engine(tmp_path)
+
+    assert engine.world_state == state
+    assert engine.rng_seed == 3
+    assert not store.path.exists()
+    assert store.index_path.exists()
+
+
+def test_unchanged_subtrees_are_stored_once(tmp_path):
+    world = {
+        "nodes": {
+            "1": {"node_id": 1, "parent_id": None},
+            "2": {"node_id": 2, "parent_id": 1},
+            "3": {"node_id": 3, "parent_id": 2},
+            "4": {"node_id": 4, "parent_id": 3},
+            "5": {"node_id": 5, "parent_id": 4, "population": 10},
+            "6": {"node_id": 6, "parent_id": 3},
+        },
+        "characters": {"1": {"name": "Ulf"}},
+    }
+    engine = TimeEngine(world_state=world, base_path=tmp_path)
+    engine.step_seasons(1)
+    chunks = len(engine.chunks._offsets)
+
+    engine.world_state["nodes"]["5"]["population"] = 11
+    engine.record_change("edit")
+
+    # New leaf chunk for jarldom 4, its "nodes" chunk and the root
+    assert len(engine.chunks._offsets) == chunks + 3
+    first, second = engine.snapshots[0], engine.snapshots[-1]
+    assert first["checksum"] != second["checksum"]
+    assert engine._state_from_snapshot(first)["nodes"]["5"]["population"] == 10
+    assert engine._state_from_snapshot(second) == engine.world_state
+
+
+def test_position_index_and_state_cache(tmp_path):
+    engine = _engine(tmp_path)
+    engine.step_seasons(8)
+    engine.step_to(TimePosition(1, 0))
+    engine.step_seasons(2)
+
+    assert engine._nearest_snapshot(TimePosition(1, 3)) is engine.snapshots[7]
+    assert engine._nearest_snapshot(TimePosition(1, 1)) is engine.snapshots[-2]
+    assert engine.events_for_position(TimePosition(1, 2)) == engine.snapshots[6]["events"]
+    assert engine.events_for_position(TimePosition(5, 0)) == []
+
+    reloaded = _engine(tmp_path)
+    for _ in range(3):
+        reloaded.step_to(TimePosition(1, 0))
+        reloaded.step_to(TimePosition(1, 3))
+    stats = reloaded.cache_stats()
+    assert stats["hits"] > stats["misses"] > 0
+    assert reloaded.world_state == engine._state_from_snapshot(engine.snapshots[7])
+
+
+def test_cached_and_stored_chunks_have_the_same_key_order(tmp_path):
+    world = {"nodes": {"1": {"node_id": 1, "parent_id": None, "name": "A"}}}
+    engine = TimeEngine(world_state=world, base_path=tmp_path)
+    snap = engine.snapshots[0]
+
+    cached = engine._state_from_snapshot(snap)
+    stored = _engine(tmp_path)._state_from_snapshot(snap)
+
+    assert json.dumps(cached) == json.dumps(stored)
+
+
+def test_truncating_the_future_reclaims_unreferenced_chunks(tmp_path):
+    engine = _engine(tmp_path)
+    engine.step_seasons(12)
+    chunk_size = engine.chunks.path.stat().st_size
+
+    engine.step_to(TimePosition(0, 1))
+    engine.record_change("edit")
+
+    assert engine.chunks.path.stat().st_size < chunk_size
+    reloaded = _engine(tmp_path)
+    states = [reloaded._state_from_snapshot(snap) for snap in reloaded.snapshots]
+    assert states[-1] == engine.world_state
+
+
+def test_partial_chunk_record_is_cut_off_on_load(tmp_path):
+    engine = _engine(tmp_path)
+    engine.step_seasons(2)
+    path = engine.chunks.path
+    size = path.stat().st_size
+    with path.open("ab") as fh:
+        fh.write(b"\x00" * 32 + b"\x00\x00\x01\x00" + b"partial")
+
+    reloaded = _engine(tmp_path)
+
+    assert path.stat().st_size == size
+    assert reloaded.world_state == engine.world_state
@@ -0,0 +1,129 @@
+from src.sqlite_world import SqliteWorld
+from src.world_manager import WorldManager
+
+
+def _world() -> dict:
+    return {
+        "nodes": {
+            "1": {"node_id": 1, "parent_id": None, "name": "Rike", "children": [2]},
+            "2": {"node_id": 2, "parent_id": 1, "children": [3]},
+            "3": {"node_id": 3, "parent_id": 2, "children": [4]},
+            "4": {
+                "node_id": 4,
+                "parent_id": 3,
+                "children": [5, 6],
+                "owner_assigned_id": 7,
+                "neighbors": [{"id": 8, "border": "liten väg"}, {"id": None}],
+            },
+            "5": {"node_id": 5, "parent_id": 4, "res_type": "Mark", "children": []},
+            "6": {"node_id": 6, "parent_id": 4, "res_type": "Vildmark", "children": []},
+            "8": {"node_id": 8, "parent_id": 3, "children": []},
+        },
+        "characters": {"7": {"char_id": 7, "name": "Sven"}},
+        "title_seats": {"1": "4"},
+        "jarldom_owners": {"4": "7"},
+        "next_node_id": 9,
+    }
+
+
+def test_round_trip_preserves_world(tmp_path):
+    data = _world()
+    SqliteWorld.from_world_data(data, tmp_path / "w.sqlite").close()
+
+    reopened = SqliteWorld(tmp_path / "w.sqlite")
+    assert reopened.export_world() == data
+
+
+def test_depths_match_world_manager():
+    data = _world()
+    world = SqliteWorld.from_world_data(data)
+    manager = WorldManager(data)
+    for nid in data["nodes"]:
+        assert world.get_depth_of_node(int(nid)) == manager.get_depth_of_node(int(nid))
+    assert world.get_depth_of_node(99) == -1
+
+
+def test_indexed_queries():
+    world = SqliteWorld.from_world_data(_world())
+    assert [n["node_id"] for n in world.nodes_at_depth(3)] == [4, 8]
+    assert sorted(world.subtree_ids(3)) == [3, 4, 5, 6, 8]
+    assert world.count_descendants(4) == 2
+    assert [c.node_id for c in world.get_children(4)] == [5, 6]
+    assert [n["node_id"] for n in world.nodes_by_res_type("Vildmark")] == [6]
+    assert [n["node_id"] for n in world.nodes_owned_by(7)] == [4]
+    assert world.neighbor_ids(4) == [8]
+    assert world.nodes_bordering(8) == [4]
+
+
+def test_relation_lookups():
+    world = SqliteWorld.from_world_data(_world())
+    assert world.get_title_seat("1") == 4
+    assert world.get_seated_title(4) == 1
+    assert world.get_jarldom_owner(4) == 7
+    assert world.get_owned_jarldoms(7) == [4]
+
+    world.set_jarldom_owner(4, None)
+    assert world.get_jarldom_owner(4) is None
+    assert "jarldom_owners" not in world.export_world()
+
+
+def test_reparent_updates_subtree_depths():
+    world = SqliteWorld.from_world_data(_world())
+    node = world.get_node(4)
+    node["parent_id"] = 1
+    world.put_node(node)
+    assert world.get_depth_of_node(4) == 1
+    assert world.get_depth_of_node(5) == 2
+
+
+def test_edits_are_committed_per_transaction(tmp_path):
+    path = tmp_path / "w.sqlite"
+    world = SqliteWorld.from_world_data(_world(), path)
+    world.set_node_field(5, "tunnland", 12)
+
+    other = SqliteWorld(path)
+    assert other.get_node(5)["tunnland"] == 12
+
+
+def test_delete_subtree_updates_parent():
+    world = SqliteWorld.from_world_data(_world())
+    assert world.delete_node_and_descendants(4) == 3
+    assert world.get_node(5) is None
+    assert world.get_node(3)["children"] == []
+    assert world.neighbor_ids(4) == []
+
+
+def test_update_subfiefs_creates_and_removes_children():
+    world = SqliteWorld.from_world_data(_world())
+    node = world.get_node(8)
+    node["num_subfiefs"] = 2
+    world.update_subfiefs_for_node(node)
+    children = world.get_node(8)["children"]
+    assert len(children) == 2
+    assert all(world.get_depth_of_node(cid) == 4 for cid in children)
+    assert world.export_world()["next_node_id"] == max(children) + 1
+
+    node = world.get_node(4)
+    node["num_subfiefs"] = 1
+    world.update_subfiefs_for_node(node)
+    assert len(world.get_node(4)["children"]) == 1
+    assert world.count_descendants(4) == 1
+
+
+def test_link_neighbors_and_display_name():
+    world = SqliteWorld.from_world_data(_world())
+    ok, _ = world.attempt_link_neighbors(4, 8)
+    assert not ok  # already neighbours in slot 1
+
+    data = _world()
+    data["nodes"]["4"]["neighbors"] = []
+    world = SqliteWorld.from_world_data(data)
+    ok, _ = world.attempt_link_neighbors(4, 8)
+    assert ok
+    assert world.neighbor_ids(4) == [8]
+    assert world.nodes_bordering(4) == [8]
+
+    expected = WorldManager(_world()).get_display_name_for_node(
+        _world()["nodes"]["4"], 3
+    )
+    assert world.get_display_name_for_node(world.get_node(4), 3) == expected
@@ -0,0 +1,32 @@
+from src.node_store import NodeStore
+from src.undo_log import MISSING, UndoLog
+
+
+def test_undo_log_is_bounded_by_count_and_size():
+    log = UndoLog(max_entries=3, max_bytes=10_000)
+    for i in range(5):
+        log.record("edit", {}, {1: {"name": (str(i), str(i + 1))}})
+    assert len(log) == 3
+    assert [e.changes[1]["name"][0] for e in log.entries()] == ["2", "3", "4"]
+
+    small = UndoLog(max_bytes=100)
+    for i in range(5):
+        small.record("edit", {}, {1: {"lager_text": ("", "x" * 60)}})
+    assert len(small) == 1
+    assert small.total_bytes <= 100
+
+
+def test_undo_redo_restores_missing_fields():
+    nodes = {"1": {"node_id": 1, "name": "Ny"}}
+    store = NodeStore(nodes)
+    log = UndoLog()
+    log.record("edit", {}, {1: {"name": ("Gammal", "Ny"), "tag": (MISSING, [1])}})
+    nodes["1"]["tag"] = [1]
+
+    log.undo(store)
+    assert nodes["1"] == {"node_id": 1, "name": "Gammal"}
+    log.redo(store)
+    assert nodes["1"] == {"node_id": 1, "name": "Ny", "tag": [1]}
+
+    log.record("edit", {}, {1: {"name": ("Ny", "Tredje")}})
+    assert not log.can_redo()
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from src.world_binary import dumps_world, loads_world
+from src.world_interface import WorldInterface
+from src.world_manager import WorldManager
+
+
+def _world() -> dict:
+    world = {
+        "next_node_id": 7,
+        "nodes": {
+            "1": {"node_id": 1, "parent_id": None, "name": "Rike", "children": [2]},
+            "2": {"node_id": 2, "parent_id": 1, "children": [3]},
+            "3": {"node_id": 3, "parent_id": 2, "children": [4]},
+            "4": {"node_id": 4, "parent_id": 3, "children": [5, 6]},
+            "5": {"node_id": 5, "parent_id": 4, "res_type": "Väder"},
+            "6": {"node_id": 6, "parent_id": 4, "res_type": "Gods", "has_herd": True},
+        },
+        "characters": {"1": {"name": "Åsa", "wealth": 12}},
+        "title_seats": {"1": "4"},
+    }
+    WorldManager(world).validate_world_data()
+    return world
+
+
+def test_round_trip_is_lossless():
+    world = _world()
+    decoded = loads_world(dumps_world(world))
+    assert decoded == world
+    assert json.dumps(decoded) == json.dumps(world)  # key order survives
+
+
+def test_mixed_and_edge_values_survive():
+    world = {
+        "nodes": {
+            "a": {"v": 1, "f": 0.5, "b": False, "s": "x", "n": None},
+            "07": {"v": 2.0, "f": -0.0, "b": True, "s": "y", "n": None},
+            "9": {"v": 2**70, "f": 1e300, "b": 1, "s": None, "n": [1, {"x": 2}]},
+            "10": {},
+            "11": {"n": None, "v": -5, "f": 2.5, "b": 0, "s": "x"},
+        },
+        "other": [1, 2],
+    }
+    decoded = loads_world(dumps_world(world))
+    assert decoded == world
+    for key, node in world["nodes"].items():
+        for field, value in node.items():
+            assert type(decoded["nodes"][key][field]) is type(value)
+            assert list(decoded["nodes"][key]) == list(node)
+
+
+def test_worlds_without_node_dicts():
+    assert loads_world(dumps_world({})) == {}
+    assert loads_world(dumps_world({"nodes": {}})) == {"nodes": {}}
+    assert loads_world(dumps_world({"nodes": ["x"]})) == {"nodes": ["x"]}
+
+
+def test_binary_is_smaller_than_json():
+    world = _world()
+    for idx in range(10, 500):
+        world["nodes"][str(idx)] = dict(world["nodes"]["6"], node_id=idx)
+    assert len(dumps_world(world)) * 3 < len(json.dumps(world, indent=2))
+
+
+def test_rejects_foreign_files():
+    with pytest.raises(ValueError):
+        loads_world(b"NOPE" + b"\0" * 10)
+
+
+def test_world_interface_binary_pair(tmp_path):
+    path = tmp_path / "sub" / "world.fswb"
+    WorldInterface.save_world_binary(_world(), str(path))
+    assert WorldInterface.load_world_binary(str(path)) == _world()
+    assert WorldInterface.load_world_binary(str(tmp_path / "missing")) == {}
+    (tmp_path / "bad").write_bytes(b"garbage")
+    assert WorldInterface.load_world_binary(str(tmp_path / "bad")) == {}
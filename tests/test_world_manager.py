@@ -1209,3 +1209,123 @@ def test_calculate_license_income_sums_descendants():
     manager = WorldManager(world)
     total = manager.calculate_license_income(1)
     assert total == 1 + 2 + 3 + 4
+
+
+def _listing_manager():
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [3]},
+        "3": {"node_id": 3, "parent_id": 2, "children": [5, 4]},
+        "5": {"node_id": 5, "parent_id": 3, "custom_name": "Alby", "children": []},
+        "4": {"node_id": 4, "parent_id": 3, "custom_name": "Öby", "children": [6]},
+        "6": {
+            "node_id": 6,
+            "parent_id": 4,
+            "res_type": "Bosättning",
+            "settlement_type": "By",
+            "children": [],
+        },
+    }
+    return WorldManager({"nodes": nodes, "characters": {}, "next_node_id": 7})
+
+
+def test_nodes_at_depth_listings():
+    manager = _listing_manager()
+    assert manager.node_ids_at_depth(3) == [4, 5]
+    assert [n["node_id"] for n in manager.nodes_at_depth(3)] == [4, 5]
+    assert [n["node_id"] for n in manager.nodes_at_depth_by_name(3)] == [5, 4]
+    assert manager.nodes_at_depth(9) == []
+
+    jarldom = manager.world_data["nodes"]["5"]
+    jarldom["num_subfiefs"] = 1
+    manager.update_subfiefs_for_node(jarldom)
+    assert manager.node_ids_at_depth(4) == [6, 7]
+
+    manager.delete_node_and_descendants(4)
+    assert manager.node_ids_at_depth(3) == [5]
+    assert manager.node_ids_at_depth(4) == [7]
+
+
+def test_field_listings_follow_edits():
+    manager = _listing_manager()
+    assert [n["node_id"] for n in manager.nodes_by_res_type("Bosättning")] == [6]
+    assert [n["node_id"] for n in manager.nodes_by_settlement_type("By")] == [6]
+
+    nodes = manager.world_data["nodes"]
+    nodes["5"]["res_type"] = "Bosättning"
+    nodes["6"]["res_type"] = "Mark"
+    manager.reindex_node(5)
+    assert [n["node_id"] for n in manager.nodes_by_res_type("Bosättning")] == [5]
+    # Edits without reindex_node are still never reported under a stale value
+    nodes["5"]["res_type"] = "Skog"
+    assert manager.nodes_by_res_type("Bosättning") == []
+
+    manager.delete_node_and_descendants(4)
+    assert manager.nodes_by_settlement_type("By") == []
+
+
+def _delta_manager() -> WorldManager:
+    nodes = {
+        "1": {"node_id": 1, "parent_id": None, "children": [2]},
+        "2": {"node_id": 2, "parent_id": 1, "children": [3, 4]},
+        "3": {
+            "node_id": 3,
+            "parent_id": 2,
+            "children": [],
+            "free_peasants": 5,
+            "thralls": 2,
+            "soldiers": [{"type": "Bågskytt", "count": 3}],
+        },
+        "4": {
+            "node_id": 4,
+            "parent_id": 2,
+            "children": [5],
+            "burghers": 4,
+        },
+        "5": {"node_id": 5, "parent_id": 4, "children": [], "population": 6},
+    }
+    manager = WorldManager({"nodes": nodes, "characters": {}})
+    manager.update_population_totals()
+    manager.calculate_total_resources(1)
+    return manager
+
+
+def _recomputed(manager: WorldManager) -> dict:
+    reference = WorldManager(copy.deepcopy(manager.world_data))
+    reference.update_population_totals()
+    reference.calculate_total_resources(1)
+    return reference.world_data["nodes"]
+
+
+def test_set_node_field_matches_full_recompute():
+    manager = _delta_manager()
+    edits = [
+        (3, "thralls", 7),
+        (5, "free_peasants", 2),
+        (4, "burghers", 0),
+        (3, "soldiers", [{"type": "Riddare", "count": 1}]),
+        (5, "unfree_peasants", "3"),
+    ]
+    for node_id, key, value in edits:
+        assert manager.set_node_field(node_id, key, value)
+        assert manager.world_data["nodes"] == _recomputed(manager)
+    # Zeroed categories fall back to the stored base, as in the full recompute
+    assert manager.world_data["nodes"]["1"]["population"] == (5 + 7) + 4 + (2 + 3)
+    assert manager.world_data["nodes"]["1"]["total_resources"]["soldiers"] == {
+        "Riddare": 1
+    }
+
+
+def test_set_node_field_falls_back_without_stored_totals():
+    manager = WorldManager(copy.deepcopy(_delta_manager().world_data))
+    for node in manager.world_data["nodes"].values():
+        node.pop("_base_population")
+    reference = WorldManager(copy.deepcopy(manager.world_data))
+    reference.world_data["nodes"]["3"]["thralls"] = 1
+    reference.update_population_totals()
+
+    assert manager.set_node_field(3, "thralls", 1)
+    assert manager.world_data["nodes"]["1"]["population"] == (
+        reference.world_data["nodes"]["1"]["population"]
+    )
+    assert not manager.set_node_field(99, "thralls", 1)
@@ -20,3 +20,61 @@ def test_save_current_world_updates_and_refreshes(monkeypatch):
     assert all_worlds["A"] is world
     assert saved["data"] is all_worlds
     assert refreshed
+
+
+def test_save_node_edit_uses_journal_when_available():
+    saved = []
+    journaled = []
+
+    def fake_journal(all_worlds, name, world, node_id, key, value):
+        journaled.append((name, node_id, key, value))
+        return True
+
+    ui = WorldManagerUI(save_func=saved.append, journal_func=fake_journal)
+    refreshed = []
+    ui.save_node_edit("A", {"nodes": {}}, {}, 3, "thralls", 5, lambda: refreshed.append(True))
+
+    assert journaled == [("A", 3, "thralls", 5)]
+    assert not saved
+    assert refreshed
+
+
+def test_save_node_edit_falls_back_to_full_save():
+    saved = []
+    ui = WorldManagerUI(save_func=saved.append, journal_func=lambda *a: False)
+    all_worlds = {}
+    world = {"nodes": {}}
+
+    ui.save_node_edit("A", world, all_worlds, 3, "thralls", 5)
+
+    assert saved == [all_worlds]
+    assert all_worlds["A"] is world
+
+
+def test_scheduler_stages_edits_for_world_collections(tmp_path):
+    # Same module objects world_manager_ui uses for its isinstance check
+    from save_scheduler import SaveScheduler
+    from world_store import ShardedWorldStore, WorldCollection
+
+    ShardedWorldStore(tmp_path).save_world("A", {"nodes": {"1": {"node_id": 1}}})
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    scheduled = []
+
+    class RecordingScheduler(SaveScheduler):
+        def schedule(self, key, prepare):
+            scheduled.append(key)
+            super().schedule(key, prepare)
+
+    ui = WorldManagerUI(
+        save_func=lambda _: None,
+        journal_func=lambda *a: False,
+        scheduler=RecordingScheduler(),
+    )
+    world = worlds["A"]
+    world["nodes"]["1"]["thralls"] = 2
+    ui.save_node_edit("A", world, worlds, 1, "thralls", 2)
+
+    assert scheduled == [id(worlds)]
+    assert ShardedWorldStore(tmp_path).read_journal("A") == [
+        {"node_id": 1, "key": "thralls", "value": 2}
+    ]
@@ -0,0 +1,82 @@
+import copy
+import json
+
+from src.node import Node
+from src.world_manager import WorldManager
+from src.world_sparse import PROFILE_KEY, is_sparse, rehydrate_world, sparsify_world
+from src.world_store import ShardedWorldStore, shard_file_name
+
+
+def _validated_world() -> dict:
+    world = {
+        "nodes": {
+            "1": {"node_id": 1, "parent_id": None, "children": [2]},
+            "2": {"node_id": 2, "parent_id": 1, "children": [3, 4]},
+            "3": {"node_id": 3, "parent_id": 2, "res_type": "Gods"},
+            "4": {"node_id": 4, "parent_id": 2, "population": 12, "custom_name": "By"},
+        },
+        "characters": {},
+        "next_node_id": 5,
+    }
+    WorldManager(world).validate_world_data()
+    return world
+
+
+def _node_world(count: int) -> dict:
+    nodes = {
+        str(nid): Node(node_id=nid, parent_id=None if nid == 1 else 1).to_dict()
+        for nid in range(1, count + 1)
+    }
+    return {"nodes": nodes, "characters": {}, "next_node_id": count + 1}
+
+
+def _round_trip(world: dict) -> dict:
+    return rehydrate_world(json.loads(json.dumps(sparsify_world(world))))
+
+
+def test_round_trip_is_lossless():
+    for world in (_validated_world(), _node_world(3)):
+        world["nodes"]["9"] = Node(node_id=9, parent_id=1, population=40).to_dict()
+        expected = copy.deepcopy(world)
+
+        sparse = sparsify_world(world)
+        assert is_sparse(sparse)
+        assert world == expected
+
+        restored = _round_trip(world)
+        assert restored == expected
+        assert json.dumps(restored) == json.dumps(expected)
+        assert all(PROFILE_KEY not in node for node in restored["nodes"].values())
+
+
+def test_sparse_world_is_smaller():
+    world = _node_world(50)
+    assert len(json.dumps(sparsify_world(world))) < len(json.dumps(world)) / 4
+
+
+def test_defaults_compare_by_type():
+    world = {"nodes": {"1": {"node_id": 1, "storage_timber": False, "is_jarldom": 0}}}
+    restored = _round_trip(world)
+    assert restored["nodes"]["1"]["storage_timber"] is False
+    assert restored["nodes"]["1"]["is_jarldom"] == 0
+    assert type(restored["nodes"]["1"]["is_jarldom"]) is int
+
+
+def test_restored_defaults_are_not_shared():
+    restored = _round_trip(_node_world(2))
+    first, second = restored["nodes"]["1"], restored["nodes"]["2"]
+    first["neighbors"].append({"id": 2, "border": "liten väg"})
+    first["buildings"].append({"type": "Smedja"})
+    assert second["neighbors"] == []
+    assert second["buildings"] == []
+
+
+def test_store_writes_sparse_shards(tmp_path):
+    world = _validated_world()
+    ShardedWorldStore(tmp_path, sparse=True).save_world("Alfa", world)
+
+    shard = tmp_path / shard_file_name("Alfa")
+    assert is_sparse(json.loads(shard.read_text(encoding="utf-8")))
+
+    # Any store reads sparse shards, whatever its own write mode
+    assert ShardedWorldStore(tmp_path).load_world("Alfa") == world
@@ -0,0 +1,273 @@
+import json
+
+from src.world_store import ShardedWorldStore, WorldCollection, shard_file_name
+
+
+def _world(name: str) -> dict:
+    return {
+        "nodes": {"1": {"node_id": 1, "parent_id": None, "custom_name": name}},
+        "characters": {},
+        "next_node_id": 2,
+    }
+
+
+def test_save_and_load_single_world(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("Alfa", _world("Alfa"))
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.world_names() == ["Alfa"]
+    assert reopened.load_world("Alfa") == _world("Alfa")
+    assert reopened.load_world("Saknas") is None
+
+
+def test_manifest_maps_names_to_files(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("Väst & Öst", _world("x"))
+
+    manifest = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    entry = manifest["worlds"]["Väst & Öst"]
+    assert entry["file"] == shard_file_name("Väst & Öst")
+    assert (tmp_path / entry["file"]).exists()
+
+
+def test_shard_file_names_are_unique_for_similar_names():
+    assert shard_file_name("a b") != shard_file_name("a_b")
+
+
+def test_collection_loads_worlds_lazily(tmp_path, monkeypatch):
+    store = ShardedWorldStore(tmp_path)
+    store.import_worlds({"A": _world("A"), "B": _world("B")})
+
+    loaded: list[str] = []
+    original = ShardedWorldStore.load_world
+
+    def tracking_load(self, name):
+        loaded.append(name)
+        return original(self, name)
+
+    monkeypatch.setattr(ShardedWorldStore, "load_world", tracking_load)
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+
+    assert sorted(worlds) == ["A", "B"]
+    assert len(worlds) == 2
+    assert loaded == []
+    assert worlds["B"]["nodes"]["1"]["custom_name"] == "B"
+    assert loaded == ["B"]
+    assert worlds.is_loaded("B") and not worlds.is_loaded("A")
+
+
+def test_flush_writes_only_changed_worlds(tmp_path, monkeypatch):
+    store = ShardedWorldStore(tmp_path)
+    store.import_worlds({"A": _world("A"), "B": _world("B")})
+
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    saved: list[str] = []
+    original = ShardedWorldStore.save_world
+
+    def tracking_save(self, name, data):
+        saved.append(name)
+        original(self, name, data)
+
+    monkeypatch.setattr(ShardedWorldStore, "save_world", tracking_save)
+    data = worlds["A"]
+    data["nodes"]["1"]["custom_name"] = "Ändrad"
+    worlds["A"] = data
+
+    assert worlds.flush() == ["A"]
+    assert saved == ["A"]
+    assert worlds.flush() == []
+    assert ShardedWorldStore(tmp_path).load_world("A")["nodes"]["1"]["custom_name"] == "Ändrad"
+
+
+def test_delete_removes_shard_and_manifest_entry(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.import_worlds({"A": _world("A"), "B": _world("B")})
+    shard = store.shard_path("A")
+
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    del worlds["A"]
+    assert "A" not in worlds
+    worlds.flush()
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.world_names() == ["B"]
+    assert not shard.exists()
+
+
+def test_new_world_is_added_to_manifest(tmp_path):
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    worlds["Ny"] = _world("Ny")
+    assert "Ny" in worlds
+    worlds.flush()
+    assert ShardedWorldStore(tmp_path).world_names() == ["Ny"]
+
+
+def test_journal_replay_rebuilds_state(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    live = worlds["A"]
+    live["nodes"]["1"]["custom_name"] = "Ny"
+    worlds.record_edit("A", live, 1, "custom_name", "Ny")
+    live["nodes"]["1"]["soldiers"] = [{"type": "Bågskytt", "count": 3}]
+    worlds.record_edit("A", live, 1, "soldiers", [{"type": "Bågskytt", "count": 3}])
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.journal_length("A") == 2
+    assert reopened.load_world("A") == live
+    # The base shard itself is untouched until compaction
+    shard = json.loads(reopened.shard_path("A").read_text(encoding="utf-8"))
+    assert shard == _world("A")
+
+
+def test_journal_compacts_at_threshold(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+
+    worlds = WorldCollection(ShardedWorldStore(tmp_path), compact_threshold=3)
+    live = worlds["A"]
+    for idx in range(3):
+        live["nodes"]["1"]["thralls"] = idx
+        worlds.record_edit("A", live, 1, "thralls", idx)
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.journal_length("A") == 0
+    assert not reopened.journal_path("A").exists()
+    shard = json.loads(reopened.shard_path("A").read_text(encoding="utf-8"))
+    assert shard["nodes"]["1"]["thralls"] == 2
+
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    store.append_journal("A", [{"node_id": 1, "key": "thralls", "value": 4}])
+    with store.journal_path("A").open("a", encoding="utf-8") as fh:
+        fh.write('{"node_id": 1, "key": "thr')
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.load_world("A")["nodes"]["1"]["thralls"] == 4
+
+    reopened.append_journal("A", [{"node_id": 1, "key": "burghers", "value": 2}])
+    node = ShardedWorldStore(tmp_path).load_world("A")["nodes"]["1"]
+    assert node["thralls"] == 4
+    assert node["burghers"] == 2
+
+
+def test_record_edit_on_unsaved_world_writes_shard(tmp_path):
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    live = _world("Ny")
+    worlds.record_edit("Ny", live, 1, "custom_name", "Ny")
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.world_names() == ["Ny"]
+    assert reopened.journal_length("Ny") == 0
+    assert reopened.load_world("Ny") == live
+
+
+def test_catalogue_reads_only_manifest(tmp_path, monkeypatch):
+    store = ShardedWorldStore(tmp_path)
+    store.import_worlds({"A": _world("A"), "B": {"nodes": {}, "characters": {"1": {}}}})
+
+    def fail_load(self, name):
+        raise AssertionError("catalogue must not parse worlds")
+
+    monkeypatch.setattr(ShardedWorldStore, "load_world", fail_load)
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    summaries = {s.name: s for s in worlds.catalogue()}
+
+    assert summaries["A"].node_count == 1
+    assert summaries["B"].node_count == 0
+    assert summaries["B"].character_count == 1
+    assert summaries["A"].size_bytes == store.shard_path("A").stat().st_size
+
+
+def test_catalogue_tracks_saves_and_staged_worlds(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    data = worlds["A"]
+    data["nodes"]["2"] = {"node_id": 2, "parent_id": 1}
+    worlds["A"] = data
+    worlds["Ny"] = {"nodes": {}}
+
+    staged = {s.name: s for s in worlds.catalogue()}
+    assert staged["A"].node_count == 2
+    assert staged["Ny"].node_count == 0
+
+    worlds.flush()
+    saved = {s.name: s for s in ShardedWorldStore(tmp_path).catalogue()}
+    assert saved["A"].node_count == 2
+    assert saved["Ny"].size_bytes > 0
+
+
+def test_catalogue_backfills_metadata_for_old_manifests(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    manifest = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    manifest["worlds"]["A"] = {"file": manifest["worlds"]["A"]["file"]}
+    (tmp_path / "index.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.catalogue()[0].node_count is None
+    reopened.load_world("A")
+    assert ShardedWorldStore(tmp_path).catalogue()[0].node_count == 1
+
+
+def test_staged_edits_keep_latest_value_per_field(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    live = worlds["A"]
+    for value in (1, 2, 3):
+        live["nodes"]["1"]["thralls"] = value
+        worlds.stage_edit("A", live, 1, "thralls", value)
+
+    assert worlds.flush() == []
+    reopened = ShardedWorldStore(tmp_path)
+    assert reopened.read_journal("A") == [{"node_id": 1, "key": "thralls", "value": 3}]
+
+
+def test_failed_write_is_retried_as_full_save(tmp_path, monkeypatch):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    worlds = WorldCollection(ShardedWorldStore(tmp_path))
+    live = worlds["A"]
+    live["nodes"]["1"]["thralls"] = 4
+    worlds.stage_edit("A", live, 1, "thralls", 4)
+
+    def broken_append(self, name, entries):
+        raise OSError("disk full")
+
+    write = worlds.detach(copy_data=True)
+    with monkeypatch.context() as patch:
+        patch.setattr(ShardedWorldStore, "append_journal", broken_append)
+        try:
+            write()
+        except OSError:
+            pass
+
+    assert worlds.flush() == ["A"]
+    assert ShardedWorldStore(tmp_path).load_world("A")["nodes"]["1"]["thralls"] == 4
+
+
+def test_detached_compaction_reads_shard_not_live_world(tmp_path):
+    store = ShardedWorldStore(tmp_path)
+    store.save_world("A", _world("A"))
+    worlds = WorldCollection(ShardedWorldStore(tmp_path), compact_threshold=2)
+    live = worlds["A"]
+    for value in (1, 2):
+        live["nodes"]["1"][f"field_{value}"] = value
+        worlds.stage_edit("A", live, 1, f"field_{value}", value)
+
+    write = worlds.detach(copy_data=True)
+    # Unstaged changes to the live world are not part of the write
+    live["nodes"]["1"]["custom_name"] = "Ändrad"
+    assert write() == ["A"]
+
+    reopened = ShardedWorldStore(tmp_path)
+    assert not reopened.journal_path("A").exists()
+    node = json.loads(reopened.shard_path("A").read_text(encoding="utf-8"))["nodes"]["1"]
+    assert (node["field_1"], node["field_2"]) == (1, 2)
+    assert node["custom_name"] == "A"
@@ -0,0 +1,68 @@
+import copy
+import io
+import json
+
+import pytest
+
+from src import world_stream
+from src.world_manager import WorldManager
+from src.world_stream import load_world_file, read_world, read_worlds
+
+
+def _world() -> dict:
+    return {
+        "next_node_id": 3,
+        "nodes": {
+            # Children listed before their parents and an orphan
+            "6": {"node_id": 6, "parent_id": 4, "res_type": "Gods"},
+            "4": {"node_id": 4, "parent_id": 3, "children": [6]},
+            "3": {"node_id": 3, "parent_id": 2, "children": [4]},
+            "1": {"node_id": 1, "parent_id": None, "children": [2]},
+            "2": {"node_id": 2, "parent_id": 1, "children": [3], "ruler_id": 9},
+            "7": {"node_id": 7, "parent_id": 99, "population": 12.5},
+            "x": {"node_id": 0},
+        },
+        "characters": {"9": {"name": "Åsa"}},
+        "title_seats": {"1": "4"},
+    }
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(world_stream, "CHUNK_SIZE", 7)
+
+
+def test_read_world_matches_json_load(small_chunks):
+    text = json.dumps(_world(), ensure_ascii=False, indent=2)
+    world, counts = read_world(io.StringIO(text))
+    assert world == json.loads(text)
+    assert counts == (0, 0)
+
+
+def test_read_worlds_matches_json_load(small_chunks):
+    data = {"A": _world(), "B": {"nodes": {}}, "C": {}, "Tom": None}
+    text = json.dumps(data)
+    assert read_worlds(io.StringIO(text)) == data
+    assert read_worlds(io.StringIO("{}")) == {}
+
+
+def test_read_world_rejects_malformed_input():
+    with pytest.raises(ValueError):
+        read_world(io.StringIO('{"nodes": {"1": {}'))
+    with pytest.raises(ValueError):
+        read_world(io.StringIO('{"nodes": {} "x": 1}'))
+
+
+def test_streamed_validation_matches_batch(tmp_path, small_chunks):
+    path = tmp_path / "world.json"
+    path.write_text(json.dumps(_world()), encoding="utf-8")
+
+    batch = copy.deepcopy(_world())
+    expected_counts = WorldManager(batch).validate_world_data()
+
+    manager = WorldManager()
+    world, counts = load_world_file(path, manager)
+    assert world == batch
+    assert counts == expected_counts
+    assert manager.world_data is world
+    assert manager.get_depth_of_node(6) == 4
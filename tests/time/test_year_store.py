@@ -0,0 +1,60 @@
+import copy
+import json
+
+from time.time_engine import TimeEngine
+from time.year_store import YearStore
+
+
+def _world(year: int) -> dict:
+    nodes = {str(i): {"node_id": i, "population": 10 * i} for i in range(1, 50)}
+    nodes["1"]["population"] = year
+    return {"nodes": nodes, "year": year}
+
+
+def test_years_round_trip_with_bounded_chains():
+    store = YearStore(keyframe_interval=4)
+    expected = {}
+    for year in range(1, 12):
+        state = _world(year)
+        if year % 3 == 0:
+            del state["nodes"]["2"]
+        expected[year] = state
+        store[year] = state
+
+    for year, state in expected.items():
+        assert store[year] == state
+        assert store.chain_length(year) < 4
+    assert [y for y in store if store.is_keyframe(y)] == [1, 5, 9]
+
+    full = len(json.dumps(_world(1)))
+    usage = store.memory_usage()
+    assert usage[1] >= full
+    assert usage[2] < full // 10
+
+
+def test_rewriting_a_year_keeps_later_years():
+    store = YearStore(keyframe_interval=4)
+    for year in range(1, 5):
+        store[year] = _world(year)
+    later = copy.deepcopy(store[3])
+
+    changed = _world(2)
+    changed["nodes"]["7"]["population"] = -1
+    store[2] = changed
+
+    assert store[2] == changed
+    assert store[3] == later
+    read = store[3]
+    read["year"] = 99
+    assert store[3] == later
+
+
+def test_time_engine_reports_memory_per_year():
+    engine = TimeEngine(keyframe_interval=3)
+    engine.record_change(_world(1))
+    for _ in range(4):
+        engine.execute_current_year()
+
+    usage = engine.memory_usage()
+    assert sorted(usage) == [1, 2, 3, 4, 5]
+    assert engine.history[4] == _world(1)
@@ -0,0 +1,20 @@
+"""Tests for the world catalogue helpers used by the manage-worlds view."""
+
+from src.ui.views.manage_worlds_view import format_world_summary, world_summaries
+from src.world_store import WorldSummary
+
+
+def test_format_world_summary_includes_counts_and_size():
+    summary = WorldSummary("Drunok", node_count=120, size_bytes=4096)
+    assert format_world_summary(summary) == "Drunok (120 noder, 4 kB)"
+
+
+def test_format_world_summary_without_metadata_shows_name():
+    assert format_world_summary(WorldSummary("Okänd")) == "Okänd"
+
+
+def test_world_summaries_for_plain_dict_are_sorted():
+    worlds = {"B": {"nodes": {"1": {}}}, "A": {"nodes": {}}}
+    summaries = world_summaries(worlds)
+    assert [s.name for s in summaries] == ["A", "B"]
+    assert summaries[1].node_count == 1
@@ -0,0 +1,76 @@
+from src.ui.views.structure_view import StructureView
+
+
+class _FakeTree:
+    def __init__(self):
+        self.inserted = []
+
+    def winfo_exists(self):
+        return True
+
+    def get_children(self, item_id=""):
+        return ()
+
+    def delete(self, *items):
+        pass
+
+    def exists(self, item_id):
+        return item_id in self.inserted
+
+    def insert(self, parent, index, iid, **kwargs):
+        self.inserted.append(iid)
+
+
+class _FakePanel:
+    def format_node_label(self, name, is_personal):
+        return name
+
+
+class _FakeApp:
+    def __init__(self, nodes):
+        self.world_data = {"nodes": nodes}
+        self.cache_clears = 0
+
+    def clear_depth_cache(self):
+        self.cache_clears += 1
+
+    def add_status_message(self, message):
+        pass
+
+    def get_depth_of_node(self, node_id):
+        return 0
+
+    def get_display_name_for_node(self, node_data, depth):
+        return str(node_data.get("node_id"))
+
+
+def _render(nodes):
+    app = _FakeApp(nodes)
+    view = StructureView(app=app, parent=_FakePanel(), tree_widget=_FakeTree())
+    view.restore_selection_and_expansion = lambda state: None
+    view._render_admin_tree({"open_items": set(), "selection": ()})
+    return app
+
+
+def test_repaired_hierarchy_clears_the_depth_cache():
+    app = _render(
+        {
+            "1": {"node_id": 1, "parent_id": 9, "children": [2, 3]},
+            "2": {"node_id": 2, "parent_id": 1, "children": []},
+        }
+    )
+
+    assert app.world_data["nodes"]["1"]["parent_id"] is None
+    assert app.world_data["nodes"]["1"]["children"] == [2]
+    assert app.cache_clears == 2
+
+
+def test_valid_hierarchy_keeps_the_depth_cache():
+    app = _render(
+        {
+            "1": {"node_id": 1, "parent_id": None, "children": [2]},
+            "2": {"node_id": 2, "parent_id": 1, "children": []},
+        }
+    )
+
+    assert app.cache_clears == 0